@@ -5,6 +5,18 @@ Uses sounddevice for audio input and janus for thread-safe async queues
 (sounddevice callbacks run in a C-level audio thread, not in asyncio event loop).
 
 BlackHole is optional — if not installed, only microphone is captured.
+
+Queue items are AudioChunk (PCM + features computed once in the callback,
+see audio_features.py).
+
+Capture queues are bounded (BoundedAudioQueue): if the consumer stalls
+(a long _transcribe_lock wait, a Deepgram reconnect) the backlog is capped
+at `max_seconds` of 16kHz audio instead of growing without limit. What gives
+way when the queue is full is chosen by the overflow policy:
+  - drop_oldest:  discard the oldest chunk
+  - drop_silence: discard the oldest silent chunk, the oldest chunk if none is silent
+  - downsample:   store the oldest full-rate chunks at 8kHz (half the memory),
+                  upsampled back on get; drop oldest once everything is halved
 """
 
 import sounddevice as sd
@@ -12,18 +24,133 @@ import numpy as np
 import asyncio
 import logging
 import janus
+from collections import deque
+from dataclasses import replace
 from typing import Optional
 
+from audio_features import CLIP_PEAK, AudioChunk, ChunkFeatures, compute
+from echo_gate import EchoGate
+
 logger = logging.getLogger(__name__)
 
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 1600  # 100ms at 16kHz
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+QUEUE_POLICIES = ("drop_oldest", "drop_silence", "downsample")
+DOWNSAMPLE_FACTOR = 2  # 16kHz → 8kHz
+
+
+def _downsample(raw: bytes) -> bytes:
+    """16kHz → 8kHz: average sample pairs (a crude low-pass before decimation)."""
+    samples = np.frombuffer(raw, dtype=np.int16)
+    samples = samples[:len(samples) - len(samples) % DOWNSAMPLE_FACTOR].astype(np.int32)
+    return samples.reshape(-1, DOWNSAMPLE_FACTOR).mean(axis=1).astype(np.int16).tobytes()
+
+
+def _upsample(raw: bytes) -> bytes:
+    """8kHz → 16kHz by linear interpolation."""
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+    n = len(samples) * DOWNSAMPLE_FACTOR
+    return np.interp(np.arange(n) / DOWNSAMPLE_FACTOR, np.arange(len(samples)), samples).astype(np.int16).tobytes()
+
+
+class BoundedAudioQueue(janus.Queue):
+    """janus.Queue of AudioChunk (16kHz int16), capped at `max_seconds` of audio.
+
+    Producers never block or raise: put_nowait from the audio thread always
+    succeeds and the overflow policy makes room. The hooks below run under
+    janus' internal mutex, so the bookkeeping is thread-safe.
+    """
+
+    def __init__(self, max_seconds: float = 10.0, policy: str = "drop_oldest"):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown audio queue policy '{policy}', expected one of {QUEUE_POLICIES}")
+        self.max_bytes = int(max_seconds * BYTES_PER_SECOND)
+        self.policy = policy
+        # Counters
+        self.dropped_chunks = 0
+        self.dropped_seconds = 0.0
+        self.downsampled_chunks = 0
+        self.peak_backlog_seconds = 0.0
+        super().__init__()
+
+    def _init(self, maxsize: int) -> None:
+        super()._init(maxsize)
+        # Parallel to self._queue: downsampled flag per chunk
+        self._downsampled: deque[bool] = deque()
+        self._bytes = 0
+        self._seconds = 0.0
+
+    def _put(self, item: AudioChunk) -> None:
+        self._queue.append(item)
+        self._downsampled.append(False)
+        self._bytes += len(item.pcm)
+        self._seconds += len(item.pcm) / BYTES_PER_SECOND
+        while self._bytes > self.max_bytes and len(self._queue) > 1:
+            self._make_room()
+        self.peak_backlog_seconds = max(self.peak_backlog_seconds, self._seconds)
+
+    def _get(self) -> AudioChunk:
+        item = self._queue.popleft()
+        self._bytes -= len(item.pcm)
+        if self._downsampled.popleft():
+            item = replace(item, pcm=_upsample(item.pcm))
+        self._seconds -= len(item.pcm) / BYTES_PER_SECOND
+        return item
+
+    def _make_room(self) -> None:
+        if self.policy == "downsample":
+            for i, downsampled in enumerate(self._downsampled):
+                if not downsampled:
+                    self._shrink(i)
+                    return
+        index = 0
+        if self.policy == "drop_silence":
+            index = next((i for i, item in enumerate(self._queue) if item.features.silent), 0)
+        self._drop(index)
+
+    def _shrink(self, index: int) -> None:
+        item = self._queue[index]
+        small = _downsample(item.pcm)
+        self._queue[index] = replace(item, pcm=small)
+        self._downsampled[index] = True
+        self._bytes -= len(item.pcm) - len(small)
+        self.downsampled_chunks += 1
+
+    def _drop(self, index: int) -> None:
+        item = self._queue[index]
+        downsampled = self._downsampled[index]
+        del self._queue[index]
+        del self._downsampled[index]
+        seconds = len(item.pcm) * (DOWNSAMPLE_FACTOR if downsampled else 1) / BYTES_PER_SECOND
+        self._bytes -= len(item.pcm)
+        self._seconds -= seconds
+        self._unfinished_tasks -= 1
+        self.dropped_chunks += 1
+        self.dropped_seconds += seconds
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "backlog_seconds": round(self._seconds, 1),
+            "peak_backlog_seconds": round(self.peak_backlog_seconds, 1),
+            "dropped_chunks": self.dropped_chunks,
+            "dropped_seconds": round(self.dropped_seconds, 1),
+            "downsampled_chunks": self.downsampled_chunks,
+        }
 
 
 class AudioCapture:
-    def __init__(self):
-        self._mic_queue: Optional[janus.Queue] = None
-        self._system_queue: Optional[janus.Queue] = None
+    def __init__(self, queue_seconds: float = 10.0, queue_policy: str = "drop_oldest", echo_gate: bool = False):
+        if queue_policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown audio queue policy '{queue_policy}', expected one of {QUEUE_POLICIES}")
+        self.queue_seconds = queue_seconds
+        self.queue_policy = queue_policy
+        self.echo_gate_enabled = echo_gate
+        self._echo_gate: Optional[EchoGate] = None  # Mic echo suppression, system stream as reference
+        self._mic_queue: Optional[BoundedAudioQueue] = None
+        self._system_queue: Optional[BoundedAudioQueue] = None
         self._mic_stream: Optional[sd.InputStream] = None
         self._system_stream: Optional[sd.InputStream] = None
         self.is_recording = False
@@ -36,6 +163,7 @@ class AudioCapture:
         # Diagnostic counters
         self._mic_chunk_count = 0
         self._system_chunk_count = 0
+        self._levels: dict[str, dict] = {}  # Per-source level meter, from chunk features
 
     @staticmethod
     def find_device(name_contains: str) -> int:
@@ -88,8 +216,8 @@ class AudioCapture:
 
     async def start(self):
         """Start capturing audio streams. BlackHole is optional."""
-        self._mic_queue = janus.Queue()
-        self._system_queue = janus.Queue()
+        self._mic_queue = BoundedAudioQueue(self.queue_seconds, self.queue_policy)
+        self._system_queue = BoundedAudioQueue(self.queue_seconds, self.queue_policy)
 
         # Use system default input device (respects user's Sound settings)
         default_input = sd.default.device[0]
@@ -139,6 +267,8 @@ class AudioCapture:
                 callback=self._system_callback,
             )
             self._system_stream.start()
+        self._echo_gate = EchoGate() if self.echo_gate_enabled and self.has_system_audio else None
+        self._levels = {}
 
         self.is_recording = True
 
@@ -152,11 +282,15 @@ class AudioCapture:
         if self._mic_native_rate != SAMPLE_RATE:
             audio = self._resample(audio, self._mic_native_rate, SAMPLE_RATE)
         raw = audio.tobytes()
+        if self._echo_gate:
+            raw = self._echo_gate.process(raw)
+            audio = np.frombuffer(raw, dtype=np.int16)
+        features = compute(audio)
+        self._update_level("mic", features)
         self._mic_chunk_count += 1
         if self._mic_chunk_count <= 3:
-            peak = int(np.max(np.abs(audio)))
-            logger.info(f"Mic callback #{self._mic_chunk_count}: {len(raw)} bytes, peak={peak}, dtype={audio.dtype}")
-        self._mic_queue.sync_q.put_nowait(raw)
+            logger.info(f"Mic callback #{self._mic_chunk_count}: {len(raw)} bytes, peak={features.peak}, dtype={audio.dtype}")
+        self._mic_queue.sync_q.put_nowait(AudioChunk(raw, features))
 
     def _system_callback(self, indata, frames, time, status):
         """Callback for system audio (BlackHole) — runs in audio thread."""
@@ -168,20 +302,50 @@ class AudioCapture:
         if self._system_native_rate != SAMPLE_RATE:
             audio = self._resample(audio, self._system_native_rate, SAMPLE_RATE)
         raw = audio.tobytes()
+        if self._echo_gate:
+            self._echo_gate.push_reference(raw)
+        features = compute(audio)
+        self._update_level("system", features)
         self._system_chunk_count += 1
         if self._system_chunk_count <= 3:
-            peak = int(np.max(np.abs(audio)))
-            logger.info(f"System callback #{self._system_chunk_count}: {len(raw)} bytes, peak={peak}, dtype={audio.dtype}")
-        self._system_queue.sync_q.put_nowait(raw)
+            logger.info(f"System callback #{self._system_chunk_count}: {len(raw)} bytes, peak={features.peak}, dtype={audio.dtype}")
+        self._system_queue.sync_q.put_nowait(AudioChunk(raw, features))
+
+    def _update_level(self, label: str, features: ChunkFeatures):
+        """Level meter counters — runs in the audio thread, plain dict updates only."""
+        level = self._levels.setdefault(label, {"chunks": 0, "speech_chunks": 0, "clipped_chunks": 0})
+        level["chunks"] += 1
+        level["speech_chunks"] += not features.silent
+        level["clipped_chunks"] += features.peak >= CLIP_PEAK
+        level["level_db"] = round(features.level_db, 1)
+        level["peak"] = features.peak
+        level["zcr"] = round(features.zcr, 3)
 
     @property
-    def mic_queue(self) -> Optional[janus.Queue]:
+    def mic_queue(self) -> Optional[BoundedAudioQueue]:
         return self._mic_queue
 
     @property
-    def system_queue(self) -> Optional[janus.Queue]:
+    def system_queue(self) -> Optional[BoundedAudioQueue]:
         return self._system_queue
 
+    def queue_stats(self) -> dict:
+        """Backlog and overflow counters per capture queue (current recording)."""
+        stats = {}
+        for label, q in (("mic", self._mic_queue), ("system", self._system_queue)):
+            if q is not None:
+                stats[label] = q.stats()
+        return stats
+
+    def level_stats(self) -> dict:
+        """Per-source level meter: last level (dBFS), peak and zero-crossing rate,
+        speech and clipped chunk counts."""
+        return {label: dict(level) for label, level in self._levels.items()}
+
+    def echo_stats(self) -> Optional[dict]:
+        """Echo gate counters (CPU per chunk, decodes saved), None when the gate is off."""
+        return self._echo_gate.stats() if self._echo_gate else None
+
     def stop(self):
         """Stop recording and close streams."""
         self.is_recording = False
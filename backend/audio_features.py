@@ -0,0 +1,95 @@
+"""
+Per-chunk audio features, computed once where a chunk is captured.
+
+Every 100ms chunk gets RMS, peak, zero-crossing rate and the share of its
+energy in three frequency bands (one rfft). Consumers read these instead of
+re-deriving them from the PCM:
+  - Whisper VAD (rms) and the pre-decode gate (buffer RMS, voice-band share)
+  - capture queue overflow policy drop_silence
+  - level meters (SSE `audio_level`) and per-source level stats in /status
+    (level, peak, zero-crossing rate of the last chunk)
+"""
+
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SILENCE_RMS = 80  # RMS below this = silence (mic 500-5000+, BlackHole 50-300)
+CLIP_PEAK = 32000  # Peak at or above this counts as clipping
+# Band edges, Hz: rumble/hum | voice | hiss/clicks
+BANDS_HZ = (0, 100, 4000, SAMPLE_RATE // 2)
+VOICE_BAND = 1
+
+
+@dataclass(frozen=True)
+class ChunkFeatures:
+    rms: float
+    peak: int
+    zcr: float  # Zero crossings per sample
+    bands: tuple[float, ...]  # Energy share per BANDS_HZ band, sums to 1 (0s for digital silence)
+
+    @property
+    def silent(self) -> bool:
+        return self.rms < SILENCE_RMS
+
+    @property
+    def voice_ratio(self) -> float:
+        return self.bands[VOICE_BAND]
+
+    @property
+    def level_db(self) -> float:
+        """RMS in dBFS (-96 for digital silence)."""
+        return 20 * float(np.log10(max(self.rms, 0.5) / 32768))
+
+
+@dataclass
+class AudioChunk:
+    """A captured chunk: 16kHz int16 PCM plus its features."""
+
+    pcm: bytes
+    features: ChunkFeatures
+    captured_at: float = field(default_factory=time.time)
+
+
+@lru_cache(maxsize=8)
+def _band_starts(n_samples: int) -> np.ndarray:
+    """rfft bin index where each band starts, for a chunk of n_samples."""
+    bins = n_samples // 2 + 1
+    edges = [min(bins - 1, round(hz * n_samples / SAMPLE_RATE)) for hz in BANDS_HZ[:-1]]
+    return np.array(edges)
+
+
+def compute(samples: np.ndarray) -> ChunkFeatures:
+    """Features of one int16 chunk."""
+    if samples.size == 0:
+        return ChunkFeatures(0.0, 0, 0.0, (0.0,) * (len(BANDS_HZ) - 1))
+    x = samples.astype(np.float32)
+    rms = float(np.sqrt(np.mean(x * x)))
+    peak = int(np.max(np.abs(samples.astype(np.int32))))
+    zcr = float(np.count_nonzero(np.diff(np.signbit(samples)))) / samples.size
+    power = np.abs(np.fft.rfft(x)) ** 2
+    per_band = np.add.reduceat(power, _band_starts(samples.size))
+    total = float(per_band.sum())
+    bands = tuple(float(b) / total for b in per_band) if total > 0 else (0.0,) * len(per_band)
+    return ChunkFeatures(rms, peak, zcr, bands)
+
+
+def compute_bytes(raw: bytes) -> ChunkFeatures:
+    return compute(np.frombuffer(raw, dtype=np.int16))
+
+
+def buffer_rms(features: Iterable[ChunkFeatures]) -> float:
+    """RMS over a run of equal-length chunks, from their per-chunk RMS."""
+    squares = [f.rms ** 2 for f in features]
+    return float(np.sqrt(np.mean(squares))) if squares else 0.0
+
+
+def voice_ratio(features: Iterable[ChunkFeatures]) -> float:
+    """Energy-weighted voice-band share over non-silent chunks (1.0 if all are silent)."""
+    loud = [f for f in features if not f.silent]
+    energy = sum(f.rms ** 2 for f in loud)
+    return sum(f.rms ** 2 * f.voice_ratio for f in loud) / energy if energy else 1.0
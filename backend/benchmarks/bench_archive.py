@@ -0,0 +1,141 @@
+"""
+Benchmark: recording archive cost on the live path and in the writer thread.
+
+Feeds mic + system chunks (the synthetic Whisper warm-up clip, 100ms each) to
+RecordingArchive the way the audio pumps do, at --speed times real time.
+Capture starts 60% into a segment (leading silence pad) and pauses for
+--gap seconds in the middle (by default longer than a segment, so the pad
+spans a boundary). Reports:
+  - push() latency on the pumping side (µs, mean / p99 / max) — what the
+    live path pays
+  - writer CPU per second of audio, output bitrate, drops (queue full)
+  - segment layout from index.jsonl: every segment starts on a multiple of
+    the segment length, durations include the padding
+  - file check: every segment decodes to its indexed duration (Ogg: OpusHead
+    first, last granule position; FLAC: frame count)
+
+Usage (from backend/):
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --format flac --seconds 300 --speed 50
+    python benchmarks/bench_archive.py --segment 10 --gap 45 --keep
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whisper_tuning  # noqa: E402
+from ogg_opus import OPUS_GRANULE_RATE  # noqa: E402
+from recording_archive import FORMATS, SAMPLE_RATE, RecordingArchive, available_format  # noqa: E402
+
+CHUNK = SAMPLE_RATE // 10
+START_IN_SEGMENT = 0.6  # First chunk this far into its segment
+
+
+def file_seconds(path: str) -> float:
+    """Duration of a segment file as a player sees it; raises if it's malformed."""
+    if path.endswith(".flac"):
+        import soundfile
+        return soundfile.info(path).frames / SAMPLE_RATE
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != b"OggS" or data[28:36] != b"OpusHead":
+        raise ValueError("no OpusHead page")
+    granule, pos = 0, 0
+    while pos < len(data):
+        if data[pos:pos + 4] != b"OggS":
+            raise ValueError(f"broken page at byte {pos}")
+        granule = struct.unpack_from("<q", data, pos + 6)[0]
+        n_lacing = data[pos + 26]
+        pos += 27 + n_lacing + sum(data[pos + 27:pos + 27 + n_lacing])
+    return granule / OPUS_GRANULE_RATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", default="opus", choices=FORMATS)
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--segment", type=int, default=30, help="Segment length (s)")
+    parser.add_argument("--bitrate", type=int, default=32000, help="Opus bitrate")
+    parser.add_argument("--gap", type=float, default=45, help="Capture pause in the middle (s)")
+    parser.add_argument("--speed", type=float, default=20, help="Feed rate, x real time (0 = no pacing)")
+    parser.add_argument("--keep", action="store_true", help="Keep the output directory")
+    args = parser.parse_args()
+
+    fmt = available_format(args.format)
+    if fmt is None:
+        sys.exit("Neither opuslib (libopus) nor soundfile is installed")
+    if fmt != args.format:
+        print(f"{args.format} encoder not installed — using {fmt}")
+
+    clip = (whisper_tuning.synthetic_clip(10) * 32767).astype(np.int16)
+    n_chunks = int(args.seconds * 10)
+    directory = tempfile.mkdtemp(prefix="archive-bench-")
+    archive = RecordingArchive(directory, fmt, args.segment, args.bitrate)
+    archive.start()
+
+    clock = (math.floor(time.time() / args.segment) + START_IN_SEGMENT) * args.segment
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(n_chunks):
+        clock += CHUNK / SAMPLE_RATE
+        if i == n_chunks // 2:
+            clock += args.gap
+        offset = (i * CHUNK) % (clip.size - CHUNK)
+        pcm = clip[offset:offset + CHUNK].tobytes()
+        for source in ("mic", "system"):
+            start = time.perf_counter()
+            archive.push(source, pcm, clock)
+            latencies.append(time.perf_counter() - start)
+        if args.speed:
+            target = wall_start + (i + 1) * 0.1 / args.speed
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    archive.stop()
+    cpu = time.process_time() - cpu_start
+
+    lat = np.array(latencies) * 1e6
+    s = archive.stats()
+    audio_seconds = 2 * args.seconds
+    print(f"{fmt}, 2 sources x {args.seconds:.0f}s at {args.speed or 'max'}x, {args.segment}s segments\n")
+    print(f"push():         mean {lat.mean():.1f} µs, p99 {np.percentile(lat, 99):.1f} µs, max {lat.max():.1f} µs")
+    print(f"writer CPU:     {cpu / audio_seconds * 1000:.2f} ms per second of audio")
+    print(f"output:         {s['kbit_per_s']} kbit/s, {s['segments']} segments, {s['seconds']:.1f}s "
+          f"(incl. {s['padded_seconds']:.1f}s padding)")
+    print(f"dropped:        {s['dropped_chunks']} chunks")
+
+    with open(os.path.join(archive.session_dir, "index.jsonl")) as f:
+        index = [json.loads(line) for line in f]
+    aligned = sum(1 for e in index if e["start"] % args.segment == 0)
+    print(f"aligned starts: {aligned}/{len(index)}")
+    bad = 0
+    for e in index:
+        try:
+            seconds = file_seconds(os.path.join(archive.session_dir, e["file"]))
+            check = "ok" if abs(seconds - e["seconds"]) < 0.05 else f"decodes to {seconds:.2f}s"
+        except Exception as err:
+            check = f"BROKEN: {err}"
+        bad += check != "ok"
+        print(f"  {e['file']:<32} {e['seconds']:>6.1f}s {e['bytes'] / 1024:>7.1f} KiB  {check}")
+    print(f"file check:     {len(index) - bad}/{len(index)} ok")
+
+    if args.keep:
+        print(f"\nkept: {archive.session_dir}")
+    else:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
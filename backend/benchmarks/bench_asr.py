@@ -0,0 +1,185 @@
+"""
+Benchmark: local transcription engines/models on a replay corpus — pick the
+best model for this host.
+
+The corpus is a directory of 16kHz int16 WAV recordings (mono, or stereo
+mixed down), each with a reference transcript next to it:
+    corpus/
+        q01.wav  q01.txt
+        q02.wav  q02.txt
+
+Every (engine, model) pair is evaluated in a fresh process (so peak RSS is
+per model), loaded the same way WhisperTranscriber does
+(transcription_whisper._do_load_model + warm-up), then each file is decoded
+as one buffer. Reports:
+  - load time (s)
+  - real-time factor: decode time / audio duration (< 1.0 keeps up with live
+    audio; two streams on one model need < 0.5)
+  - word error rate against the references (case and punctuation ignored)
+  - peak RSS of the process (MB)
+Before that, the pre-decode gate is run over the corpus the way
+WhisperTranscriber applies it (100ms chunk features, 3s pieces): pieces
+loud enough to decode that the voice-band check (MIN_VOICE_RATIO) would
+drop, and the lowest voice-band share seen — on real speech both should
+show the gate leaves speech alone.
+
+--models all runs every model already on disk for the engine: full and
+quantized GGML variants (q5_0/q5_1/q8_0) for whisper.cpp.
+
+Usage (from backend/):
+    python benchmarks/bench_asr.py corpus/
+    python benchmarks/bench_asr.py corpus/ --models all
+    python benchmarks/bench_asr.py corpus/ --engines whispercpp faster-whisper --models large-v3-turbo small
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_features  # noqa: E402
+import transcription_whisper as tw  # noqa: E402
+from config import WHISPER_MODELS, WHISPER_QUANTIZED_MODELS  # noqa: E402
+
+SAMPLE_RATE = 16000
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: str) -> list[str]:
+    return WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def word_errors(reference: list[str], hypothesis: list[str]) -> int:
+    """Levenshtein distance over words (substitutions + insertions + deletions)."""
+    prev = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        cur = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ref_word != hyp_word))
+        prev = cur
+    return prev[-1]
+
+
+def load_corpus(directory: str) -> list[tuple[str, np.ndarray, str]]:
+    """[(name, float32 audio, reference text)] for every WAV with a .txt next to it."""
+    items = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".wav"):
+            continue
+        ref_path = os.path.join(directory, os.path.splitext(name)[0] + ".txt")
+        if not os.path.exists(ref_path):
+            print(f"skip {name}: no reference .txt")
+            continue
+        with wave.open(os.path.join(directory, name), "rb") as wf:
+            if wf.getframerate() != SAMPLE_RATE or wf.getsampwidth() != 2:
+                print(f"skip {name}: expected 16kHz int16")
+                continue
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            if wf.getnchannels() > 1:
+                samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+        with open(ref_path, encoding="utf-8") as f:
+            reference = f.read()
+        items.append((name, samples.astype(np.float32) / 32768.0, reference))
+    return items
+
+
+def gate_report(corpus: list[tuple[str, np.ndarray, str]]) -> dict:
+    """What the pre-decode gate does to the corpus, per 3s piece of 100ms chunks."""
+    chunk = SAMPLE_RATE // 10
+    loud = dropped = 0
+    lowest = 1.0
+    for _, audio, _ in corpus:
+        samples = (audio * 32767).astype(np.int16)
+        features = [audio_features.compute(samples[i:i + chunk])
+                    for i in range(0, samples.size - chunk + 1, chunk)]
+        for start in range(0, len(features), tw.PROCESS_INTERVAL_CHUNKS):
+            piece = features[start:start + tw.PROCESS_INTERVAL_CHUNKS]
+            if audio_features.buffer_rms(piece) < tw.SILENCE_RMS_THRESHOLD:
+                continue
+            loud += 1
+            voice = audio_features.voice_ratio(piece)
+            lowest = min(lowest, voice)
+            dropped += voice < tw.MIN_VOICE_RATIO
+    return {"pieces": loud, "dropped": dropped, "lowest_voice_ratio": lowest}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def evaluate(engine: str, model_name: str, corpus_dir: str) -> dict:
+    """Runs in a child process: load, warm up, decode the corpus."""
+    corpus = load_corpus(corpus_dir)
+    key = tw.model_key(model_name, engine)
+    start = time.perf_counter()
+    model = tw._do_load_model(key, tw._initial_threads(key))
+    load_s = time.perf_counter() - start
+    tw._warm_up_and_tune(key, model, tw._initial_threads(key))
+
+    audio_s = decode_s = 0.0
+    errors = ref_words = 0
+    for _, audio, reference in corpus:
+        start = time.perf_counter()
+        hypothesis = " ".join(s["text"] for s in tw._decode(engine, model, audio))
+        decode_s += time.perf_counter() - start
+        audio_s += len(audio) / SAMPLE_RATE
+        ref = normalize(reference)
+        errors += word_errors(ref, normalize(hypothesis))
+        ref_words += len(ref)
+    return {
+        "load_s": load_s,
+        "rtf": decode_s / audio_s if audio_s else 0.0,
+        "wer": errors / ref_words if ref_words else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def models_for(engine: str, requested: list[str]) -> list[str]:
+    if requested != ["all"]:
+        return requested
+    candidates = WHISPER_MODELS + (WHISPER_QUANTIZED_MODELS if engine == tw.ENGINE_WHISPERCPP else [])
+    return [m for m in candidates if tw.has_local_model(m, engine)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Directory with *.wav + *.txt references")
+    parser.add_argument("--engines", nargs="+", default=list(tw.ENGINES), choices=tw.ENGINES)
+    parser.add_argument("--models", nargs="+", default=["large-v3-turbo"],
+                        help='Model names, or "all" for every model on disk')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        sys.exit("No labelled WAV files found")
+    total = sum(len(a) for _, a, _ in corpus) / SAMPLE_RATE
+    print(f"{len(corpus)} files, {total:.0f}s of audio")
+    gate = gate_report(corpus)
+    print(f"voice-band gate (MIN_VOICE_RATIO={tw.MIN_VOICE_RATIO}): drops {gate['dropped']}/{gate['pieces']} "
+          f"loud 3s pieces, lowest voice share {gate['lowest_voice_ratio']:.3f}\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'engine':<16} {'model':<22} {'load s':>7} {'RTF':>6} {'WER':>7} {'peak MB':>8}")
+    for engine in args.engines:
+        for model_name in models_for(engine, args.models):
+            try:
+                with ctx.Pool(1) as pool:
+                    r = pool.apply(evaluate, (engine, model_name, args.corpus))
+            except Exception as e:
+                print(f"{engine:<16} {model_name:<22} failed: {e}")
+                continue
+            print(f"{engine:<16} {model_name:<22} {r['load_s']:>7.1f} {r['rtf']:>6.2f} "
+                  f"{r['wer']:>7.1%} {r['peak_rss_mb']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
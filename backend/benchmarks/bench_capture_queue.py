@@ -0,0 +1,122 @@
+"""
+Benchmark: capture queue overflow policies under a slow consumer.
+
+A producer thread stands in for the sounddevice callback: it puts 100ms
+int16 chunks (speech-like bursts separated by pauses) with put_nowait at a
+fixed rate. The asyncio consumer stands in for the audio pump + transcriber:
+it takes chunks at a fraction of real time and stalls periodically (a long
+_transcribe_lock wait, a Deepgram reconnect). For each policy it reports:
+  - peak backlog (s of audio) and mean queueing latency (backlog behind each
+    delivered chunk)
+  - audio dropped (s) and chunks stored at 8kHz
+  - speech kept: share of speech chunks that reached the consumer
+
+Time is accelerated by --speed (default 10x), so a 60s session takes 6s.
+
+Usage (from backend/):
+    python benchmarks/bench_capture_queue.py
+    python benchmarks/bench_capture_queue.py --seconds 120 --consumer-rate 0.7 --stall 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import BLOCK_SIZE, QUEUE_POLICIES, BoundedAudioQueue  # noqa: E402
+from audio_features import AudioChunk, compute  # noqa: E402
+
+CHUNK_SECONDS = BLOCK_SIZE / 16000
+
+
+def make_chunks(n: int) -> list[AudioChunk]:
+    """~40% speech: 1.5s bursts, 0.1-2s pauses (deterministic)."""
+    rng = np.random.default_rng(0)
+    samples = []
+    while len(samples) < n:
+        for _ in range(15):
+            samples.append((rng.standard_normal(BLOCK_SIZE) * 3000).astype(np.int16))
+        for _ in range(int(rng.integers(1, 21))):
+            samples.append((rng.standard_normal(BLOCK_SIZE) * 10).astype(np.int16))
+    return [AudioChunk(s.tobytes(), compute(s)) for s in samples[:n]]
+
+
+def is_speech(chunk: AudioChunk) -> bool:
+    return not chunk.features.silent
+
+
+async def run_policy(policy: str, chunks: list[bytes], args) -> dict:
+    queue = BoundedAudioQueue(args.queue_seconds, policy)
+    interval = CHUNK_SECONDS / args.speed
+    done = threading.Event()
+
+    def produce():
+        start = time.perf_counter()
+        for i, chunk in enumerate(chunks):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            queue.sync_q.put_nowait(chunk)
+        done.set()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    received = speech = 0
+    latency_sum = 0.0
+    consumed_seconds = 0.0
+    next_stall = args.stall_every
+    while not (done.is_set() and queue.async_q.empty()):
+        try:
+            chunk = await asyncio.wait_for(queue.async_q.get(), timeout=0.1)
+        except asyncio.TimeoutError:
+            continue
+        received += 1
+        latency_sum += max(0.0, queue.stats()["backlog_seconds"])
+        speech += is_speech(chunk)
+        consumed_seconds += CHUNK_SECONDS
+        await asyncio.sleep(interval / args.consumer_rate)
+        if args.stall and consumed_seconds >= next_stall:
+            next_stall += args.stall_every
+            await asyncio.sleep(args.stall / args.speed)
+    producer.join()
+
+    stats = queue.stats()
+    queue.close()
+    await queue.wait_closed()
+    sent_speech = sum(is_speech(c) for c in chunks)
+    return {**stats, "received": received, "speech_kept": speech / sent_speech, "mean_latency": latency_sum / max(received, 1)}
+
+
+async def run(args):
+    n = int(args.seconds / CHUNK_SECONDS)
+    chunks = make_chunks(n)
+    print(f"{args.seconds:.0f}s of audio, queue {args.queue_seconds:.0f}s, consumer {args.consumer_rate:.0%} "
+          f"of real time, {args.stall:.0f}s stall every {args.stall_every:.0f}s, {args.speed:.0f}x speed\n")
+    print(f"{'policy':<14} {'peak s':>7} {'lat s':>6} {'dropped s':>10} {'8kHz':>6} {'speech kept':>12}")
+    for policy in args.policies:
+        r = await run_policy(policy, chunks, args)
+        print(f"{policy:<14} {r['peak_backlog_seconds']:>7.1f} {r['mean_latency']:>6.1f} "
+              f"{r['dropped_seconds']:>10.1f} {r['downsampled_chunks']:>6} {r['speech_kept']:>12.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60, help="Simulated session length")
+    parser.add_argument("--queue-seconds", type=float, default=10)
+    parser.add_argument("--consumer-rate", type=float, default=0.8, help="Consumer speed relative to real time")
+    parser.add_argument("--stall", type=float, default=5, help="Stall length, s (0 = none)")
+    parser.add_argument("--stall-every", type=float, default=15, help="Stall period, s of consumed audio")
+    parser.add_argument("--speed", type=float, default=10, help="Time acceleration")
+    parser.add_argument("--policies", nargs="+", default=list(QUEUE_POLICIES), choices=QUEUE_POLICIES)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: echo gate on mic audio that contains speaker leakage.
+
+Builds a session (or reads one from two WAVs) where the system stream is the
+interviewer and the mic stream is the candidate plus the interviewer played
+through the speakers: delayed, attenuated, smeared by a short room impulse
+response, with background noise. Runs EchoGate chunk by chunk as the
+capture callbacks do and reports:
+  - CPU per 100ms chunk
+  - interviewer-only mic speech suppressed (s) and decodes saved — the same
+    counters GET /status shows
+  - candidate speech kept: residual/original energy on chunks where only the
+    candidate talks (should stay ~100%)
+
+Usage (from backend/):
+    python benchmarks/bench_echo_gate.py
+    python benchmarks/bench_echo_gate.py --delay-ms 120 --leak 0.3
+    python benchmarks/bench_echo_gate.py --mic mic.wav --system system.wav
+"""
+
+import argparse
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_features import SILENCE_RMS  # noqa: E402
+from echo_gate import EchoGate, SAMPLE_RATE  # noqa: E402
+
+CHUNK = SAMPLE_RATE // 10
+
+
+def speech_like(seconds: float, seed: int, f0: float) -> np.ndarray:
+    """Voiced harmonics with a syllable envelope (same generator family as the Whisper tuning clip)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = f0 + 25 * np.sin(2 * np.pi * rng.uniform(0.3, 0.9) * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    return 6000 * voiced * np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+
+
+def simulate(seconds: float, delay_ms: float, leak: float, seed: int = 0):
+    """(mic, system, candidate-only mask per chunk) — turns alternate every 4s, overlapping 1s."""
+    n = int(seconds * SAMPLE_RATE)
+    rng = np.random.default_rng(seed)
+    turn = 4 * SAMPLE_RATE
+    interviewer_on = (np.arange(n) // turn) % 2 == 0
+    candidate_on = ~interviewer_on | ((np.arange(n) % turn) > 3 * SAMPLE_RATE)
+    system = speech_like(seconds, seed, 110) * interviewer_on
+    candidate = speech_like(seconds, seed + 1, 190) * candidate_on
+
+    room = np.zeros(int(0.03 * SAMPLE_RATE))
+    room[0] = 1.0
+    taps = rng.integers(1, len(room), 6)
+    room[taps] = rng.uniform(0.05, 0.25, 6) * rng.choice((-1, 1), 6)
+    delay = int(delay_ms * SAMPLE_RATE / 1000)
+    echo = np.convolve(np.concatenate((np.zeros(delay), system)), room)[:n] * leak
+
+    mic = candidate + echo + rng.normal(0, 15, n)
+    chunks = n // CHUNK
+    only_candidate = np.array([candidate_on[i * CHUNK:(i + 1) * CHUNK].all()
+                               and not interviewer_on[max(0, i * CHUNK - SAMPLE_RATE):(i + 1) * CHUNK].any()
+                               for i in range(chunks)])
+    to_int16 = lambda x: np.clip(x, -32768, 32767).astype(np.int16)  # noqa: E731
+    return to_int16(mic), to_int16(system), only_candidate
+
+
+def read_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            sys.exit(f"{path}: expected 16kHz int16 mono WAV")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(x.astype(np.float64) ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--delay-ms", type=float, default=60, help="Speaker→mic delay (simulated)")
+    parser.add_argument("--leak", type=float, default=0.4, help="Echo level relative to the system stream")
+    parser.add_argument("--mic", help="Recorded mic WAV (16kHz mono) instead of the simulation")
+    parser.add_argument("--system", help="Recorded system WAV recorded at the same time")
+    args = parser.parse_args()
+
+    if args.mic and args.system:
+        mic, system = read_wav(args.mic), read_wav(args.system)
+        only_candidate = None
+    else:
+        mic, system, only_candidate = simulate(args.seconds, args.delay_ms, args.leak)
+
+    gate = EchoGate()
+    chunks = min(len(mic), len(system)) // CHUNK
+    speech_before = speech_after = 0
+    kept_num = kept_den = 0.0
+    for i in range(chunks):
+        part = slice(i * CHUNK, (i + 1) * CHUNK)
+        gate.push_reference(system[part].tobytes())
+        out = np.frombuffer(gate.process(mic[part].tobytes()), dtype=np.int16)
+        speech_before += rms(mic[part]) >= SILENCE_RMS
+        speech_after += rms(out) >= SILENCE_RMS
+        if only_candidate is not None and only_candidate[i]:
+            kept_num += rms(out) ** 2
+            kept_den += rms(mic[part]) ** 2
+
+    s = gate.stats()
+    print(f"{chunks * CHUNK / SAMPLE_RATE:.0f}s of audio, {chunks} chunks")
+    print(f"CPU per chunk:          {s['cpu_ms_per_chunk']:.3f} ms ({s['cpu_ms_per_chunk'] / 100:.2%} of real time)")
+    print(f"mic speech chunks:      {speech_before} before, {speech_after} after")
+    print(f"echo chunks cancelled:  {s['echo_chunks']}")
+    print(f"suppressed:             {s['suppressed_seconds']:.1f}s, decodes saved ~{s['decodes_saved']}")
+    if kept_den:
+        print(f"candidate speech kept:  {kept_num / kept_den:.1%} of energy")
+
+
+if __name__ == "__main__":
+    main()
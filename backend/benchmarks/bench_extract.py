@@ -0,0 +1,112 @@
+"""
+Benchmark: DOCX text extraction throughput and peak memory on large documents.
+
+Compares the streaming extractor (file_parser.extract_text_from_docx,
+iterparse over word/document.xml) with a python-docx baseline that loads
+the whole document object model, and measures extract_text_async() through
+the process pool with several documents in flight.
+
+Without arguments a synthetic document (headings, paragraphs, tables) is
+generated with python-docx; pass your own .docx/.doc/.pdf files instead.
+
+Usage (from backend/):
+    python benchmarks/bench_extract.py                    # synthetic, ~2000 paragraphs
+    python benchmarks/bench_extract.py --paragraphs 20000
+    python benchmarks/bench_extract.py big.docx old.doc
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_parser import extract_text, extract_text_async, shutdown_pool  # noqa: E402
+
+CONCURRENT_DOCS = 4
+
+
+def synthetic_docx(paragraphs: int) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("Иван Иванов — Senior Python Developer", 0)
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            doc.add_heading(f"Проект {i // 50}", 1)
+        doc.add_paragraph(f"Пункт {i}: разработка сервисов на Python/FastAPI, PostgreSQL, Kafka; "
+                          f"нагрузка {i * 10} RPS, снижение задержки p99 на {i % 40}%.")
+        if i % 200 == 199:
+            table = doc.add_table(rows=4, cols=3)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"r{r}c{c}"
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def python_docx_baseline(file_bytes: bytes) -> str:
+    from docx import Document
+
+    doc = Document(BytesIO(file_bytes))
+    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
+def measure(fn, *args) -> tuple[float, float, int]:
+    """(seconds, peak MB of Python allocations, output chars)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, len(out)
+
+
+async def pool_throughput(file_bytes: bytes, filename: str) -> float:
+    await extract_text_async(file_bytes, filename)  # Warm up the worker processes
+    start = time.perf_counter()
+    await asyncio.gather(*(extract_text_async(file_bytes, filename) for _ in range(CONCURRENT_DOCS)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="Documents to extract (default: synthetic .docx)")
+    parser.add_argument("--paragraphs", type=int, default=2000, help="Size of the synthetic document")
+    args = parser.parse_args()
+
+    docs = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            docs.append((path, f.read()))
+    if not docs:
+        docs.append((f"synthetic-{args.paragraphs}.docx", synthetic_docx(args.paragraphs)))
+
+    print(f"{'document':<28} {'MB':>6} {'extractor':<12} {'time s':>7} {'MB/s':>7} {'peak MB':>8} {'chars':>9}")
+    for name, file_bytes in docs:
+        size_mb = len(file_bytes) / 1e6
+        runs = [("streaming", extract_text, (file_bytes, name))]
+        if name.lower().endswith(".docx"):
+            try:
+                import docx  # noqa: F401
+                runs.append(("python-docx", python_docx_baseline, (file_bytes,)))
+            except ImportError:
+                pass
+        for label, fn, fn_args in runs:
+            elapsed, peak, chars = measure(fn, *fn_args)
+            print(f"{os.path.basename(name)[:28]:<28} {size_mb:>6.2f} {label:<12} {elapsed:>7.2f} "
+                  f"{size_mb / elapsed:>7.2f} {peak:>8.1f} {chars:>9}")
+        elapsed = asyncio.run(pool_throughput(file_bytes, name))
+        print(f"{'':<28} {'':>6} {f'pool x{CONCURRENT_DOCS}':<12} {elapsed:>7.2f} "
+              f"{size_mb * CONCURRENT_DOCS / elapsed:>7.2f} {'-':>8} {'-':>9}")
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: end-to-end format_document time, single call vs map-reduce.
+
+Extracts text from a PDF/DOCX the same way the upload job does, then formats
+it twice — once as a single request and once split into sections that are
+condensed concurrently and merged — and reports wall time for each.
+
+Uses the real provider from .env (LLM_PROVIDER / LLM_MODEL). With --simulate
+no API is called: each request sleeps for a latency model of
+    FIXED_LATENCY + input_chars / INPUT_CHARS_PER_SEC + output_chars / OUTPUT_CHARS_PER_SEC
+which is enough to see how concurrency and section size trade off.
+
+Usage (from backend/):
+    python benchmarks/bench_format_document.py resume.pdf
+    python benchmarks/bench_format_document.py vacancy.docx --type job --concurrency 8
+    python benchmarks/bench_format_document.py long.docx --simulate
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import OPENAI_API_KEY, CLI_PROXY_URL, CLI_PROXY_API_KEY, LLM_PROVIDER, LLM_MODEL  # noqa: E402
+from file_parser import extract_text, split_sections  # noqa: E402
+from llm_client import LLMClient  # noqa: E402
+
+FIXED_LATENCY = 0.8  # seconds per request (simulated)
+INPUT_CHARS_PER_SEC = 40000
+OUTPUT_CHARS_PER_SEC = 250  # ~60 tokens/s of Russian text
+
+
+class _SimulatedCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, messages, max_completion_tokens, **kwargs):
+        self.calls += 1
+        content = messages[0]["content"]
+        input_chars = len(content) if isinstance(content, str) else 20000
+        output_chars = min(max_completion_tokens * 3, max(300, input_chars // 6))
+        await asyncio.sleep(FIXED_LATENCY + input_chars / INPUT_CHARS_PER_SEC
+                            + output_chars / OUTPUT_CHARS_PER_SEC)
+        message = SimpleNamespace(content="x" * output_chars)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+async def run(args):
+    with open(args.file, "rb") as f:
+        file_bytes = f.read()
+    start = time.perf_counter()
+    text = extract_text(file_bytes, args.file)
+    extract_ms = (time.perf_counter() - start) * 1000
+    if not text:
+        sys.exit("No text extracted (scanned PDF or pypdf missing) — nothing to compare")
+    sections = split_sections(text)
+    print(f"{args.file}: {len(text)} chars extracted in {extract_ms:.0f}ms, {len(sections)} sections")
+
+    llm = LLMClient(openai_api_key=OPENAI_API_KEY or "unset", cli_proxy_url=CLI_PROXY_URL,
+                    cli_proxy_api_key=CLI_PROXY_API_KEY or "unset", retrieval=False)
+    llm.set_provider(LLM_PROVIDER, LLM_MODEL)
+    if args.simulate:
+        fake = SimpleNamespace(chat=SimpleNamespace(completions=_SimulatedCompletions()))
+        llm._get_client = lambda: fake
+
+    print(f"{'path':<12} {'sections':>8} {'calls':>6} {'time s':>8} {'out chars':>10}")
+    for label, min_chars in (("single", 0), ("map-reduce", 1)):
+        results = []
+        for _ in range(args.runs):
+            if args.simulate:
+                llm._get_client().chat.completions.calls = 0
+            start = time.perf_counter()
+            out = await llm.format_document(raw_text=text, doc_type=args.type,
+                                            map_reduce_min_chars=min_chars,
+                                            map_concurrency=args.concurrency)
+            results.append(time.perf_counter() - start)
+        stats = llm.last_format_stats
+        calls = llm._get_client().chat.completions.calls if args.simulate else "-"
+        print(f"{label:<12} {stats['sections']:>8} {calls:>6} {min(results):>8.2f} {len(out):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="PDF/DOC/DOCX document")
+    parser.add_argument("--type", choices=("profile", "job"), default="profile")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=1, help="Best of N per path")
+    parser.add_argument("--simulate", action="store_true", help="Latency model instead of API calls")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
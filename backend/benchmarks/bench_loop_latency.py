@@ -0,0 +1,85 @@
+"""
+Benchmark: event-loop latency while Whisper decodes, in-process vs worker processes.
+
+Loads the model the way the backend does (preload_model), then decodes a
+clip repeatedly from two concurrent "streams" (like mic + system) while
+LoopLagMonitor measures how late the event loop wakes up — the delay SSE
+delivery and audio pumping would see. Runs once with decoding in
+asyncio.to_thread threads (WHISPER_PROCESS_WORKERS=0) and once per
+requested worker count. Reports:
+  - load time (s) and wall time for all decodes (s)
+  - loop lag mean / p99 / max (ms)
+
+The clip is the bundled Whisper tuning clip, or a 16kHz WAV given with --clip.
+
+Usage (from backend/):
+    python benchmarks/bench_loop_latency.py
+    python benchmarks/bench_loop_latency.py --model large-v3-turbo-q5_0 --workers 1 2 --decodes 10
+    python benchmarks/bench_loop_latency.py --engine faster-whisper --model small
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcription_whisper as tw  # noqa: E402
+import whisper_tuning  # noqa: E402
+from profiler import LoopLagMonitor  # noqa: E402
+
+
+async def run_mode(args, workers: int, clip) -> dict:
+    tw.set_process_workers(workers)
+    key = tw.model_key(args.model, args.engine)
+    start = time.perf_counter()
+    await tw.preload_model(args.model, engine=args.engine)
+    load_s = time.perf_counter() - start
+    model = tw.acquire_model(key)
+
+    async def stream():
+        for _ in range(args.decodes):
+            async with tw._engine_lock(args.engine, model):
+                await asyncio.to_thread(tw._decode, args.engine, model, clip)
+
+    monitor = LoopLagMonitor(interval=0.01, window=100000)
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(stream(), stream())
+    decode_s = time.perf_counter() - start
+    await monitor.stop()
+
+    tw.release_model(key)
+    tw.shutdown_workers()
+    tw._model_cache.clear()
+    tw._model_rss.clear()
+    return {"load_s": load_s, "decode_s": decode_s, **monitor.stats()}
+
+
+async def run(args):
+    tw.set_thread_tuning(args.threads, autotune=False)
+    clip = whisper_tuning.load_clip(args.clip)
+    print(f"{args.engine} {args.model}: 2 streams x {args.decodes} decodes of {len(clip) / 16000:.1f}s\n")
+    print(f"{'mode':<12} {'load s':>7} {'decode s':>9} {'lag mean':>9} {'lag p99':>8} {'lag max':>8}")
+    for workers in [0] + args.workers:
+        r = await run_mode(args, workers, clip)
+        label = "in-process" if workers == 0 else f"{workers} worker{'s' if workers > 1 else ''}"
+        print(f"{label:<12} {r['load_s']:>7.1f} {r['decode_s']:>9.1f} {r['mean_ms']:>9.2f} "
+              f"{r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", default=tw.ENGINE_WHISPERCPP, choices=tw.ENGINES)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", nargs="+", type=int, default=[2], help="Worker counts to compare")
+    parser.add_argument("--decodes", type=int, default=5, help="Decodes per stream")
+    parser.add_argument("--threads", type=int, default=0, help="n_threads (0 = tuned/default)")
+    parser.add_argument("--clip", help="16kHz WAV instead of the bundled tuning clip")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
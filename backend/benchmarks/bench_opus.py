@@ -0,0 +1,98 @@
+"""
+Benchmark: Opus encoding cost vs bytes saved for Deepgram upstream chunks.
+
+Encodes 100ms int16 chunks (as produced by AudioCapture) with OggOpusEncoder
+at several bitrates and reports per-chunk CPU time and bytes on the wire
+compared with raw linear16.
+
+Usage (from backend/):
+    python benchmarks/bench_opus.py                  # synthetic speech-like signal
+    python benchmarks/bench_opus.py recording.wav    # 16kHz mono/stereo int16 WAV
+"""
+
+import os
+import statistics
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ogg_opus import OggOpusEncoder, is_available  # noqa: E402
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 1600  # 100ms
+BITRATES = [16000, 24000, 32000, 48000]
+
+
+def synthetic_speech(seconds: float, channels: int) -> np.ndarray:
+    """Voiced harmonics with a syllable-rate envelope plus pauses and noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.3)
+    signal = 6000 * voiced * envelope + 200 * rng.standard_normal(t.size)
+    mono = np.clip(signal, -32768, 32767).astype(np.int16)
+    if channels == 1:
+        return mono
+    # Second channel: delayed, quieter copy (like mic + system)
+    other = np.roll(mono, 4000) // 3
+    return np.column_stack((mono, other)).ravel()
+
+
+def load_wav(path: str) -> tuple[np.ndarray, int]:
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2 or w.getframerate() != SAMPLE_RATE:
+            raise SystemExit("WAV must be 16-bit PCM at 16kHz")
+        return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16), w.getnchannels()
+
+
+def bench(samples: np.ndarray, channels: int, bitrate: int) -> dict:
+    encoder = OggOpusEncoder(sample_rate=SAMPLE_RATE, channels=channels, bitrate=bitrate)
+    encoder.encode(b"")  # Emit headers outside the timed loop
+    step = CHUNK_SAMPLES * channels
+    times, sizes = [], []
+    for i in range(0, samples.size - step + 1, step):
+        chunk = samples[i:i + step].tobytes()
+        t0 = time.perf_counter()
+        out = encoder.encode(chunk)
+        times.append(time.perf_counter() - t0)
+        sizes.append(len(out))
+    raw = step * 2
+    return {
+        "chunks": len(times),
+        "mean_us": statistics.mean(times) * 1e6,
+        "p95_us": sorted(times)[int(len(times) * 0.95)] * 1e6,
+        "bytes": statistics.mean(sizes),
+        "raw": raw,
+        "cpu_pct": statistics.mean(times) / 0.1 * 100,
+    }
+
+
+def main():
+    if not is_available():
+        raise SystemExit("opuslib / libopus not available (pip install opuslib; brew install opus)")
+
+    if len(sys.argv) > 1:
+        samples, channels = load_wav(sys.argv[1])
+        cases = [(samples, channels)]
+    else:
+        cases = [(synthetic_speech(30, 1), 1), (synthetic_speech(30, 2), 2)]
+
+    print(f"{'ch':>2} {'bitrate':>8} {'chunks':>6} {'mean µs':>8} {'p95 µs':>8} "
+          f"{'CPU %':>6} {'bytes':>7} {'raw':>6} {'saved':>6} {'kbit/s':>7}")
+    for samples, channels in cases:
+        for bitrate in BITRATES:
+            r = bench(samples, channels, bitrate)
+            saved = 1 - r["bytes"] / r["raw"]
+            print(f"{channels:>2} {bitrate:>8} {r['chunks']:>6} {r['mean_us']:>8.0f} {r['p95_us']:>8.0f} "
+                  f"{r['cpu_pct']:>6.2f} {r['bytes']:>7.0f} {r['raw']:>6} {saved:>6.1%} "
+                  f"{r['bytes'] * 8 / 100:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
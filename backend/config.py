@@ -19,12 +19,30 @@ SAMPLE_RATE = 16000
 CHANNELS = 1
 AUDIO_DTYPE = "int16"
 CHUNK_DURATION_MS = 100
+# Capture queue bound per stream (seconds of audio) and what gives way when it is full:
+# "drop_oldest", "drop_silence" (silent chunks first) or "downsample" (oldest chunks kept at 8kHz)
+AUDIO_QUEUE_SECONDS = float(os.getenv("AUDIO_QUEUE_SECONDS", "10"))
+AUDIO_QUEUE_POLICY = os.getenv("AUDIO_QUEUE_POLICY", "drop_oldest")
+# Suppress interviewer audio leaking from the speakers into the mic (no headphones)
+ECHO_GATE = os.getenv("ECHO_GATE", "false").lower() in ("1", "true", "yes")
+# Archive both channels while recording: "opus" (Ogg, needs opuslib) or "flac"
+# (needs soundfile), in segments aligned to wall-clock multiples of their length
+RECORDING_ARCHIVE = os.getenv("RECORDING_ARCHIVE", "false").lower() in ("1", "true", "yes")
+RECORDING_DIR = os.getenv("RECORDING_DIR", str(Path.home() / ".axel-assistant" / "recordings"))
+RECORDING_FORMAT = os.getenv("RECORDING_FORMAT", "opus")
+RECORDING_SEGMENT_SECONDS = int(os.getenv("RECORDING_SEGMENT_SECONDS", "60"))
+RECORDING_OPUS_BITRATE = int(os.getenv("RECORDING_OPUS_BITRATE", "32000"))
 
 # Deepgram settings
 DEEPGRAM_MODEL = "nova-3"
 DEEPGRAM_LANGUAGE = "ru"
 DEEPGRAM_ENCODING = "linear16"
 DEEPGRAM_ENDPOINTING = 300
+# One 2-channel connection (mic + system) instead of two WebSockets
+DEEPGRAM_MULTICHANNEL = os.getenv("DEEPGRAM_MULTICHANNEL", "false").lower() in ("1", "true", "yes")
+# Compress upstream audio to Ogg Opus (requires opuslib + libopus)
+DEEPGRAM_OPUS = os.getenv("DEEPGRAM_OPUS", "false").lower() in ("1", "true", "yes")
+DEEPGRAM_OPUS_BITRATE = int(os.getenv("DEEPGRAM_OPUS_BITRATE", "24000"))
 
 # LLM settings — defaults (can be changed at runtime via /settings)
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")  # "openai" or "claude"
@@ -32,6 +50,17 @@ LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 LLM_MAX_TOKENS = 2048
 LLM_TEMPERATURE = 0.3
 
+# Retrieval over profile/job: send top-k relevant snippets instead of the whole
+# documents once they are longer than PROMPT_RETRIEVAL_MIN_CHARS together
+PROMPT_RETRIEVAL = os.getenv("PROMPT_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+PROMPT_RETRIEVAL_TOP_K = int(os.getenv("PROMPT_RETRIEVAL_TOP_K", "4"))
+PROMPT_RETRIEVAL_MIN_CHARS = int(os.getenv("PROMPT_RETRIEVAL_MIN_CHARS", "3000"))
+
+# Uploaded documents longer than this (extracted text) are formatted map-reduce:
+# sections condensed concurrently (DOC_MAP_CONCURRENCY calls at once), then merged
+DOC_MAP_REDUCE_MIN_CHARS = int(os.getenv("DOC_MAP_REDUCE_MIN_CHARS", "12000"))
+DOC_MAP_CONCURRENCY = int(os.getenv("DOC_MAP_CONCURRENCY", "4"))
+
 # CLIProxyAPI settings (for Claude via Max subscription)
 CLI_PROXY_URL = os.getenv("CLI_PROXY_URL", "http://localhost:8317/v1")
 CLI_PROXY_API_KEY = os.getenv("CLI_PROXY_API_KEY", "")  # Must match api-keys in cliproxyapi.conf
@@ -46,9 +75,40 @@ CLAUDE_MODEL_LABELS = {
 }
 
 # Transcription settings — defaults (can be changed at runtime via /settings)
-TRANSCRIPTION_PROVIDER = os.getenv("TRANSCRIPTION_PROVIDER", "whisper")  # "deepgram" or "whisper"
+# "deepgram", "whisper" (whisper.cpp, Metal) or "faster-whisper" (CTranslate2 int8, CPU-only hosts)
+TRANSCRIPTION_PROVIDER = os.getenv("TRANSCRIPTION_PROVIDER", "whisper")
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "large-v3-turbo")
 WHISPER_MODELS = ["tiny", "base", "small", "medium", "large-v3", "large-v3-turbo"]
+# Quantized GGML variants published in ggerganov/whisper.cpp (whisper.cpp engine only):
+# less memory and faster on CPU at a small accuracy cost — compare with benchmarks/bench_asr.py
+WHISPER_QUANTIZED_MODELS = [
+    "tiny-q5_1", "tiny-q8_0", "base-q5_1", "base-q8_0", "small-q5_1", "small-q8_0",
+    "medium-q5_0", "medium-q8_0", "large-v3-q5_0", "large-v3-turbo-q5_0", "large-v3-turbo-q8_0",
+]
+# Memory budget for loaded Whisper models (MB, 0 = unlimited): least recently
+# used models not attached to a running transcriber are evicted to stay within it
+WHISPER_MEMORY_BUDGET_MB = int(os.getenv("WHISPER_MEMORY_BUDGET_MB", "4096"))
+# Whisper decode threads: 0 = autotuned once per (model, host) and saved to
+# ~/.axel-assistant/whisper_tuning.json; WHISPER_TUNE_CLIP = 16kHz speech WAV to
+# tune on instead of the bundled assets/tune_clip.wav (first 12s are used)
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))
+WHISPER_AUTOTUNE = os.getenv("WHISPER_AUTOTUNE", "true").lower() in ("1", "true", "yes")
+WHISPER_TUNE_CLIP = os.getenv("WHISPER_TUNE_CLIP", "")
+# Run Whisper in N isolated worker processes (0 = in the backend process); N concurrent decodes
+WHISPER_PROCESS_WORKERS = int(os.getenv("WHISPER_PROCESS_WORKERS", "0"))
+
+# Screenshot capture backend: "auto" (screencapture CLI + Pillow fallback on macOS),
+# "cli", "pillow" or "memory" (in-memory test image, for Linux / tests)
+SCREENSHOT_BACKEND = os.getenv("SCREENSHOT_BACKEND", "auto")
+# Background pre-capture while recording: the hotkey uses an image at most
+# interval + 0.2s old (a lower rate costs less CPU but falls back to a fresh capture more often)
+SCREENSHOT_PRECAPTURE = os.getenv("SCREENSHOT_PRECAPTURE", "false").lower() in ("1", "true", "yes")
+SCREENSHOT_PRECAPTURE_INTERVAL = float(os.getenv("SCREENSHOT_PRECAPTURE_INTERVAL", "0.3"))
+# Local OCR pre-pass (tesseract): confident text is sent instead of the image
+SCREENSHOT_OCR = os.getenv("SCREENSHOT_OCR", "false").lower() in ("1", "true", "yes")
+OCR_LANGUAGES = os.getenv("OCR_LANGUAGES", "rus+eng")
+OCR_MIN_CONFIDENCE = 80.0  # Mean word confidence (0-100) to trust the text
+OCR_MIN_WORDS = 5
 
 # Server settings
 BACKEND_HOST = "127.0.0.1"
@@ -6,6 +6,7 @@ to stay within token limits.
 """
 
 from dataclasses import dataclass, field
+from typing import Optional
 import time
 
 
@@ -58,14 +59,21 @@ class ContextManager:
             return self.exchanges[-1].answer
         return ""
 
-    def add_transcript_line(self, source: str, speaker: int, text: str):
-        """Append a transcript line to the full log."""
-        self.full_transcript.append({
+    def add_transcript_line(self, source: str, speaker: int, text: str, meta: Optional[dict] = None):
+        """Append a transcript line to the full log.
+
+        meta (from the transcriber): start/end of the speech (wall clock),
+        confidence, no_speech_prob and per-segment/word detail, stored on the line.
+        """
+        line = {
             "source": source,
             "speaker": speaker,
             "text": text,
             "timestamp": time.time(),
-        })
+        }
+        if meta:
+            line.update(meta)
+        self.full_transcript.append(line)
         # Accumulate mic speech for context
         if source == "mic" and text.strip():
             self._mic_buffer.append(text.strip())
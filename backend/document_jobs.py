@@ -0,0 +1,137 @@
+"""
+Background processing of uploaded documents (resume / job description).
+
+Uploads are keyed by SHA-256 of the file bytes + doc_type: a re-upload of
+the same file returns the cached markdown immediately, without an LLM call.
+New uploads become jobs processed one at a time by a background worker;
+progress is reported through an async on_update(job) callback (→ SSE).
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path.home() / ".axel-assistant" / "cache" / "documents"
+MAX_FINISHED_JOBS = 50
+
+
+def cache_key(file_bytes: bytes, doc_type: str) -> str:
+    return f"{hashlib.sha256(file_bytes).hexdigest()}-{doc_type}"
+
+
+class DocumentCache:
+    """Processed markdown on disk, one file per cache key."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.cache_dir / f"{key}.md"
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f"{key}.md.tmp"
+        tmp.write_text(content, encoding="utf-8")
+        tmp.replace(self.cache_dir / f"{key}.md")
+
+
+@dataclass
+class DocumentJob:
+    id: str
+    doc_type: str
+    filename: str
+    cache_key: str
+    status: str = "queued"  # queued / running / done / error
+    stage: str = "queued"
+    progress: float = 0.0  # 0..1
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# process(job, file_bytes, report) -> markdown; report(stage, progress) is awaited by the processor
+Processor = Callable[[DocumentJob, bytes, Callable[[str, float], Awaitable[None]]], Awaitable[str]]
+
+
+class DocumentJobQueue:
+    def __init__(
+        self,
+        process: Processor,
+        on_update: Callable[[DocumentJob], Awaitable[None]],
+        cache: Optional[DocumentCache] = None,
+    ):
+        self._process = process
+        self._on_update = on_update
+        self.cache = cache or DocumentCache()
+        self.jobs: dict[str, DocumentJob] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def submit(self, file_bytes: bytes, filename: str, doc_type: str) -> DocumentJob:
+        """Queue a document; returns immediately with the job."""
+        job = DocumentJob(
+            id=uuid.uuid4().hex[:12],
+            doc_type=doc_type,
+            filename=filename,
+            cache_key=cache_key(file_bytes, doc_type),
+        )
+        self.jobs[job.id] = job
+        self._prune()
+        self._queue.put_nowait((job, file_bytes))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        logger.info(f"Document job {job.id} queued: {filename} ({doc_type})")
+        return job
+
+    def get(self, job_id: str) -> Optional[DocumentJob]:
+        return self.jobs.get(job_id)
+
+    async def _run(self):
+        while not self._queue.empty():
+            job, file_bytes = await self._queue.get()
+            await self._execute(job, file_bytes)
+
+    async def _execute(self, job: DocumentJob, file_bytes: bytes):
+        async def report(stage: str, progress: float):
+            job.stage = stage
+            job.progress = max(job.progress, min(1.0, progress))
+            await self._on_update(job)
+
+        job.status = "running"
+        start = time.perf_counter()
+        try:
+            await report("started", 0.0)
+            result = await self._process(job, file_bytes, report)
+            self.cache.put(job.cache_key, result)
+            job.result = result
+            job.status = "done"
+            job.stage = "done"
+            job.progress = 1.0
+            logger.info(f"Document job {job.id} done in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            job.status = "error"
+            job.error = str(e)
+            logger.error(f"Document job {job.id} failed: {e}")
+        job.finished_at = time.time()
+        await self._on_update(job)
+
+    def _prune(self):
+        """Forget the oldest finished jobs."""
+        finished = [j for j in self.jobs.values() if j.status in ("done", "error")]
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
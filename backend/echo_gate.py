@@ -0,0 +1,125 @@
+"""
+Echo gate: suppress interviewer audio that leaks from the speakers into the mic.
+
+Without headphones the system stream (BlackHole) is picked up again by the
+microphone a few tens of milliseconds later, so the same speech is
+transcribed twice and lands in the candidate's transcript. The system stream
+is the reference: every 100ms mic chunk is cross-correlated (FFT, all lags
+at once) against the last REFERENCE_SECONDS of system audio. If the
+normalized correlation peak is high enough, the best-matching reference
+window is scaled by the least-squares gain and subtracted, and the search is
+repeated on the residual for up to MAX_TAPS delays (the direct path plus
+the strongest room reflections). If the cancelled taps explain most of the
+chunk's energy it is echo-only and is gated to silence, which the VAD then
+skips; otherwise (the candidate speaking over the interviewer) the residual
+is passed on. Chunks with weak correlation pass through untouched.
+
+Thread-safe: push_reference runs in the system audio callback, process in
+the mic callback.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from audio_features import SILENCE_RMS
+
+SAMPLE_RATE = 16000
+REFERENCE_SECONDS = 1.0  # Max speaker→mic delay searched (device + acoustic latency)
+NCC_THRESHOLD = 0.35  # Normalized cross-correlation peak that counts as echo
+MAX_TAPS = 4  # Delays cancelled per chunk
+ECHO_RESIDUAL_RATIO = 0.35  # Residual/original energy at or below which the chunk is gated
+MIN_SPEECH_CHUNKS = 5  # A suppressed run this long would have been a decode
+
+
+def _rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(x * x))) if x.size else 0.0
+
+
+class EchoGate:
+    def __init__(self, reference_seconds: float = REFERENCE_SECONDS, threshold: float = NCC_THRESHOLD):
+        self.threshold = threshold
+        self._ref = np.zeros(int(reference_seconds * SAMPLE_RATE), dtype=np.float32)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.chunks = 0
+        self.echo_chunks = 0  # Correlated with the reference, echo subtracted
+        self.suppressed_chunks = 0  # Speech before, silence after
+        self.decodes_saved = 0  # Suppressed runs of >= MIN_SPEECH_CHUNKS
+        self.cpu_seconds = 0.0
+        self._suppressed_run = 0
+
+    def push_reference(self, raw: bytes) -> None:
+        """Append a system-stream chunk (16kHz int16) to the reference window."""
+        chunk = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+        with self._lock:
+            n = min(len(chunk), len(self._ref))
+            self._ref[:-n] = self._ref[n:]
+            self._ref[-n:] = chunk[-n:]
+
+    def process(self, raw: bytes) -> bytes:
+        """Return the mic chunk with correlated reference content removed."""
+        start = time.thread_time()
+        x = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+        with self._lock:
+            ref = self._ref.copy()
+        out = raw
+        before = _rms(x)
+        after = before
+        if before >= SILENCE_RMS and len(x) < len(ref) and _rms(ref) >= SILENCE_RMS:
+            residual = self._cancel(x, ref)
+            if residual is not None:
+                self.echo_chunks += 1
+                if np.dot(residual, residual) <= ECHO_RESIDUAL_RATIO * np.dot(x, x):
+                    residual = np.zeros_like(x)
+                after = _rms(residual)
+                out = np.clip(residual, -32768, 32767).astype(np.int16).tobytes()
+        self._count(before, after)
+        self.chunks += 1
+        self.cpu_seconds += time.thread_time() - start
+        return out
+
+    def _cancel(self, x: np.ndarray, ref: np.ndarray):
+        """x minus up to MAX_TAPS scaled reference windows, or None if the first doesn't match."""
+        m, n = len(x), len(ref)
+        size = 1 << (n + m - 1).bit_length()
+        ref_spectrum = np.fft.rfft(ref, size)
+        energy = np.cumsum(np.concatenate(([0.0], ref.astype(np.float64) ** 2)))
+        window_energy = energy[m:] - energy[:-m]
+        active = window_energy >= SILENCE_RMS ** 2 * m  # Silent reference windows can't be the echo
+        window_energy = np.where(active, window_energy, np.inf)
+        residual = x
+        for tap in range(MAX_TAPS):
+            residual_energy = float(np.dot(residual, residual))
+            if residual_energy < 1e-9:
+                break
+            # corr[k] = sum_i ref[k + i] * residual[i] for every lag k at once
+            corr = np.fft.irfft(ref_spectrum * np.conj(np.fft.rfft(residual, size)), size)[:n - m + 1]
+            ncc = corr / np.sqrt(window_energy * residual_energy)
+            lag = int(np.argmax(np.abs(ncc)))
+            if abs(ncc[lag]) < self.threshold:
+                if tap == 0:
+                    return None
+                break
+            residual = residual - corr[lag] / window_energy[lag] * ref[lag:lag + m]
+        return residual
+
+    def _count(self, before: float, after: float) -> None:
+        if before >= SILENCE_RMS and after < SILENCE_RMS:
+            self.suppressed_chunks += 1
+            self._suppressed_run += 1
+            if self._suppressed_run == MIN_SPEECH_CHUNKS:
+                self.decodes_saved += 1
+        else:
+            self._suppressed_run = 0
+
+    def stats(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "echo_chunks": self.echo_chunks,
+            "suppressed_seconds": round(self.suppressed_chunks * 0.1, 1),
+            "decodes_saved": self.decodes_saved,
+            "cpu_ms_per_chunk": round(self.cpu_seconds * 1000 / self.chunks, 3) if self.chunks else 0.0,
+        }
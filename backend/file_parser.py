@@ -1,51 +1,300 @@
 """
-Extract text from DOC/DOCX files for LLM processing.
+Extract text from PDF/DOC/DOCX files for LLM processing.
 
-PDF files are sent directly to the LLM as base64 (no local parsing needed).
+PDF text is extracted locally with pypdf when it is installed; scanned PDFs
+(no text layer) and setups without pypdf fall back to sending the PDF to
+the LLM as base64. DOCX extraction keeps tables and page headers/footers,
+and marks Word headings as markdown so split_sections() can cut on them.
+
+DOCX is read straight from the zip: word/document.xml is parsed with a
+streaming iterparse and every finished body element is dropped, so memory
+stays bounded by the largest paragraph/table rather than the document.
+.doc goes through the first available converter: textutil (macOS),
+antiword, or LibreOffice headless.
+
+Extraction is CPU-bound and may shell out for seconds — call
+extract_text_async(), which runs it in a small process pool.
 """
 
+import asyncio
+import re
+import shutil
 import subprocess
 import tempfile
 import os
 import logging
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-
-from docx import Document
+from typing import Optional
+from xml.etree.ElementTree import iterparse, parse
 
 logger = logging.getLogger(__name__)
 
+MIN_PDF_TEXT_CHARS = 200  # Less than this → probably a scan, use the vision path
+SECTION_MAX_CHARS = 6000
+HEADING_RE = re.compile(r"^#{1,6}\s")
+DOC_CONVERT_TIMEOUT = 30  # seconds (LibreOffice cold start is slow)
+EXTRACT_WORKERS = 2
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_HEADING_STYLE_RE = re.compile(r"^(?:heading|заголовок)\s*(\d)$", re.IGNORECASE)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _docx_styles(zf: zipfile.ZipFile) -> dict[str, int]:
+    """styleId → heading level (0 = Title) from word/styles.xml."""
+    try:
+        root = parse(zf.open("word/styles.xml")).getroot()
+    except KeyError:
+        return {}
+    levels = {}
+    for style in root.iter(f"{W}style"):
+        style_id = style.get(f"{W}styleId", "")
+        name_el = style.find(f"{W}name")
+        name = name_el.get(f"{W}val", "") if name_el is not None else style_id
+        if name.lower() == "title":
+            levels[style_id] = 0
+            continue
+        m = _HEADING_STYLE_RE.match(name)
+        if m:
+            levels[style_id] = int(m.group(1))
+    return levels
+
+
+def _run_text(p) -> str:
+    """Text of a paragraph element (w:t, tabs and breaks)."""
+    parts = []
+    for el in p.iter():
+        if el.tag == f"{W}t":
+            parts.append(el.text or "")
+        elif el.tag == f"{W}tab":
+            parts.append("\t")
+        elif el.tag in (f"{W}br", f"{W}cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _paragraph_line(p, heading_levels: dict[str, int]) -> str:
+    text = _run_text(p).strip()
+    if not text:
+        return ""
+    style = p.find(f"{W}pPr/{W}pStyle")
+    level = heading_levels.get(style.get(f"{W}val")) if style is not None else None
+    if level is None:
+        return text
+    return "#" * min(max(level, 1), 6) + " " + text
+
+
+def _table_lines(tbl) -> list[str]:
+    rows = []
+    for tr in tbl.iterfind(f"{W}tr"):
+        cells = []
+        for tc in tr.iterfind(f"{W}tc"):
+            value = " ".join(" ".join(_run_text(p) for p in tc.iter(f"{W}p")).split())
+            cells.append(value)
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return rows
+
+
+def _iter_body_lines(source, heading_levels: dict[str, int]):
+    """Stream lines from a document/header/footer XML part.
+
+    Only top-level elements (direct children of w:body, w:hdr or w:ftr) are
+    rendered, after they are fully parsed; they are then removed from the
+    tree so memory does not grow with document length.
+    """
+    depth = 0
+    container = None
+    for event, el in iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if el.tag in (f"{W}body", f"{W}hdr", f"{W}ftr"):
+                container = el
+            continue
+        depth -= 1
+        if container is None or el is container:
+            continue
+        # Direct child of the container: body is at depth 2 in document.xml, hdr/ftr at depth 1
+        if depth == (2 if container.tag == f"{W}body" else 1):
+            if el.tag == f"{W}p":
+                line = _paragraph_line(el, heading_levels)
+                if line:
+                    yield line
+            elif el.tag == f"{W}tbl":
+                yield from _table_lines(el)
+            else:
+                # Content controls (w:sdt) and the like: flatten their paragraphs
+                for p in el.iter(f"{W}p"):
+                    line = _paragraph_line(p, heading_levels)
+                    if line:
+                        yield line
+            container.remove(el)
+
 
 def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract text from a .docx file using python-docx."""
-    doc = Document(BytesIO(file_bytes))
-    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    return "\n".join(paragraphs)
+    """Extract text from a .docx file: headers/footers, paragraphs and tables."""
+    lines: list[str] = []
+    with zipfile.ZipFile(BytesIO(file_bytes)) as zf:
+        heading_levels = _docx_styles(zf)
+
+        seen: set[str] = set()
+        names = sorted(n for n in zf.namelist() if re.match(r"word/(header|footer)\d*\.xml$", n))
+        for name in names:
+            with zf.open(name) as part:
+                for line in _iter_body_lines(part, heading_levels):
+                    if line not in seen:
+                        seen.add(line)
+                        lines.append(line)
+
+        with zf.open("word/document.xml") as document:
+            lines.extend(_iter_body_lines(document, heading_levels))
+    return "\n".join(lines)
+
+
+def _doc_converters(path: str, outdir: str) -> list[tuple[str, list[str], Optional[str]]]:
+    """(name, command, output file or None for stdout) for installed .doc converters."""
+    converters = []
+    if shutil.which("textutil"):
+        converters.append(("textutil", ["textutil", "-convert", "txt", "-stdout", path], None))
+    if shutil.which("antiword"):
+        converters.append(("antiword", ["antiword", "-w", "0", path], None))
+    office = shutil.which("soffice") or shutil.which("libreoffice")
+    if office:
+        out = os.path.join(outdir, os.path.splitext(os.path.basename(path))[0] + ".txt")
+        converters.append(("libreoffice", [
+            office, "--headless", "--norestore", "--convert-to", "txt:Text (encoded):UTF8",
+            "--outdir", outdir, path,
+        ], out))
+    return converters
 
 
 def extract_text_from_doc(file_bytes: bytes) -> str:
-    """Extract text from a .doc file using macOS built-in textutil."""
-    with tempfile.NamedTemporaryFile(suffix=".doc", delete=False) as tmp:
-        tmp.write(file_bytes)
-        tmp_path = tmp.name
+    """Extract text from a .doc file (textutil → antiword → LibreOffice headless)."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "document.doc")
+        with open(path, "wb") as f:
+            f.write(file_bytes)
+
+        converters = _doc_converters(path, tmpdir)
+        if not converters:
+            raise RuntimeError("Нет конвертера для .doc: установите antiword или LibreOffice")
+
+        errors = []
+        for name, cmd, out_path in converters:
+            try:
+                result = subprocess.run(cmd, capture_output=True, timeout=DOC_CONVERT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                errors.append(f"{name}: timeout")
+                continue
+            if result.returncode != 0:
+                errors.append(f"{name}: {result.stderr.decode(errors='replace')[:200]}")
+                continue
+            if out_path:
+                with open(out_path, encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            else:
+                text = result.stdout.decode("utf-8", errors="replace")
+            if text.strip():
+                return text.strip()
+            errors.append(f"{name}: empty output")
+        raise RuntimeError(f".doc conversion failed: {'; '.join(errors)}")
 
+
+def pdf_text_available() -> bool:
+    """True if pypdf is installed (local PDF text extraction)."""
     try:
-        result = subprocess.run(
-            ["textutil", "-convert", "txt", "-stdout", tmp_path],
-            capture_output=True, text=True, timeout=10,
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"textutil failed: {result.stderr}")
-        return result.stdout.strip()
-    finally:
-        os.unlink(tmp_path)
+        import pypdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    """Extract the text layer of a PDF with pypdf ("" for scanned documents)."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(BytesIO(file_bytes))
+    pages = []
+    for page in reader.pages:
+        text = (page.extract_text() or "").strip()
+        if text:
+            pages.append(text)
+    text = "\n\n".join(pages)
+    if len(text) < MIN_PDF_TEXT_CHARS:
+        logger.info(f"PDF has almost no text layer ({len(text)} chars) — probably a scan")
+        return ""
+    return text
 
 
 def extract_text(file_bytes: bytes, filename: str) -> str:
-    """Extract text from DOC/DOCX by file extension."""
+    """Extract text from PDF/DOC/DOCX by file extension."""
     ext = os.path.splitext(filename)[1].lower()
     if ext == ".docx":
         return extract_text_from_docx(file_bytes)
     elif ext == ".doc":
         return extract_text_from_doc(file_bytes)
+    elif ext == ".pdf":
+        return extract_text_from_pdf(file_bytes)
     else:
         raise ValueError(f"Unsupported format for text extraction: {ext}")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn on every platform (fork would copy the server's threads and
+        # sockets); children import only main.py — inert, see there — and this module
+        _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def extract_text_async(file_bytes: bytes, filename: str) -> str:
+    """extract_text() in the process pool (keeps the event loop and GIL free)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), extract_text, file_bytes, filename)
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def split_sections(text: str, max_chars: int = SECTION_MAX_CHARS) -> list[str]:
+    """Split a document into sections of at most ~max_chars.
+
+    Cuts at markdown headings first, then packs paragraphs (blank-line or
+    single-line blocks) into sections; an oversized paragraph is cut hard.
+    """
+    blocks: list[str] = []
+    current: list[str] = []
+    for line in text.splitlines():
+        if HEADING_RE.match(line) and current:
+            blocks.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+
+    sections: list[str] = []
+    buf = ""
+    for block in blocks:
+        for para in re.split(r"\n\s*\n|\n", block) if len(block) > max_chars else [block]:
+            while len(para) > max_chars:
+                if buf:
+                    sections.append(buf)
+                    buf = ""
+                sections.append(para[:max_chars])
+                para = para[max_chars:]
+            if buf and len(buf) + len(para) + 1 > max_chars:
+                sections.append(buf)
+                buf = ""
+            buf = f"{buf}\n{para}" if buf else para
+    if buf.strip():
+        sections.append(buf)
+    return [s.strip() for s in sections if s.strip()]
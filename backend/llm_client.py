@@ -4,12 +4,27 @@ LLM streaming wrapper with multi-provider support.
 Providers:
 - openai: OpenAI API (GPT-4o, GPT-4o-mini) via API key
 - claude: Claude (Opus/Sonnet/Haiku) via CLIProxyAPI (Max subscription, OpenAI-compatible endpoint)
+
+Profile and job description: short documents are pasted into the system
+prompt whole. Once together they exceed retrieval_min_chars, they are
+indexed (BM25, see retrieval.py) and each question carries only the top-k
+relevant snippets, keeping the system prompt small and cacheable. A question
+with no good match (an opener like "Расскажи о себе") carries the first
+chunk of every section instead.
+
+Long uploaded documents are formatted map-reduce style: sections are
+condensed concurrently, then merged by one final call (format_document).
 """
 
+import asyncio
 import os
 import logging
+import time
 from openai import AsyncOpenAI
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Awaitable, Callable, Optional
+
+from file_parser import split_sections
+from retrieval import MIN_SCORE, DocumentIndex
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +33,15 @@ class LLMClient:
     # Models that don't support custom temperature (only default=1)
     NO_TEMPERATURE_MODELS = {"gpt-5-mini", "gpt-5-nano"}
 
-    def __init__(self, openai_api_key: str, cli_proxy_url: str, cli_proxy_api_key: str = ""):
+    def __init__(
+        self,
+        openai_api_key: str,
+        cli_proxy_url: str,
+        cli_proxy_api_key: str = "",
+        retrieval: bool = True,
+        retrieval_top_k: int = 4,
+        retrieval_min_chars: int = 3000,
+    ):
         # OpenAI client (direct API)
         self.openai_client = AsyncOpenAI(api_key=openai_api_key)
 
@@ -32,7 +55,14 @@ class LLMClient:
         self.provider = "openai"  # "openai" or "claude"
         self.model = "gpt-4o-mini"
 
+        # Retrieval over profile/job (rebuilt on every reload_system_prompt)
+        self.retrieval = retrieval
+        self.retrieval_top_k = retrieval_top_k
+        self.retrieval_min_chars = retrieval_min_chars
+        self._doc_index: Optional[DocumentIndex] = None
+
         self.system_prompt = self._build_system_prompt()
+        self.last_format_stats: Optional[dict] = None  # Path/timing of the last format_document()
 
     def _get_client(self) -> AsyncOpenAI:
         """Return the active client based on current provider."""
@@ -47,7 +77,7 @@ class LLMClient:
         logger.info(f"LLM switched to {provider} / {model}")
 
     def reload_system_prompt(self):
-        """Rebuild system prompt after profile/job file update."""
+        """Rebuild system prompt (and retrieval index) after profile/job file update."""
         self.system_prompt = self._build_system_prompt()
         logger.info("System prompt reloaded")
 
@@ -57,6 +87,19 @@ class LLMClient:
         job_desc = self._load_file("job_description.md",
                                    fallback="[Не указано]")
 
+        self._doc_index = None
+        if self.retrieval and len(profile) + len(job_desc) > self.retrieval_min_chars:
+            self._doc_index = DocumentIndex({"profile": profile, "job": job_desc})
+            logger.info(f"Profile/job indexed for retrieval: {len(self._doc_index.chunks)} chunks "
+                        f"({len(profile) + len(job_desc)} chars)")
+            # Keep only the lead section of each (name/role, company/position)
+            profile_lead = self._doc_index.lead("profile")
+            job_lead = self._doc_index.lead("job")
+            profile = (profile_lead.render() if profile_lead else "") + \
+                "\n\n(Остальное — релевантные фрагменты приводятся вместе с вопросом)"
+            job_desc = (job_lead.render() if job_lead else "") + \
+                "\n\n(Остальное — релевантные фрагменты приводятся вместе с вопросом)"
+
         return f"""Ты — невидимый AI-ассистент на техническом собеседовании. Твоя задача — помочь кандидату ответить на вопрос интервьюера.
 
 ПРАВИЛА:
@@ -100,16 +143,93 @@ class LLMClient:
         "Пиши на русском. Формат: заголовки ##, списки, без воды."
     )
 
+    MAP_PROMPT = (
+        "Это фрагмент {part} из {total} длинного документа ({kind}). "
+        "Выпиши из него все факты, важные для технического собеседования: "
+        "роли, компании, даты, проекты, стек, требования, задачи, цифры. "
+        "Кратко, списком, на русском, без вступлений. Если важного нет — ответь «—»."
+    )
+
     async def format_document(
         self,
         raw_text: str | None = None,
         pdf_b64: str | None = None,
         doc_type: str = "profile",
+        map_reduce_min_chars: int = 0,
+        map_concurrency: int = 4,
+        on_progress: Optional[Callable[[str, float], Awaitable[None]]] = None,
     ) -> str:
-        """Process uploaded document through LLM and return structured markdown."""
+        """Process uploaded document through LLM and return structured markdown.
+
+        Text longer than map_reduce_min_chars (0 = never) is split into
+        sections, each condensed concurrently (at most map_concurrency calls
+        in flight), and the notes are merged by one final formatting call.
+        Timing of the last call is kept in self.last_format_stats.
+        """
+        start = time.perf_counter()
+        prompt = self.PROFILE_PROMPT if doc_type == "profile" else self.JOB_PROMPT
+
+        sections = []
+        if raw_text and map_reduce_min_chars and len(raw_text) > map_reduce_min_chars:
+            sections = split_sections(raw_text)
+
+        if len(sections) > 1:
+            notes = await self._map_sections(sections, doc_type, map_concurrency, on_progress)
+            if on_progress:
+                await on_progress("merging", 0.8)
+            merged = "\n\n".join(f"### Фрагмент {i + 1}\n{n}" for i, n in enumerate(notes))
+            result = await self._format_call(prompt, raw_text=merged)
+            path = "map_reduce"
+        else:
+            result = await self._format_call(prompt, raw_text=raw_text, pdf_b64=pdf_b64)
+            path = "pdf" if pdf_b64 else "single"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_format_stats = {
+            "path": path,
+            "sections": max(len(sections), 1),
+            "input_chars": len(raw_text or ""),
+            "elapsed_ms": round(elapsed_ms),
+        }
+        logger.info(f"format_document ({doc_type}, {path}, {self.last_format_stats['sections']} sections): "
+                    f"{elapsed_ms:.0f}ms")
+        return result
+
+    async def _map_sections(
+        self,
+        sections: list[str],
+        doc_type: str,
+        concurrency: int,
+        on_progress: Optional[Callable[[str, float], Awaitable[None]]] = None,
+    ) -> list[str]:
+        """Condense every section concurrently; results in document order."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        kind = "резюме" if doc_type == "profile" else "описание вакансии"
+        done = 0
+
+        async def run(i: int, section: str) -> str:
+            nonlocal done
+            async with semaphore:
+                map_prompt = self.MAP_PROMPT.format(part=i + 1, total=len(sections), kind=kind)
+                notes = await self._format_call(map_prompt, raw_text=section, max_tokens=1024)
+            done += 1
+            if on_progress:
+                # Map stage spans 0.3..0.8 of the job
+                await on_progress("summarizing", 0.3 + 0.5 * done / len(sections))
+            return notes
+
+        return list(await asyncio.gather(*(run(i, s) for i, s in enumerate(sections))))
+
+    async def _format_call(
+        self,
+        prompt: str,
+        raw_text: str | None = None,
+        pdf_b64: str | None = None,
+        max_tokens: int = 2048,
+    ) -> str:
+        """One non-streaming formatting request (text, or PDF via the vision model)."""
         client = self._get_client()
         use_model = self.model
-        prompt = self.PROFILE_PROMPT if doc_type == "profile" else self.JOB_PROMPT
 
         if pdf_b64:
             # Send PDF directly to the model as base64 document
@@ -127,7 +247,7 @@ class LLMClient:
         params = dict(
             model=use_model,
             messages=messages,
-            max_completion_tokens=2048,
+            max_completion_tokens=max_tokens,
             stream=False,
         )
         if use_model not in self.NO_TEMPERATURE_MODELS:
@@ -136,6 +256,23 @@ class LLMClient:
         response = await client.chat.completions.create(**params)
         return response.choices[0].message.content or ""
 
+    def _relevant_snippets(self, question: str) -> str:
+        """Top-k profile/job snippets for the question ("" if retrieval is off).
+
+        Without a good match, an overview of both documents is sent instead."""
+        if not self._doc_index:
+            return ""
+        title = "Релевантное из профиля и вакансии"
+        chunks = self._doc_index.top_k(question, self.retrieval_top_k, min_score=MIN_SCORE)
+        if not chunks:
+            title = "Основное из профиля и вакансии"
+            chunks = self._doc_index.overview(self.retrieval_min_chars)
+        if not chunks:
+            return ""
+        labels = {"profile": "Профиль", "job": "Вакансия"}
+        parts = [f"{labels.get(c.source, c.source)} — {c.render()}" for c in chunks]
+        return f"{title}:\n" + "\n\n".join(parts) + "\n\n"
+
     def _get_vision_model(self) -> str:
         """Return the best vision-capable model for the current provider."""
         if self.provider == "claude":
@@ -148,8 +285,22 @@ class LLMClient:
         context_history: list[dict],
         model: str | None = None,
         screenshot_b64: Optional[str] = None,
+        screen_analysis: Optional[str] = None,
+        screenshot_is_region: bool = False,
+        screen_text: Optional[str] = None,
+        usage: Optional[dict] = None,
     ) -> AsyncGenerator[str, None]:
-        """Stream answer chunks from the active provider."""
+        """Stream answer chunks from the active provider.
+
+        screen_analysis: earlier analysis of the screen, sent as text — either
+        instead of an unchanged screenshot, or as context for a cropped region
+        (screenshot_is_region=True).
+        screen_text: OCR text of the screenshot, sent instead of the image
+        to the regular (non-vision) model.
+        usage: dict filled with this request's prompt_tokens/completion_tokens
+        once the provider reports them (per call, so overlapping generations
+        don't see each other's numbers).
+        """
         client = self._get_client()
         use_model = model or self.model
 
@@ -167,13 +318,28 @@ class LLMClient:
                 messages.append({"role": "assistant",
                                  "content": answer_content})
 
-        # Current question
-        if screenshot_b64:
+        # Current question (with retrieved profile/job snippets, if indexed)
+        snippets = self._relevant_snippets(question)
+        if screen_text:
+            # OCR'd screenshot: plain text, no vision model needed
+            note = ""
+            if screenshot_is_region and screen_analysis:
+                note = f"\n\nЭто изменившаяся часть экрана. Анализ экрана до изменений:\n{screen_analysis}"
+            messages.append({"role": "user",
+                             "content": f"{snippets}Вопрос интервьюера: {question}\n\n"
+                                        f"Текст с экрана (распознан OCR, возможны ошибки):\n"
+                                        f"```\n{screen_text}\n```{note}"})
+        elif screenshot_b64:
+            if screenshot_is_region and screen_analysis:
+                screen_note = ("На скриншоте — изменившаяся часть экрана. "
+                               f"Анализ экрана до изменений:\n{screen_analysis}")
+            else:
+                screen_note = "На скриншоте — задача или код."
             messages.append({
                 "role": "user",
                 "content": [
                     {"type": "text",
-                     "text": f"Вопрос интервьюера: {question}\n\nНа скриншоте — задача или код."},
+                     "text": f"{snippets}Вопрос интервьюера: {question}\n\n{screen_note}"},
                     {"type": "image_url", "image_url": {
                         "url": f"data:image/jpeg;base64,{screenshot_b64}",
                         "detail": "high",
@@ -181,9 +347,14 @@ class LLMClient:
                 ],
             })
             use_model = self._get_vision_model()
+        elif screen_analysis:
+            # Screen unchanged since the last screenshot: reuse its analysis, no vision call
+            messages.append({"role": "user",
+                             "content": f"{snippets}Вопрос интервьюера: {question}\n\n"
+                                        f"Экран не изменился с прошлого скриншота. Его анализ:\n{screen_analysis}"})
         else:
             messages.append({"role": "user",
-                             "content": f"Вопрос интервьюера: {question}"})
+                             "content": f"{snippets}Вопрос интервьюера: {question}"})
 
         params = dict(
             model=use_model,
@@ -193,10 +364,20 @@ class LLMClient:
         )
         if use_model not in self.NO_TEMPERATURE_MODELS:
             params["temperature"] = 0.3
+        if self.provider == "openai":
+            # Final chunk carries token usage (CLIProxyAPI doesn't support stream_options)
+            params["stream_options"] = {"include_usage": True}
 
         stream = await client.chat.completions.create(**params)
 
         async for chunk in stream:
+            if chunk.usage and usage is not None:
+                usage.update(
+                    prompt_tokens=chunk.usage.prompt_tokens,
+                    completion_tokens=chunk.usage.completion_tokens,
+                )
+            if not chunk.choices:
+                continue
             delta = chunk.choices[0].delta
             if delta.content:
                 yield delta.content
@@ -0,0 +1,92 @@
+"""
+Local OCR pre-pass for screenshots (Tesseract via subprocess).
+
+Most screenshots are code or problem statements: if Tesseract reads them
+with high confidence, the text is sent to a regular (non-vision) model
+instead of an image. Low-confidence results fall back to the image path.
+
+Requires the `tesseract` binary with rus + eng data:
+    brew install tesseract tesseract-lang
+"""
+
+import io
+import logging
+import shutil
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+OCR_TIMEOUT = 15  # seconds
+
+
+@dataclass
+class OcrResult:
+    text: str
+    confidence: float  # Mean word confidence, 0-100 (length-weighted)
+    words: int
+    elapsed_ms: float
+
+
+def is_available() -> bool:
+    """True if the tesseract binary is on PATH."""
+    return shutil.which("tesseract") is not None
+
+
+def run_ocr(image, languages: str = "rus+eng") -> OcrResult:
+    """OCR a PIL image (blocking — run it in a worker thread).
+
+    Lines are rebuilt from Tesseract's TSV output; leading indentation is
+    estimated from word positions so code keeps its structure.
+    """
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    image.convert("L").save(buffer, format="PNG")
+
+    # --psm 6: a single uniform block of text — works best for code and statements
+    result = subprocess.run(
+        ["tesseract", "stdin", "stdout", "-l", languages, "--psm", "6", "tsv"],
+        input=buffer.getvalue(), capture_output=True, timeout=OCR_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"tesseract failed: {result.stderr.decode(errors='replace')[:200]}")
+
+    lines: dict[tuple, list[tuple[int, int, str]]] = {}
+    confidences: list[tuple[float, int]] = []
+    char_widths: list[float] = []
+    for row in result.stdout.decode("utf-8", errors="replace").splitlines()[1:]:
+        cols = row.split("\t")
+        if len(cols) < 12 or cols[0] != "5":  # level 5 = word
+            continue
+        text = cols[11].strip()
+        conf = float(cols[10])
+        if not text or conf < 0:
+            continue
+        left, width = int(cols[6]), int(cols[8])
+        key = (int(cols[2]), int(cols[3]), int(cols[4]))  # block, paragraph, line
+        lines.setdefault(key, []).append((left, width, text))
+        confidences.append((conf, len(text)))
+        char_widths.append(width / len(text))
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not confidences:
+        return OcrResult(text="", confidence=0.0, words=0, elapsed_ms=elapsed_ms)
+
+    char_width = statistics.median(char_widths) or 1.0
+    min_left = min(words[0][0] for words in lines.values())
+    out_lines = []
+    for key in sorted(lines):
+        words = lines[key]
+        indent = int(round((words[0][0] - min_left) / char_width))
+        out_lines.append(" " * indent + " ".join(w[2] for w in words))
+
+    total_chars = sum(n for _, n in confidences)
+    confidence = sum(c * n for c, n in confidences) / total_chars
+    return OcrResult(
+        text="\n".join(out_lines),
+        confidence=confidence,
+        words=len(confidences),
+        elapsed_ms=elapsed_ms,
+    )
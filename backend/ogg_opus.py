@@ -0,0 +1,160 @@
+"""
+Streaming Ogg Opus encoder for int16 PCM chunks.
+
+Each call to encode() turns one capture chunk (100ms) into one flushed
+Ogg page, so compression adds no buffering latency. The first call also
+returns the OpusHead/OpusTags header pages, so a fresh encoder per
+connection produces a self-contained stream.
+
+Requires opuslib (and the libopus shared library: `brew install opus`).
+"""
+
+import struct
+from typing import Optional
+
+import numpy as np
+
+OPUS_GRANULE_RATE = 48000  # Ogg Opus granule positions are always in 48 kHz samples
+MAX_LACING = 255  # Segment table entries per Ogg page
+DEFAULT_PRE_SKIP = 312  # Typical encoder lookahead at 48 kHz (6.5ms)
+VENDOR = b"axel-assistant"
+
+
+def _crc_table() -> list[int]:
+    table = []
+    for i in range(256):
+        r = i << 24
+        for _ in range(8):
+            r = ((r << 1) ^ 0x04C11DB7) if r & 0x80000000 else (r << 1)
+        table.append(r & 0xFFFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def _ogg_crc(data: bytes) -> int:
+    """CRC-32 as used by Ogg (poly 0x04C11DB7, no reflection, init 0)."""
+    crc = 0
+    for b in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[((crc >> 24) & 0xFF) ^ b]
+    return crc
+
+
+def is_available() -> bool:
+    """True if opuslib and libopus can be loaded."""
+    try:
+        import opuslib  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+class OggOpusEncoder:
+    """Encodes int16 PCM into a stream of Ogg Opus pages."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        bitrate: int = 24000,
+        frame_ms: int = 20,
+        serial: Optional[int] = None,
+    ):
+        import opuslib
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_size = sample_rate * frame_ms // 1000  # Samples per channel per Opus frame
+        self._granule_step = OPUS_GRANULE_RATE * frame_ms // 1000
+        self._encoder = opuslib.Encoder(sample_rate, channels, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self._serial = serial if serial is not None else int.from_bytes(np.random.bytes(4), "little")
+        self._page_seq = 0
+        self._granule = 0
+        self._started = False
+        self._pending = np.empty(0, dtype=np.int16)  # Interleaved leftover < one frame
+
+    @staticmethod
+    def _lacing(packet: bytes) -> bytes:
+        return b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+
+    def _page(self, packets: list[bytes], header_type: int = 0) -> bytes:
+        lacing = b"".join(self._lacing(p) for p in packets)
+        if len(lacing) > MAX_LACING:
+            raise ValueError("Too many packets for one Ogg page")
+        header = struct.pack(
+            "<4sBBqIIIB", b"OggS", 0, header_type, self._granule,
+            self._serial, self._page_seq, 0, len(lacing),
+        )
+        page = bytearray(header + bytes(lacing) + b"".join(packets))
+        struct.pack_into("<I", page, 22, _ogg_crc(bytes(page)))
+        self._page_seq += 1
+        return bytes(page)
+
+    def headers(self) -> bytes:
+        """OpusHead (BOS page) + OpusTags pages."""
+        head = struct.pack(
+            "<8sBBHIhB", b"OpusHead", 1, self.channels, DEFAULT_PRE_SKIP,
+            self.sample_rate, 0, 0,
+        )
+        tags = b"OpusTags" + struct.pack("<I", len(VENDOR)) + VENDOR + struct.pack("<I", 0)
+        return self._page([head], header_type=0x02) + self._page([tags])
+
+    def _pages(self, packets: list[bytes], last_header_type: int = 0) -> bytes:
+        """Audio packets as as many pages as the segment table limit needs.
+
+        Each page's granule position is the end of its last packet.
+        """
+        out = []
+        page: list[bytes] = []
+        lacing = 0
+        for packet in packets:
+            size = len(self._lacing(packet))
+            if page and lacing + size > MAX_LACING:
+                out.append(self._page(page))
+                page, lacing = [], 0
+            page.append(packet)
+            lacing += size
+            self._granule += self._granule_step
+        out.append(self._page(page, header_type=last_header_type))
+        return b"".join(out)
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode a chunk of interleaved int16 PCM; returns Ogg bytes to send.
+
+        A typical 100ms chunk is one page; long input (e.g. seconds of
+        silence padding) is split over several.
+        """
+        out = b""
+        if not self._started:
+            out = self.headers()
+            self._started = True
+
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+        step = self.frame_size * self.channels
+        n_frames = samples.size // step
+        self._pending = samples[n_frames * step:].copy()
+        if n_frames == 0:
+            return out
+
+        packets = []
+        for i in range(n_frames):
+            frame = samples[i * step:(i + 1) * step].tobytes()
+            packets.append(self._encoder.encode(frame, self.frame_size))
+        return out + self._pages(packets)
+
+    def close(self) -> bytes:
+        """Flush the leftover partial frame (zero-padded) and write the EOS page."""
+        out = b"" if self._started else self.headers()
+        self._started = True
+        step = self.frame_size * self.channels
+        packets = []
+        if self._pending.size:
+            frame = np.zeros(step, dtype=np.int16)
+            frame[:self._pending.size] = self._pending
+            packets.append(self._encoder.encode(frame.tobytes(), self.frame_size))
+            self._pending = np.empty(0, dtype=np.int16)
+        return out + self._pages(packets, last_header_type=0x04)
@@ -0,0 +1,196 @@
+"""
+On-demand sampling profiler for the running backend.
+
+Samples the Python stacks of every thread via sys._current_frames():
+the asyncio event loop, asyncio.to_thread workers, the PortAudio callback
+thread (while it is running Python code) and anything else alive.
+No tracing hooks are installed, so overhead is one stack walk per thread
+per sample and nothing at all when no profile is running.
+
+Output formats:
+- collapsed: Brendan Gregg's folded stacks ("thread;func (file:line);... count"),
+  ready for flamegraph.pl / speedscope / inferno
+- speedscope: https://www.speedscope.app/file-format-schema.json
+
+LoopLagMonitor runs continuously and reports event-loop latency in /status.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.005  # 200 Hz
+MAX_STACK_DEPTH = 128
+
+
+def _thread_names() -> dict[int, str]:
+    """Map thread idents to readable names (foreign threads show as Dummy-N)."""
+    names = {}
+    for t in threading.enumerate():
+        if t.ident is not None:
+            names[t.ident] = t.name
+    main_ident = threading.main_thread().ident
+    if main_ident in names:
+        names[main_ident] = "MainThread (event loop)"
+    return names
+
+
+def _frame_key(frame) -> tuple[str, str, int]:
+    code = frame.f_code
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+class SamplingProfiler:
+    """Collects stack samples from all threads for a fixed duration."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        # {(thread_name, (frame_key, ...root→leaf)): count}
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.duration = 0.0
+
+    def run(self, seconds: float) -> None:
+        """Sample for `seconds` (blocking — run it in a worker thread)."""
+        own_ident = threading.get_ident()
+        names = _thread_names()
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_key(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                name = names.get(ident)
+                if name is None:
+                    # Threads created after the start (to_thread workers, audio callbacks)
+                    names = _thread_names()
+                    name = names.get(ident, f"thread-{ident}")
+                self.samples[(name, tuple(stack))] += 1
+            self.sample_count += 1
+
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # We're behind — don't burst
+
+        self.duration = time.perf_counter() - start
+        logger.info(f"Profiler: {self.sample_count} samples over {self.duration:.2f}s, "
+                    f"{len(self.samples)} unique stacks")
+
+    @staticmethod
+    def _frame_label(key: tuple[str, str, int]) -> str:
+        name, filename, line = key
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def to_collapsed(self) -> str:
+        """Folded stacks, one line per unique (thread, stack)."""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = [thread.replace(";", ":")] + [self._frame_label(k).replace(";", ":") for k in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict:
+        """Speedscope JSON document with one sampled profile per thread."""
+        frame_index: dict[tuple, int] = {}
+        frames: list[dict] = []
+        per_thread: dict[str, tuple[list, list]] = {}
+
+        for (thread, stack), count in self.samples.items():
+            idx_stack = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                idx_stack.append(frame_index[key])
+            thread_samples, weights = per_thread.setdefault(thread, ([], []))
+            thread_samples.append(idx_stack)
+            weights.append(count * self.interval)
+
+        profiles = []
+        for thread, (thread_samples, weights) in sorted(per_thread.items()):
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": thread_samples,
+                "weights": weights,
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"axel-backend {self.duration:.1f}s",
+            "exporter": "axel-backend profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def to_speedscope_json(self) -> str:
+        return json.dumps(self.to_speedscope())
+
+
+class LoopLagMonitor:
+    """Event-loop latency: how late a sleep(interval) wakes up, over a sliding window.
+
+    Anything holding the loop (or the GIL) for long shows up as lag: SSE
+    delivery and audio pumping are delayed by the same amount.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=window)  # seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(0.0, loop.time() - start - self.interval))
+
+    def stats(self) -> dict:
+        if not self._lags:
+            return {"samples": 0}
+        lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "mean_ms": round(sum(lags) / len(lags) * 1000, 2),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 2),
+            "max_ms": round(lags[-1] * 1000, 2),
+        }
@@ -9,10 +9,24 @@ Trigger mechanisms:
 1. Pause-based: 3s of silence after interviewer speech → auto-generate
 2. Mic trigger: F5 hotkey → send candidate's mic buffer to LLM
 3. Force trigger: Cmd+Shift+A → send everything (both buffers)
+
+Interim hypotheses (Deepgram interim results) never trigger on their own:
+they keep the pause timer from firing while someone is still talking and
+let a forced trigger include words whose final transcript hasn't arrived.
+Committed finals stay the source of truth: the words a forced trigger took
+from a hypothesis are stripped from the start of that source's next final
+(words spoken after the hotkey are kept).
+
+The pause is measured from when speech actually ended (transcript meta
+"end", from capture timestamps) rather than from when the transcript
+arrived, so Whisper's decode time no longer adds to the trigger delay.
+Lines whose confidence is below AUTO_TRIGGER_MIN_CONFIDENCE don't
+auto-trigger on their own (they still go out with the next trigger).
 """
 
 import asyncio
 import logging
+import re
 import time
 from typing import Optional, Callable
 
@@ -22,6 +36,23 @@ logger = logging.getLogger(__name__)
 # 2s was too fast (triggered mid-question), 4s too slow. 3s is the sweet spot:
 # just long enough to avoid mid-question triggers with Whisper's ~3s chunks.
 PAUSE_TRIGGER_DELAY = 3.0
+# Never fire sooner than this after the last transcript arrived: a backlog
+# decoded in pieces may still be emitting the rest of the phrase.
+MIN_TRIGGER_DELAY = 1.0
+AUTO_TRIGGER_MIN_CONFIDENCE = 0.3
+# A consumed hypothesis whose final hasn't arrived by then is forgotten
+CONSUMED_INTERIM_TTL = 15.0
+
+
+def _words(text: str) -> list[str]:
+    return [re.sub(r"\W", "", w.lower()) for w in text.split()]
+
+
+def _common_prefix(a: list[str], b: list[str]) -> int:
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return n
 
 
 class QuestionDetector:
@@ -32,16 +63,33 @@ class QuestionDetector:
         self.last_source: Optional[str] = None
         self._debounce_task: Optional[asyncio.Task] = None
         self.mic_only_mode = False  # Set to True when BlackHole is unavailable
+        self.interim: dict[str, str] = {}  # Latest not-yet-final hypothesis per source
+        # Hypothesis text already sent by a forced trigger: source -> (words, time)
+        self._interim_consumed: dict[str, tuple[list[str], float]] = {}
+        self.last_speech_end = 0.0  # Wall clock
+
+    async def add_transcript(self, source: str, speaker: int, text: str, meta: Optional[dict] = None):
+        """Add a recognized phrase to the appropriate buffer.
 
-    async def add_transcript(self, source: str, speaker: int, text: str):
-        """Add a recognized phrase to the appropriate buffer."""
+        meta: transcriber timing/confidence; "end" = when the speech ended.
+        """
+        self.last_source = source
+        self.interim.pop(source, None)  # The final supersedes the hypothesis
+        text = self._strip_consumed(source, text, final=True)
+        if not text:
+            # Already answered from its interim hypothesis — don't trigger again
+            logger.debug(f"Final for consumed interim [{source}] had nothing new")
+            return
+
+        meta = meta or {}
+        speech_end = min(meta.get("end") or time.time(), time.time())
         entry = {
             "source": source,
             "speaker": speaker,
             "text": text,
-            "timestamp": time.time(),
+            "timestamp": speech_end,
+            "confidence": meta.get("confidence"),
         }
-        self.last_source = source
 
         if self.mic_only_mode:
             # No BlackHole — all audio goes to main buffer (old behavior)
@@ -58,15 +106,52 @@ class QuestionDetector:
         # Any speech from any source resets the debounce timer.
         # Mic speech delays auto-trigger (good: prevents firing while candidate speaks)
         # but doesn't add to the system buffer (so no echo-answers).
-        self._reset_debounce()
+        self._reset_debounce(speech_end)
+
+    async def add_interim(self, source: str, speaker: int, text: str):
+        """Record a live hypothesis. Speech is still in progress, so hold the trigger."""
+        self._strip_consumed(source, text, final=False)  # Forgets a consumed prefix on a new phrase
+        self.interim[source] = text
+        self.last_source = source
+        if self.buffer:
+            self._reset_debounce(time.time())
+
+    def pending_interim_text(self) -> str:
+        """Hypotheses not yet covered by a final transcript (system first)."""
+        order = sorted(self.interim, key=lambda src: src != "system")
+        texts = [self._strip_consumed(src, self.interim[src], final=False) for src in order]
+        return " ".join(t for t in texts if t.strip())
+
+    def _strip_consumed(self, source: str, text: str, final: bool) -> str:
+        """`text` minus the words a forced trigger already took from `source`'s hypothesis.
+
+        The record is dropped once the final arrives, when it expires, or when
+        a hypothesis no longer starts with those words (a new phrase began).
+        """
+        consumed = self._interim_consumed.get(source)
+        if consumed is None:
+            return text
+        words, at = consumed
+        n = _common_prefix(words, _words(text))
+        if n == 0 or time.time() - at > CONSUMED_INTERIM_TTL:
+            del self._interim_consumed[source]  # A new phrase, or its final never came
+            return text
+        if final:
+            del self._interim_consumed[source]
+        return " ".join(text.split()[n:])
 
     async def on_utterance_end(self, source: str):
         """Called on speech pause (utterance_end from VAD/Deepgram)."""
         if self.buffer:
             self._reset_debounce()
 
-    def _reset_debounce(self):
-        """Reset the debounce timer. Trigger fires after PAUSE_TRIGGER_DELAY of silence."""
+    def _reset_debounce(self, speech_end: Optional[float] = None):
+        """Reset the debounce timer. Trigger fires PAUSE_TRIGGER_DELAY after speech ended.
+
+        speech_end: when the reported speech ended; None keeps the last known end.
+        """
+        if speech_end is not None:
+            self.last_speech_end = max(self.last_speech_end, speech_end)
         if self._debounce_task and not self._debounce_task.done():
             self._debounce_task.cancel()
         self._debounce_task = asyncio.create_task(self._debounce_wait())
@@ -74,7 +159,8 @@ class QuestionDetector:
     async def _debounce_wait(self):
         """Wait for pause, then trigger if still no new speech."""
         try:
-            await asyncio.sleep(PAUSE_TRIGGER_DELAY)
+            delay = self.last_speech_end + PAUSE_TRIGGER_DELAY - time.time()
+            await asyncio.sleep(max(delay, MIN_TRIGGER_DELAY))
             await self._trigger()
         except asyncio.CancelledError:
             pass
@@ -83,6 +169,11 @@ class QuestionDetector:
         """Send accumulated system speech to LLM for answer generation."""
         if not self.buffer:
             return
+        if all(
+            p["confidence"] is not None and p["confidence"] < AUTO_TRIGGER_MIN_CONFIDENCE for p in self.buffer
+        ):
+            logger.info(f"Auto-trigger skipped: low-confidence speech only ({len(self.buffer)} lines)")
+            return
 
         # Build text with source labels for LLM context
         parts = []
@@ -125,12 +216,17 @@ class QuestionDetector:
             self._debounce_task.cancel()
 
         all_entries = self.buffer + self.mic_buffer
-        if not all_entries:
+        interim_text = self.pending_interim_text()
+        if not all_entries and not interim_text:
             return
 
-        full_text = " ".join(p["text"] for p in all_entries)
+        # Include words that are still interim — the user pressed the hotkey mid-phrase
+        full_text = " ".join([p["text"] for p in all_entries] + ([interim_text] if interim_text else []))
         if full_text.strip():
             logger.info(f"Force trigger: {full_text[:120]}...")
             self.buffer.clear()
             self.mic_buffer.clear()
+            # A hypothesis of the same phrase still starts with any earlier consumed words
+            self._interim_consumed.update({src: (_words(h), time.time()) for src, h in self.interim.items()})
+            self.interim.clear()
             await self.on_question_detected(full_text)
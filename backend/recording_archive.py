@@ -0,0 +1,241 @@
+"""
+Compressed recording archive of the mic and system streams (RECORDING_ARCHIVE).
+
+The audio pumps hand every chunk to RecordingArchive.push(), which only does
+a put_nowait into a bounded queue: if the writer falls behind, chunks are
+dropped (and counted) instead of ever blocking the live path. One writer
+thread encodes them — Ogg Opus (ogg_opus.OggOpusEncoder, needs opuslib) or
+FLAC (needs soundfile) — into fixed-length segment files per source:
+
+    <RECORDING_DIR>/<session>/mic-20261019-153000.opus
+    <RECORDING_DIR>/<session>/system-20261019-153000.opus
+    <RECORDING_DIR>/<session>/index.jsonl
+
+Segments start on wall-clock multiples of the segment length, and audio is
+placed by the chunk capture time (gaps — pauses in capture, dropped chunks —
+are filled with silence). A transcript line with start/end T (wall clock,
+see transcription_whisper) is at offset T - segment start in the segment
+file whose start it follows; index.jsonl lists every closed segment with
+its start, duration and file name.
+
+The archive gets the chunks the transcribers get, which limits how much a
+better model can recover from it later:
+  - mic audio is taken after the echo gate (ECHO_GATE): muted echo chunks
+    are archived as silence, residual-subtracted chunks as processed
+  - chunks passed through the capture queue's overflow policy: dropped
+    chunks are gaps (padded with silence here), and under `downsample`
+    chunks that waited in a full queue were stored at 8kHz and carry
+    nothing above 4kHz
+"""
+
+import json
+import logging
+import math
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+import ogg_opus
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FORMATS = ("opus", "flac")
+QUEUE_SECONDS = 30  # Per source; ~1 MB each of PCM waiting to be encoded
+GAP_TOLERANCE = 0.05  # s; capture jitter below this isn't padded
+STOP_TIMEOUT = 10.0
+
+
+def flac_available() -> bool:
+    """True if soundfile (libsndfile with FLAC) can be loaded."""
+    try:
+        import soundfile  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def available_format(preferred: str) -> Optional[str]:
+    """`preferred` if its encoder is installed, else the other one, else None."""
+    installed = {"opus": ogg_opus.is_available(), "flac": flac_available()}
+    for fmt in (preferred,) + tuple(f for f in FORMATS if f != preferred):
+        if installed.get(fmt):
+            return fmt
+    return None
+
+
+class _Segment:
+    """One open segment file of one source."""
+
+    def __init__(self, path: Path, start: float, fmt: str, bitrate: int):
+        self.path = path
+        self.start = start
+        self.samples = 0
+        self.bytes = 0
+        if fmt == "opus":
+            self._file = open(path, "wb")
+            self._encoder = ogg_opus.OggOpusEncoder(sample_rate=SAMPLE_RATE, bitrate=bitrate)
+            self._sound = None
+        else:
+            import soundfile
+            self._sound = soundfile.SoundFile(
+                str(path), "w", samplerate=SAMPLE_RATE, channels=1, format="FLAC", subtype="PCM_16",
+            )
+            self._file = self._encoder = None
+
+    def write(self, samples: np.ndarray) -> None:
+        try:
+            if self._sound is not None:
+                self._sound.write(samples)
+            else:
+                pages = self._encoder.encode(samples.tobytes())
+                self._file.write(pages)
+                self.bytes += len(pages)
+        finally:
+            self.samples += samples.size  # A failed write still keeps the timeline aligned
+
+    def close(self) -> None:
+        if self._sound is not None:
+            self._sound.close()
+            self.bytes = self.path.stat().st_size
+        else:
+            tail = self._encoder.close()
+            self._file.write(tail)
+            self.bytes += len(tail)
+            self._file.close()
+
+
+class RecordingArchive:
+    def __init__(self, directory: str, fmt: str = "opus", segment_seconds: int = 60, bitrate: int = 32000):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown recording format '{fmt}' (expected one of {FORMATS})")
+        self.directory = Path(directory).expanduser()
+        self.format = fmt
+        self.segment_seconds = segment_seconds
+        self.bitrate = bitrate
+        self.session_dir: Optional[Path] = None
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._segments: dict[str, _Segment] = {}
+        self._index = None
+
+        # Metrics (exposed via stats())
+        self.dropped_chunks = 0
+        self.segments_written = 0
+        self.seconds_written = 0.0
+        self.bytes_written = 0
+        self.padded_seconds = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self, sources: int = 2) -> None:
+        """Open a new session directory and start the writer thread."""
+        if self.active:
+            return
+        self.session_dir = self.directory / time.strftime("%Y%m%d-%H%M%S")
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        self._index = open(self.session_dir / "index.jsonl", "a", encoding="utf-8")
+        self._queue = queue.Queue(maxsize=QUEUE_SECONDS * 10 * sources)  # 100ms chunks
+        self._thread = threading.Thread(target=self._run, name="recording-archive", daemon=True)
+        self._thread.start()
+        logger.info(f"Recording archive: {self.session_dir} ({self.format}, {self.segment_seconds}s segments)")
+
+    def push(self, source: str, pcm: bytes, captured_at: float) -> None:
+        """Queue a captured chunk for encoding (never blocks; drops if the writer is behind)."""
+        if not self.active:
+            return
+        try:
+            self._queue.put_nowait((source, pcm, captured_at))
+        except queue.Full:
+            self.dropped_chunks += 1
+            if self.dropped_chunks == 1 or self.dropped_chunks % 100 == 0:
+                logger.warning(f"Recording archive behind: dropped {self.dropped_chunks} chunks")
+
+    def stop(self) -> None:
+        """Drain the queue, close open segments and stop the writer (blocking)."""
+        if not self.active:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=STOP_TIMEOUT)
+        if self._thread.is_alive():
+            logger.error("Recording archive writer did not stop in time")
+        self._thread = None
+        logger.info(f"Recording archive closed: {self.session_dir}")
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                try:
+                    self._write(*item)
+                except Exception as e:
+                    logger.error(f"Recording archive write error [{item[0]}]: {e}")
+        finally:
+            for source in list(self._segments):
+                self._close_segment(source)
+            self._index.close()
+
+    def _write(self, source: str, pcm: bytes, captured_at: float) -> None:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        chunk_start = captured_at - samples.size / SAMPLE_RATE  # captured_at = end of chunk
+        segment_start = math.floor(chunk_start / self.segment_seconds) * self.segment_seconds
+
+        segment = self._segments.get(source)
+        if segment is not None and segment_start > segment.start:
+            self._close_segment(source)
+            segment = None
+        if segment is None:
+            segment = self._open_segment(source, segment_start)
+
+        # Place the chunk on the segment's timeline: pad gaps with silence
+        gap = round((chunk_start - segment.start) * SAMPLE_RATE) - segment.samples
+        if gap > GAP_TOLERANCE * SAMPLE_RATE:
+            gap = min(gap, self.segment_seconds * SAMPLE_RATE - segment.samples)
+            segment.write(np.zeros(gap, dtype=np.int16))
+            self.padded_seconds += gap / SAMPLE_RATE
+        segment.write(samples)
+
+    def _open_segment(self, source: str, start: float) -> _Segment:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(start))
+        path = self.session_dir / f"{source}-{stamp}.{self.format}"
+        segment = _Segment(path, start, self.format, self.bitrate)
+        self._segments[source] = segment
+        return segment
+
+    def _close_segment(self, source: str) -> None:
+        segment = self._segments.pop(source)
+        segment.close()
+        seconds = segment.samples / SAMPLE_RATE
+        self.segments_written += 1
+        self.seconds_written += seconds
+        self.bytes_written += segment.bytes
+        self._index.write(json.dumps({
+            "source": source,
+            "file": segment.path.name,
+            "start": segment.start,
+            "seconds": round(seconds, 3),
+            "bytes": segment.bytes,
+        }) + "\n")
+        self._index.flush()
+
+    def stats(self) -> dict:
+        """Archive metrics for /status."""
+        return {
+            "active": self.active,
+            "session": str(self.session_dir) if self.session_dir else None,
+            "format": self.format,
+            "queued_chunks": self._queue.qsize() if self._queue else 0,
+            "dropped_chunks": self.dropped_chunks,
+            "segments": self.segments_written,
+            "seconds": round(self.seconds_written, 1),
+            "kbit_per_s": round(self.bytes_written * 8 / 1000 / self.seconds_written, 1) if self.seconds_written else None,
+            "padded_seconds": round(self.padded_seconds, 1),
+        }
@@ -0,0 +1,159 @@
+"""
+Local BM25 retrieval over the candidate profile and job description.
+
+Instead of pasting both documents into every prompt, they are split into
+heading-aware chunks and indexed when saved; each question then carries
+only the top-k relevant snippets. Questions that match nothing well ("Расскажи
+о себе", "Почему вы хотите работать у нас?") get an overview instead: the
+first chunk of every section, up to a size limit.
+
+Tokens are lowercased words truncated to STEM_LENGTH characters — a crude
+stemmer that is good enough to match Russian word forms
+("опыт"/"опыта"/"опытом") without extra dependencies.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+STEM_LENGTH = 6
+MAX_CHUNK_CHARS = 600
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+# Best hit below this (about one match of a common term) = no real match
+MIN_SCORE = 1.0
+
+
+@dataclass
+class Chunk:
+    source: str  # "profile" or "job"
+    heading: str  # Heading path, e.g. "Опыт > Яндекс"
+    text: str
+
+    def render(self) -> str:
+        return f"[{self.heading}]\n{self.text}" if self.heading else self.text
+
+
+def tokenize(text: str) -> list[str]:
+    return [t[:STEM_LENGTH] for t in TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def split_markdown(text: str, source: str, max_chars: int = MAX_CHUNK_CHARS) -> list[Chunk]:
+    """Split markdown into chunks by headings, then by paragraphs up to max_chars."""
+    chunks: list[Chunk] = []
+    path: list[str] = []
+    paragraphs: list[str] = []
+
+    def flush():
+        heading = " > ".join(path)
+        current = ""
+        for para in paragraphs:
+            if current and len(current) + len(para) + 1 > max_chars:
+                chunks.append(Chunk(source, heading, current))
+                current = ""
+            current = f"{current}\n{para}" if current else para
+        if current:
+            chunks.append(Chunk(source, heading, current))
+        paragraphs.clear()
+
+    block: list[str] = []
+    for line in COMMENT_RE.sub("", text).splitlines():
+        m = HEADING_RE.match(line.strip())
+        if m:
+            if block:
+                paragraphs.append("\n".join(block))
+                block = []
+            flush()
+            level = len(m.group(1))
+            path[:] = path[:level - 1] + [m.group(2).strip()]
+        elif not line.strip():
+            if block:
+                paragraphs.append("\n".join(block))
+                block = []
+        else:
+            block.append(line.rstrip())
+    if block:
+        paragraphs.append("\n".join(block))
+    flush()
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks: list[Chunk]):
+        self.chunks = chunks
+        # Headings are indexed too: "Навыки" should match a question about skills
+        self._tfs = [Counter(tokenize(f"{c.heading} {c.text}")) for c in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._tfs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths) if chunks else 0.0) or 1.0
+        df = Counter(term for tf in self._tfs for term in tf)
+        n = len(chunks)
+        self._idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def search(self, query: str, k: int) -> list[tuple[float, Chunk]]:
+        """Top-k chunks by BM25 score (only chunks sharing at least one term)."""
+        terms = set(tokenize(query)) & self._idf.keys()
+        if not terms:
+            return []
+        scored = []
+        for i, tf in enumerate(self._tfs):
+            score = 0.0
+            norm = K1 * (1 - B + B * self._lengths[i] / self._avg_length)
+            for term in terms:
+                f = tf.get(term)
+                if f:
+                    score += self._idf[term] * f * (K1 + 1) / (f + norm)
+            if score > 0:
+                scored.append((score, self.chunks[i]))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored[:k]
+
+
+class DocumentIndex:
+    """BM25 index over several named markdown documents."""
+
+    def __init__(self, documents: dict[str, str]):
+        self.chunks: list[Chunk] = []
+        for source, text in documents.items():
+            self.chunks.extend(split_markdown(text, source))
+        self._bm25 = BM25Index(self.chunks)
+
+    def top_k(self, query: str, k: int, min_score: float = 0.0) -> list[Chunk]:
+        """Relevant chunks for `query`, returned in document order for readability.
+
+        Empty if the best hit scores below min_score."""
+        scored = self._bm25.search(query, k)
+        if not scored or scored[0][0] < min_score:
+            return []
+        hits = {id(c) for _, c in scored}
+        return [c for c in self.chunks if id(c) in hits]
+
+    def overview(self, max_chars: int) -> list[Chunk]:
+        """First chunk of every section after the lead, in document order,
+        with max_chars split evenly between the documents."""
+        sources = list(dict.fromkeys(c.source for c in self.chunks))
+        budget = max_chars // max(1, len(sources))
+        picked: list[Chunk] = []
+        for source in sources:
+            seen: set[str] = set()
+            used = 0
+            for chunk in self.chunks:
+                if chunk.source != source or chunk.heading in seen:
+                    continue
+                seen.add(chunk.heading)
+                if chunk is self.lead(source):
+                    continue
+                if used + len(chunk.text) > budget:
+                    break
+                picked.append(chunk)
+                used += len(chunk.text)
+        return picked
+
+    def lead(self, source: str) -> Chunk | None:
+        """First chunk of a document (name / role / company summary)."""
+        return next((c for c in self.chunks if c.source == source), None)
@@ -2,10 +2,13 @@
 FastAPI SSE streaming and shared utilities.
 
 SSE events:
-- transcript: real-time transcription
+- transcript: real-time transcription (final phrases)
+- transcript_interim: live, not-yet-final hypothesis (Deepgram); replaced by the next transcript
 - question_detected: interviewer asked a question
 - ai_answer_start / ai_answer_chunk / ai_answer_end: streaming AI answer
 - status: recording state, errors
+- upload_progress: background document upload job (stage, progress, content when done)
+- audio_level: per-source level meter (dBFS), transient
 - ping: keepalive
 """
 
@@ -15,6 +18,9 @@ import json
 # SSE event queue (single consumer for MVP — one Electron client)
 sse_queue: asyncio.Queue = asyncio.Queue()
 
+# Transient events are skipped once this many events are waiting (no client draining)
+TRANSIENT_MAX_BACKLOG = 20
+
 
 async def emit_event(event: str, data: dict):
     """Push an event to all connected SSE clients."""
@@ -22,3 +28,12 @@ async def emit_event(event: str, data: dict):
         "event": event,
         "data": json.dumps(data, ensure_ascii=False),
     })
+
+
+def emit_transient(event: str, data: dict):
+    """Push a disposable event (level meters); dropped if the queue is backed up."""
+    if sse_queue.qsize() < TRANSIENT_MAX_BACKLOG:
+        sse_queue.put_nowait({
+            "event": event,
+            "data": json.dumps(data, ensure_ascii=False),
+        })
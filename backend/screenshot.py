@@ -6,17 +6,67 @@ and returns base64-encoded JPEG.
 
 Uses macOS `screencapture` CLI, with Pillow ImageGrab as fallback.
 Both require Screen Recording permission in System Settings.
+
+Capture, decode, resize and JPEG encoding are blocking, so capture() runs
+them in a worker thread; concurrent hotkey presses share one capture.
+The "memory" backend serves an in-memory image (for Linux / tests).
+
+Each capture gets a perceptual hash (dHash) and a small grayscale grid.
+select() compares them with the last screenshot whose analysis was stored:
+- unchanged screen → no image; the cached analysis of that screen is reused
+- small change → only the changed region is cropped and sent, together
+  with the analysis of that exact screen (Screenshot.base_analysis)
+- the image is sized to fit VISION_TOKEN_BUDGET (OpenAI high-detail tiling)
+
+Only answers to the default analysis prompt are stored (remember_analysis),
+never answers to a spoken question. An answer about a crop is kept as a
+note on the analysis of the whole screen it was cropped from.
+
+Optional background pre-capture (start_precapture) keeps the latest
+prepared screenshot in memory while recording, so the hotkey can use an
+image grabbed at most interval + PRECAPTURE_SLACK ago without waiting for
+a capture.
 """
 
+import asyncio
 import base64
 import io
 import logging
+import math
 import os
 import subprocess
+import sys
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+MAX_SIDE = 1920
+JPEG_QUALITY = 85
+
+# Change detection
+GRID_WIDTH = 160  # Grayscale grid used for diffing (height follows aspect ratio)
+HASH_DISTANCE_UNCHANGED = 2  # dHash bits that may differ for an "unchanged" screen
+PIXEL_DIFF_THRESHOLD = 16  # Gray levels (0-255) for a grid cell to count as changed
+REGION_PADDING = 0.03  # Pad the changed region by 3% of the screen on each side
+CROP_MAX_FRACTION = 0.6  # Larger changes send the whole screen
+MAX_CACHED_ANALYSES = 16
+MAX_REGION_NOTES = 3  # Crop answers kept on top of a full-screen analysis
+
+# OpenAI high-detail pricing: 85 base + 170 per 512px tile, after the image is
+# fitted into 2048x2048 and its short side scaled down to 768px.
+VISION_TOKEN_BUDGET = 1105  # 6 tiles — what a full 16:10 screen costs anyway
+
+# Background pre-capture
+PRECAPTURE_INTERVAL = 0.3  # seconds between background captures (SCREENSHOT_PRECAPTURE_INTERVAL)
+PRECAPTURE_SLACK = 0.2  # A grab + prepare; images older than interval + slack are not used
+
 PERMISSION_ERROR_MSG = (
     "Нет разрешения на запись экрана. "
     "Откройте Системные настройки → Конфиденциальность → Запись экрана, "
@@ -24,91 +74,380 @@ PERMISSION_ERROR_MSG = (
 )
 
 
-class ScreenshotCapture:
-    @staticmethod
-    def capture_full_screen() -> str:
-        """Capture the main display and return base64 JPEG."""
-        # Try macOS screencapture CLI first
+@dataclass(frozen=True)
+class ScreenAnalysis:
+    """Stored analysis of a full screen, plus notes on regions that changed since."""
+    text: str
+    notes: tuple[str, ...] = ()
+
+    def with_note(self, note: str) -> "ScreenAnalysis":
+        return ScreenAnalysis(self.text, (self.notes + (note,))[-MAX_REGION_NOTES:])
+
+    def render(self) -> str:
+        if not self.notes:
+            return self.text
+        return self.text + "\n\nПосле этого изменилась часть экрана:\n" + "\n\n".join(self.notes)
+
+
+@dataclass
+class Screenshot:
+    """A prepared capture (and, after select(), what should be sent)."""
+    image_b64: Optional[str]  # JPEG to send; None if the screen is unchanged
+    phash: int
+    grid: np.ndarray = field(repr=False)
+    image: "object" = field(repr=False)  # Downscaled PIL image (RGB)
+    captured_at: float = field(default_factory=time.time)  # When the screen was grabbed
+    region: Optional[tuple[int, int, int, int]] = None  # Crop box if only a region is sent
+    unchanged: bool = False
+    vision_tokens: int = 0
+    base: Optional[ScreenAnalysis] = None  # With a crop: analysis of the screen it changed from
+
+    @property
+    def base_analysis(self) -> Optional[str]:
+        return self.base.render() if self.base else None
+
+
+def _api_size(width: int, height: int) -> tuple[float, float]:
+    """Size the API actually processes: fit 2048x2048, then short side ≤ 768."""
+    scale = min(1.0, 2048 / max(width, height))
+    scale *= min(1.0, 768 / (min(width, height) * scale))
+    return width * scale, height * scale
+
+
+def vision_tokens(width: int, height: int) -> int:
+    """Estimated high-detail vision tokens for an image of this size."""
+    w, h = _api_size(width, height)
+    return 85 + 170 * math.ceil(w / 512) * math.ceil(h / 512)
+
+
+def fit_token_budget(width: int, height: int, budget: int = VISION_TOKEN_BUDGET) -> tuple[int, int]:
+    """Largest size (no upscaling) that fits the budget; pixels beyond what
+    the API keeps after its own downscale are just wasted upload bytes."""
+    w, h = _api_size(width, height)
+    w, h = max(1, int(w)), max(1, int(h))
+    while vision_tokens(w, h) > budget and min(w, h) > 64:
+        w, h = int(w * 0.9), int(h * 0.9)
+    return w, h
+
+
+def _dhash(grid: np.ndarray) -> int:
+    """64-bit difference hash of a grayscale grid."""
+    h, w = grid.shape
+    rows = np.linspace(0, h, 9, dtype=int)
+    cols = np.linspace(0, w, 10, dtype=int)
+    # Block means on a 8x9 lattice, then compare horizontal neighbours
+    sums = np.add.reduceat(np.add.reduceat(grid, rows[:-1], axis=0), cols[:-1], axis=1)
+    small = sums / np.outer(np.diff(rows), np.diff(cols))
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+@dataclass
+class _Grab:
+    image: "object"  # PIL.Image.Image
+    grabbed_at: float  # time.time() when the capture was started
+    encoded: Optional[bytes] = None  # Source JPEG bytes, reused if no resize is needed
+
+
+class CliCaptureBackend:
+    """macOS `screencapture` CLI. Each capture gets its own private temp file, deleted after reading."""
+
+    name = "cli"
+
+    def grab(self) -> _Grab:
+        with tempfile.NamedTemporaryFile(prefix="axel-screenshot-", suffix=".jpg", delete=False) as tmp:
+            tmp_path = tmp.name
+        grabbed_at = time.time()
         try:
-            return ScreenshotCapture._capture_via_cli()
-        except PermissionError:
-            raise  # Don't fallback on permission issues
-        except Exception as e:
-            logger.warning(f"screencapture CLI failed: {e}, trying Pillow...")
+            result = subprocess.run(
+                ["screencapture", "-x", "-t", "jpg", tmp_path],
+                capture_output=True, timeout=10,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"screencapture exit code {result.returncode}")
+            with open(tmp_path, "rb") as f:
+                data = f.read()
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
-        # Fallback to Pillow ImageGrab
+        # Empty or very small file (<1KB) usually means a blank/permission-denied capture
+        if len(data) < 1000:
+            raise PermissionError(PERMISSION_ERROR_MSG)
+
+        # Validate that it's a real image (header only — pixels are decoded lazily)
+        from PIL import Image
         try:
-            return ScreenshotCapture._capture_via_pillow()
+            img = Image.open(io.BytesIO(data))
+        except Exception:
+            raise PermissionError(PERMISSION_ERROR_MSG)
+        return _Grab(img, grabbed_at, encoded=data)
+
+
+class PillowCaptureBackend:
+    """Pillow ImageGrab (requires Screen Recording permission on macOS)."""
+
+    name = "pillow"
+
+    def grab(self) -> _Grab:
+        from PIL import ImageGrab
+        grabbed_at = time.time()
+        try:
+            return _Grab(ImageGrab.grab(all_screens=False), grabbed_at)
         except Exception as e:
             err_str = str(e)
             if "cannot identify image file" in err_str or "CGWindowListCreateImage" in err_str:
                 raise PermissionError(PERMISSION_ERROR_MSG) from e
             raise
 
-    @staticmethod
-    def _capture_via_cli() -> str:
-        """Capture using macOS screencapture command."""
-        tmp_path = os.path.join(tempfile.gettempdir(), "axel_screenshot.jpg")
-        # Remove old file to detect empty captures
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-
-        result = subprocess.run(
-            ["screencapture", "-x", "-t", "jpg", tmp_path],
-            capture_output=True, timeout=10,
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"screencapture exit code {result.returncode}")
 
-        if not os.path.exists(tmp_path):
-            raise PermissionError(PERMISSION_ERROR_MSG)
+class MemoryCaptureBackend:
+    """Serves an in-memory image instead of the screen (Linux, tests)."""
 
-        file_size = os.path.getsize(tmp_path)
-        if file_size == 0:
-            os.unlink(tmp_path)
-            raise PermissionError(PERMISSION_ERROR_MSG)
+    name = "memory"
 
-        # Very small file (<1KB) usually means a blank/permission-denied capture
-        if file_size < 1000:
-            os.unlink(tmp_path)
-            raise PermissionError(PERMISSION_ERROR_MSG)
+    def __init__(self, size: tuple[int, int] = (2880, 1800)):
+        self._image = None
+        self._size = size
 
-        with open(tmp_path, "rb") as f:
-            data = f.read()
-        os.unlink(tmp_path)
+    def set_image(self, image) -> None:
+        """Replace the image returned by the next captures (PIL.Image)."""
+        self._image = image
 
-        # Validate that it's a real image
+    def grab(self) -> _Grab:
         from PIL import Image
-        try:
-            img = Image.open(io.BytesIO(data))
-        except Exception:
-            raise PermissionError(PERMISSION_ERROR_MSG)
+        if self._image is None:
+            self._image = Image.new("RGB", self._size, (30, 30, 30))
+        return _Grab(self._image.copy(), time.time())
 
-        # Resize if too large (Retina)
-        max_side = max(img.width, img.height)
-        if max_side > 1920:
-            ratio = 1920 / max_side
-            img = img.resize((int(img.width * ratio), int(img.height * ratio)))
-            buffer = io.BytesIO()
-            img.save(buffer, format="JPEG", quality=85)
-            return base64.b64encode(buffer.getvalue()).decode()
 
-        return base64.b64encode(data).decode()
+def _make_backends(name: str) -> list:
+    if name == "memory":
+        return [MemoryCaptureBackend()]
+    if name == "pillow":
+        return [PillowCaptureBackend()]
+    if name == "cli":
+        return [CliCaptureBackend()]
+    # auto: screencapture CLI on macOS with Pillow as fallback
+    if sys.platform == "darwin":
+        return [CliCaptureBackend(), PillowCaptureBackend()]
+    return [PillowCaptureBackend()]
+
+
+class ScreenshotCapture:
+    def __init__(self, backend: str = "auto"):
+        self.backends = _make_backends(backend)
+        self._inflight: Optional[asyncio.Task] = None
+        self._last_sent: Optional[Screenshot] = None  # Last screen with a stored analysis
+        self._state_lock = threading.Lock()  # select() runs in threads, remember_analysis() on the loop
+        self._analyses: OrderedDict[int, ScreenAnalysis] = OrderedDict()  # phash → LLM analysis
+        self._latest: Optional[Screenshot] = None  # From background pre-capture
+        self._precapture_task: Optional[asyncio.Task] = None
+        self._precapture_max_age = PRECAPTURE_INTERVAL + PRECAPTURE_SLACK
+
+    async def capture(self, fresh: bool = False) -> Screenshot:
+        """Get a screenshot and select what to send.
+
+        Uses the pre-captured image if it is recent enough, unless fresh=True.
+        Presses during a capture share its result.
+        """
+        shot = self._latest if self._precapture_task else None
+        if fresh or shot is None or time.time() - shot.captured_at > self._precapture_max_age:
+            shot = await self._capture_coalesced()
+        else:
+            logger.info(f"Using pre-captured screenshot ({(time.time() - shot.captured_at) * 1000:.0f}ms old)")
+        return await asyncio.to_thread(self.select, shot)
+
+    async def _capture_coalesced(self) -> Screenshot:
+        """Capture off the event loop; concurrent callers join the capture in flight."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(asyncio.to_thread(self.capture_prepared))
+        else:
+            logger.info("Screenshot already in progress, joining it")
+        shot = await asyncio.shield(self._inflight)
+        self._latest = shot
+        return shot
+
+    def start_precapture(self, interval: float = PRECAPTURE_INTERVAL) -> None:
+        """Start grabbing the screen in the background every `interval` seconds."""
+        if self._precapture_task and not self._precapture_task.done():
+            return
+        self._precapture_max_age = interval + PRECAPTURE_SLACK
+        self._precapture_task = asyncio.create_task(self._precapture_loop(interval))
+        logger.info(f"Screenshot pre-capture started (every {interval}s)")
+
+    async def stop_precapture(self) -> None:
+        """Stop background capture and drop the pre-captured image."""
+        if self._precapture_task:
+            self._precapture_task.cancel()
+            try:
+                await self._precapture_task
+            except asyncio.CancelledError:
+                pass
+            self._precapture_task = None
+            logger.info("Screenshot pre-capture stopped")
+        self._latest = None
+
+    async def _precapture_loop(self, interval: float):
+        while True:
+            started = time.monotonic()
+            try:
+                await self._capture_coalesced()
+            except asyncio.CancelledError:
+                raise
+            except PermissionError:
+                logger.warning("Screenshot pre-capture stopped: no Screen Recording permission")
+                return
+            except Exception as e:
+                logger.warning(f"Screenshot pre-capture failed: {e}")
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def capture_full_screen(self) -> str:
+        """Capture the main display and return base64 JPEG (blocking)."""
+        return self.capture_prepared().image_b64
+
+    def capture_prepared(self) -> Screenshot:
+        """Grab, downscale, encode and hash the screen (blocking)."""
+        return self._prepare(self._grab())
+
+    def _grab(self) -> _Grab:
+        last_error: Optional[Exception] = None
+        for backend in self.backends:
+            try:
+                return backend.grab()
+            except PermissionError:
+                raise  # Don't fallback on permission issues
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Screenshot backend '{backend.name}' failed: {e}")
+        raise last_error or RuntimeError("No screenshot backend available")
 
     @staticmethod
-    def _capture_via_pillow() -> str:
-        """Capture using Pillow ImageGrab (requires Screen Recording permission)."""
-        from PIL import ImageGrab
-        img = ImageGrab.grab(all_screens=False)
+    def _prepare(grab: _Grab) -> Screenshot:
+        """Downscale, encode at the vision-token budget size and compute the
+        change-detection grid — everything the hotkey path would otherwise wait for."""
+        from PIL import Image
+
+        img = grab.image
+        max_side = max(img.width, img.height)
+        ratio = min(1.0, MAX_SIDE / max_side)
+        size = (int(img.width * ratio), int(img.height * ratio))
+        send_size = fit_token_budget(*size)
+        passthrough = grab.encoded if (send_size == img.size and img.format == "JPEG") else None
 
-        if img.mode == "RGBA":
+        if img.format == "JPEG":
+            # Let libjpeg decode at 1/2, 1/4... scale directly (much cheaper for Retina)
+            img.draft("RGB", size)
+        if img.mode != "RGB":
             img = img.convert("RGB")
+        if img.size != size:
+            img = img.resize(size)
 
-        max_side = max(img.width, img.height)
-        if max_side > 1920:
-            ratio = 1920 / max_side
-            img = img.resize((int(img.width * ratio), int(img.height * ratio)))
+        if passthrough is not None:
+            encoded = passthrough  # Already a small enough JPEG — skip re-encode
+        else:
+            buffer = io.BytesIO()
+            (img.resize(send_size) if send_size != img.size else img).save(
+                buffer, format="JPEG", quality=JPEG_QUALITY)
+            encoded = buffer.getvalue()
+
+        grid_size = (GRID_WIDTH, max(1, round(GRID_WIDTH * img.height / img.width)))
+        grid = np.asarray(img.convert("L").resize(grid_size, Image.BOX), dtype=np.float32)
+        return Screenshot(
+            image_b64=base64.b64encode(encoded).decode(),
+            phash=_dhash(grid),
+            grid=grid,
+            image=img,
+            captured_at=grab.grabbed_at,
+            vision_tokens=vision_tokens(*send_size),
+        )
+
+    def select(self, shot: Screenshot) -> Screenshot:
+        """Decide what to send for `shot`, relative to the last analysed screenshot."""
+        with self._state_lock:
+            return self._select(shot)
 
+    def _select(self, shot: Screenshot) -> Screenshot:
+        prev = self._last_sent
+        if prev is None or prev.grid.shape != shot.grid.shape:
+            return self._fit(shot, None)
+
+        changed = np.abs(shot.grid - prev.grid) > PIXEL_DIFF_THRESHOLD
+        if not changed.any() and _hamming(shot.phash, prev.phash) <= HASH_DISTANCE_UNCHANGED:
+            if self.cached_analysis(shot) is not None:
+                logger.info("Screenshot unchanged since last capture — reusing analysis")
+                return replace(shot, image_b64=None, unchanged=True, vision_tokens=0)
+            return self._fit(shot, None)  # Nothing to reuse (last answer failed/cancelled)
+        base = self._cached_entry(prev)
+        if base is None:
+            return self._fit(shot, None)  # A crop only makes sense on top of a known screen
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        cols = np.flatnonzero(changed.any(axis=0))
+        if rows.size == 0:
+            return self._fit(shot, None)
+        gh, gw = shot.grid.shape
+        sx, sy = shot.image.width / gw, shot.image.height / gh
+        pad_x, pad_y = shot.image.width * REGION_PADDING, shot.image.height * REGION_PADDING
+        box = (
+            max(0, int(cols[0] * sx - pad_x)),
+            max(0, int(rows[0] * sy - pad_y)),
+            min(shot.image.width, int((cols[-1] + 1) * sx + pad_x)),
+            min(shot.image.height, int((rows[-1] + 1) * sy + pad_y)),
+        )
+        area = (box[2] - box[0]) * (box[3] - box[1]) / (shot.image.width * shot.image.height)
+        if area > CROP_MAX_FRACTION:
+            return self._fit(shot, None)
+        logger.info(f"Screenshot changed region {box} ({area:.0%} of screen)")
+        return replace(self._fit(shot, box), base=base)
+
+    @staticmethod
+    def _fit(shot: Screenshot, box: Optional[tuple[int, int, int, int]]) -> Screenshot:
+        """Crop to `box` and resize to fit the vision-token budget.
+
+        The full screen was already encoded at budget size by _prepare().
+        """
+        if box is None:
+            return shot
+        img = shot.image.crop(box)
+        size = fit_token_budget(img.width, img.height)
+        if size != img.size:
+            img = img.resize(size)
         buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=85)
-        return base64.b64encode(buffer.getvalue()).decode()
+        img.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+        return replace(
+            shot,
+            image_b64=base64.b64encode(buffer.getvalue()).decode(),
+            region=box,
+            vision_tokens=vision_tokens(*size),
+        )
+
+    def cached_analysis(self, shot: Screenshot) -> Optional[str]:
+        """Analysis of a screen that looks the same as `shot`, if one was stored."""
+        entry = self._cached_entry(shot)
+        return entry.render() if entry else None
+
+    def _cached_entry(self, shot: Screenshot) -> Optional[ScreenAnalysis]:
+        for phash, entry in reversed(self._analyses.items()):
+            if _hamming(phash, shot.phash) <= HASH_DISTANCE_UNCHANGED:
+                return entry
+        return None
+
+    def remember_analysis(self, shot: Screenshot, text: str) -> None:
+        """Store the answer to the default analysis prompt for the screen in
+        `shot`; later crops are relative to it. For a crop, the answer is
+        added as a note to the analysis of the screen it was cropped from.
+        Answers to spoken questions must not be passed here."""
+        if not text.strip():
+            return
+        entry = shot.base.with_note(text) if shot.region is not None and shot.base else ScreenAnalysis(text)
+        with self._state_lock:
+            self._analyses[shot.phash] = entry
+            self._analyses.move_to_end(shot.phash)
+            while len(self._analyses) > MAX_CACHED_ANALYSES:
+                self._analyses.popitem(last=False)
+            self._last_sent = shot
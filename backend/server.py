@@ -0,0 +1,925 @@
+"""
+FastAPI app: wires all modules together (started by main.py).
+
+Pipeline:
+  AudioCapture -> DeepgramTranscriber -> QuestionDetector -> LLMClient -> SSE -> Electron
+"""
+
+import asyncio
+import base64
+import os
+import time
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable
+from fastapi import FastAPI, Request, UploadFile, File
+from fastapi.responses import Response
+from fastapi.middleware.cors import CORSMiddleware
+from sse_starlette.sse import EventSourceResponse
+
+from config import (
+    OPENAI_API_KEY, DEEPGRAM_API_KEY, AUDIO_QUEUE_SECONDS, AUDIO_QUEUE_POLICY, ECHO_GATE,
+    RECORDING_ARCHIVE, RECORDING_DIR, RECORDING_FORMAT, RECORDING_SEGMENT_SECONDS, RECORDING_OPUS_BITRATE,
+    DEEPGRAM_MULTICHANNEL, DEEPGRAM_OPUS, DEEPGRAM_OPUS_BITRATE,
+    LLM_PROVIDER, LLM_MODEL, CLI_PROXY_URL, CLI_PROXY_API_KEY,
+    PROMPT_RETRIEVAL, PROMPT_RETRIEVAL_TOP_K, PROMPT_RETRIEVAL_MIN_CHARS,
+    DOC_MAP_REDUCE_MIN_CHARS, DOC_MAP_CONCURRENCY,
+    OPENAI_MODELS, CLAUDE_MODELS, CLAUDE_MODEL_LABELS,
+    TRANSCRIPTION_PROVIDER, WHISPER_MODEL, WHISPER_MODELS, WHISPER_QUANTIZED_MODELS, WHISPER_MEMORY_BUDGET_MB,
+    WHISPER_THREADS, WHISPER_AUTOTUNE, WHISPER_TUNE_CLIP, WHISPER_PROCESS_WORKERS,
+    SCREENSHOT_BACKEND, SCREENSHOT_PRECAPTURE, SCREENSHOT_PRECAPTURE_INTERVAL,
+    SCREENSHOT_OCR, OCR_LANGUAGES, OCR_MIN_CONFIDENCE, OCR_MIN_WORDS,
+    BACKEND_HOST, BACKEND_PORT,
+)
+from audio_capture import AudioCapture
+from recording_archive import RecordingArchive, available_format as available_archive_format
+from transcription import DeepgramTranscriber, ChannelInterleaver
+import ogg_opus
+from transcription_whisper import (
+    WhisperTranscriber, preload_model, is_model_ready, is_model_loading, get_model_status,
+    ENGINE_WHISPERCPP, ENGINE_FASTER_WHISPER, GGML_SIZES_MB, is_quantized,
+    get_cache_info as get_whisper_cache_info, set_memory_budget as set_whisper_memory_budget,
+    set_thread_tuning as set_whisper_thread_tuning, set_process_workers as set_whisper_process_workers,
+    shutdown_workers as shutdown_whisper_workers,
+)
+from question_detector import QuestionDetector
+from llm_client import LLMClient
+from screenshot import ScreenshotCapture
+from ocr import run_ocr, is_available as ocr_available
+from context_manager import ContextManager
+from file_parser import extract_text_async, pdf_text_available, shutdown_pool as shutdown_extract_pool
+from document_jobs import DocumentJob, DocumentJobQueue, cache_key
+from routes import sse_queue, emit_event, emit_transient
+from profiler import SamplingProfiler, LoopLagMonitor
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Validate API keys
+if not OPENAI_API_KEY:
+    logger.warning("OPENAI_API_KEY not set — OpenAI provider will not work")
+if not DEEPGRAM_API_KEY and TRANSCRIPTION_PROVIDER == "deepgram":
+    logger.warning("DEEPGRAM_API_KEY not set — Deepgram transcription will not work")
+
+# Module instances
+audio = AudioCapture(queue_seconds=AUDIO_QUEUE_SECONDS, queue_policy=AUDIO_QUEUE_POLICY, echo_gate=ECHO_GATE)
+context = ContextManager()
+llm = LLMClient(
+    openai_api_key=OPENAI_API_KEY or "", cli_proxy_url=CLI_PROXY_URL, cli_proxy_api_key=CLI_PROXY_API_KEY,
+    retrieval=PROMPT_RETRIEVAL, retrieval_top_k=PROMPT_RETRIEVAL_TOP_K,
+    retrieval_min_chars=PROMPT_RETRIEVAL_MIN_CHARS,
+)
+llm.set_provider(LLM_PROVIDER, LLM_MODEL)
+set_whisper_memory_budget(WHISPER_MEMORY_BUDGET_MB)
+set_whisper_thread_tuning(WHISPER_THREADS, WHISPER_AUTOTUNE, WHISPER_TUNE_CLIP)
+set_whisper_process_workers(WHISPER_PROCESS_WORKERS)
+loop_monitor = LoopLagMonitor()
+
+
+def _create_archive() -> RecordingArchive | None:
+    """Recording archive if enabled and an encoder for it is installed."""
+    if not RECORDING_ARCHIVE:
+        return None
+    fmt = available_archive_format(RECORDING_FORMAT)
+    if fmt is None:
+        logger.warning("RECORDING_ARCHIVE is set but neither opuslib/libopus nor soundfile is available — not archiving")
+        return None
+    if fmt != RECORDING_FORMAT:
+        logger.warning(f"RECORDING_FORMAT={RECORDING_FORMAT} encoder is not available — archiving as {fmt}")
+    return RecordingArchive(RECORDING_DIR, fmt, RECORDING_SEGMENT_SECONDS, RECORDING_OPUS_BITRATE)
+
+
+archive = _create_archive()
+screenshot_capture = ScreenshotCapture(backend=SCREENSHOT_BACKEND)
+screenshot_ocr_enabled = SCREENSHOT_OCR and ocr_available()
+if SCREENSHOT_OCR and not screenshot_ocr_enabled:
+    logger.warning("SCREENSHOT_OCR is set but tesseract is not installed — using images only")
+
+# Track current generation for cancellation
+_current_generation: asyncio.Task | None = None
+
+
+async def on_transcript(source: str, speaker: int, text: str, meta: dict | None = None):
+    """Callback when a transcriber produces a final transcript.
+
+    meta: optional timing/confidence (start, end, confidence, no_speech_prob, segments).
+    """
+    context.add_transcript_line(source, speaker, text, meta)
+    event = {"source": source, "speaker": speaker, "text": text}
+    if meta:
+        event.update({k: meta[k] for k in ("start", "end", "confidence") if meta.get(k) is not None})
+    await emit_event("transcript", event)
+    await question_detector.add_transcript(source, speaker, text, meta)
+
+
+async def on_interim_transcript(source: str, speaker: int, text: str):
+    """Callback for a not-yet-final hypothesis (Deepgram interim results)."""
+    await emit_event("transcript_interim", {"source": source, "speaker": speaker, "text": text})
+    await question_detector.add_interim(source, speaker, text)
+
+
+async def on_utterance_end(source: str):
+    """Callback on speech pause."""
+    await question_detector.on_utterance_end(source)
+
+
+async def on_transcriber_status(source: str, status_type: str, message: str):
+    """Callback for local transcriber RTF policy changes (degraded / recovered)."""
+    await emit_event("status", {"type": status_type, "source": source, "message": message})
+
+
+async def _generate_answer(
+    question: str,
+    answer_id: str,
+    screenshot_b64: str | None = None,
+    screen_analysis: str | None = None,
+    screenshot_is_region: bool = False,
+    screen_text: str | None = None,
+    on_complete: Callable[[str], None] | None = None,
+    metrics: dict | None = None,
+):
+    """Run LLM generation and stream chunks via SSE.
+
+    on_complete(full_answer) is called only if generation finished without error.
+    metrics: extra fields (e.g. screenshot path, OCR time) reported with
+    latency and token usage in the log and in ai_answer_end.
+    """
+    full_answer = ""
+    metrics = dict(metrics or {})
+    usage: dict = {}
+    start = time.perf_counter()
+    try:
+        async for chunk in llm.generate_answer(
+            question=question,
+            context_history=context.get_recent_context()[:-1],
+            screenshot_b64=screenshot_b64,
+            screen_analysis=screen_analysis,
+            screenshot_is_region=screenshot_is_region,
+            screen_text=screen_text,
+            usage=usage,
+        ):
+            if not full_answer:
+                metrics["ttft_ms"] = round((time.perf_counter() - start) * 1000)
+            full_answer += chunk
+            context.update_answer(chunk)
+            await emit_event("ai_answer_chunk", {"text": chunk, "id": answer_id})
+        if on_complete:
+            on_complete(full_answer)
+    except asyncio.CancelledError:
+        logger.info(f"Generation cancelled [{answer_id}]")
+    except Exception as e:
+        err_str = str(e)
+        logger.error(f"LLM error ({llm.provider}/{llm.model}): {e}")
+        # Provide user-friendly error messages
+        if "AuthenticationError" in type(e).__name__ or "401" in err_str:
+            msg = f"API ключ недействителен для {llm.provider}. Проверьте .env файл."
+        elif "RateLimitError" in type(e).__name__ or "429" in err_str:
+            msg = f"Лимит запросов {llm.provider} превышен. Подождите или смените модель."
+        elif "insufficient_quota" in err_str:
+            msg = f"Недостаточно средств на аккаунте {llm.provider}."
+        elif "Connection" in type(e).__name__ or "connect" in err_str.lower():
+            msg = f"Нет подключения к {llm.provider}. Проверьте интернет."
+        else:
+            msg = f"LLM ошибка ({llm.provider}): {err_str[:150]}"
+        await emit_event("status", {"type": "error", "message": msg})
+
+    metrics["total_ms"] = round((time.perf_counter() - start) * 1000)
+    metrics.update(usage)
+    logger.info(f"Answer [{answer_id}] metrics: {metrics}")
+    await emit_event("ai_answer_end", {"full_answer": full_answer, "id": answer_id, "metrics": metrics})
+
+
+async def on_question_detected(question_text: str):
+    """Callback when a question is detected — start answer generation."""
+    global _current_generation
+
+    # Cancel previous generation if still running
+    if _current_generation and not _current_generation.done():
+        _current_generation.cancel()
+
+    answer_id = str(uuid.uuid4())[:8]
+    context.add_question(question_text)
+    await emit_event("question_detected", {"text": question_text})
+    await emit_event("ai_answer_start", {"question": question_text, "id": answer_id})
+
+    _current_generation = asyncio.create_task(
+        _generate_answer(question_text, answer_id)
+    )
+
+
+question_detector = QuestionDetector(on_question_detected=on_question_detected)
+
+# Transcribers (created on /start, not at import time)
+transcriber_mic = None
+transcriber_system = None
+interleaver = None  # DEEPGRAM_MULTICHANNEL: feeds transcriber_mic with both sources
+_current_transcription_provider = TRANSCRIPTION_PROVIDER
+_current_whisper_model = WHISPER_MODEL
+_pump_tasks: list[asyncio.Task] = []
+
+# Local providers → WhisperTranscriber engine
+WHISPER_ENGINES = {"whisper": ENGINE_WHISPERCPP, "faster-whisper": ENGINE_FASTER_WHISPER}
+
+
+def create_transcriber(provider: str, model: str | None = None, channel_labels: tuple[str, ...] | None = None):
+    """Factory: create a transcriber based on provider.
+
+    channel_labels (Deepgram only): one multichannel connection for several sources.
+    """
+    if provider in WHISPER_ENGINES:
+        return WhisperTranscriber(model or _current_whisper_model, on_transcript, on_utterance_end,
+                                  engine=WHISPER_ENGINES[provider], on_status=on_transcriber_status)
+    else:
+        return DeepgramTranscriber(
+            DEEPGRAM_API_KEY, on_transcript, on_utterance_end,
+            channel_labels=channel_labels, on_interim=on_interim_transcript,
+            opus_bitrate=_deepgram_opus_bitrate(),
+        )
+
+
+def _deepgram_opus_bitrate() -> int | None:
+    """Opus bitrate for the Deepgram uplink, or None for raw linear16."""
+    if not DEEPGRAM_OPUS:
+        return None
+    if not ogg_opus.is_available():
+        logger.warning("DEEPGRAM_OPUS is set but opuslib/libopus is not available — sending linear16")
+        return None
+    return DEEPGRAM_OPUS_BITRATE
+
+
+LEVEL_EVENT_CHUNKS = 3  # audio_level SSE event every 300ms per source
+
+
+async def audio_to_transcriber(queue, transcriber, label: str = "?"):
+    """Pump audio chunks from capture queue to transcriber (+ level meter events)."""
+    chunk_count = 0
+    level_db = -96.0
+    while True:
+        try:
+            chunk = await queue.async_q.get()
+            chunk_count += 1
+            if chunk_count <= 3 or chunk_count % 100 == 0:
+                logger.info(f"Audio pump [{label}]: chunk #{chunk_count}, {len(chunk.pcm)} bytes")
+            if archive:
+                archive.push(label, chunk.pcm, chunk.captured_at)  # Never blocks; first, so a send error can't lose it
+            await transcriber.send_audio(chunk.pcm, chunk.features, chunk.captured_at)
+            level_db = max(level_db, chunk.features.level_db)
+            if chunk_count % LEVEL_EVENT_CHUNKS == 0:
+                emit_transient("audio_level", {"source": label, "level_db": round(level_db, 1)})
+                level_db = -96.0
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Audio pump error [{label}]: {e}")
+            await asyncio.sleep(0.1)
+
+
+# --- Lifespan ---
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown lifecycle."""
+    logger.info(f"Backend starting on {BACKEND_HOST}:{BACKEND_PORT}")
+    if not OPENAI_API_KEY or not DEEPGRAM_API_KEY:
+        logger.warning("Missing API keys — some features will not work")
+    try:
+        devices = audio.list_input_devices()
+        logger.info(f"Available audio devices: {[d['name'] for d in devices]}")
+    except Exception as e:
+        logger.warning(f"Could not list audio devices: {e}")
+    logger.info(f"Transcription provider: {_current_transcription_provider}")
+    loop_monitor.start()
+
+    # Auto-preload Whisper model at startup so the user doesn't have to
+    # manually select it in settings before recording
+    engine = WHISPER_ENGINES.get(_current_transcription_provider)
+    if engine and _current_whisper_model:
+        if not is_model_ready(_current_whisper_model, engine) and not is_model_loading(_current_whisper_model, engine):
+            logger.info(f"Auto-preloading Whisper model: {_current_whisper_model} ({engine})")
+            asyncio.create_task(_bg_preload(_current_whisper_model, engine))
+
+    yield
+    # Shutdown
+    if audio.is_recording:
+        await _stop_recording()
+    await loop_monitor.stop()
+    shutdown_extract_pool()
+    await asyncio.to_thread(shutdown_whisper_workers)
+    logger.info("Backend shut down")
+
+
+# --- FastAPI app ---
+
+app = FastAPI(title="Interview Assistant", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/stream")
+async def stream(request: Request):
+    """SSE stream for the Electron overlay."""
+    async def event_generator():
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(sse_queue.get(), timeout=30)
+                yield event
+            except asyncio.TimeoutError:
+                yield {"event": "ping", "data": ""}
+
+    return EventSourceResponse(event_generator())
+
+
+async def _stop_recording():
+    """Internal: stop audio + close transcribers."""
+    global transcriber_mic, transcriber_system, interleaver
+    # Cancel pump tasks and wait for them to finish
+    for t in _pump_tasks:
+        t.cancel()
+    if _pump_tasks:
+        await asyncio.gather(*_pump_tasks, return_exceptions=True)
+    _pump_tasks.clear()
+    if archive:
+        await asyncio.to_thread(archive.stop)  # Drains what the pumps queued
+    await screenshot_capture.stop_precapture()
+    # Stop audio capture
+    audio.stop()
+    # Close transcribers
+    if transcriber_mic:
+        await transcriber_mic.close()
+        transcriber_mic = None
+    if transcriber_system:
+        await transcriber_system.close()
+        transcriber_system = None
+    interleaver = None
+
+
+@app.post("/start")
+async def start_recording():
+    """Start audio capture and transcription."""
+    global transcriber_mic, transcriber_system, interleaver
+
+    # Guard: don't start if already recording
+    if audio.is_recording:
+        return {"status": "error", "message": "Already recording"}
+
+    try:
+        provider = _current_transcription_provider
+        engine = WHISPER_ENGINES.get(provider)
+        model = _current_whisper_model if engine else None
+
+        # Validate Deepgram key
+        if provider == "deepgram" and not DEEPGRAM_API_KEY:
+            raise ValueError("DEEPGRAM_API_KEY not set in .env")
+
+        # Check Whisper model is ready (must be pre-downloaded via settings)
+        if engine:
+            if is_model_loading(model, engine):
+                raise ValueError(f"Модель {model} ещё загружается, подождите...")
+            if not is_model_ready(model, engine):
+                raise ValueError(f"Модель {model} не загружена. Выберите модель в настройках — загрузка начнётся автоматически.")
+
+        await audio.start()
+        if archive:
+            archive.start(sources=2 if audio.has_system_audio else 1)
+
+        if provider == "deepgram" and DEEPGRAM_MULTICHANNEL and audio.has_system_audio:
+            # One 2-channel connection; results are demultiplexed by channel index
+            labels = ("mic", "system")
+            transcriber_mic = create_transcriber(provider, channel_labels=labels)
+            await transcriber_mic.connect(label="mic+system")
+            interleaver = ChannelInterleaver(transcriber_mic, labels)
+            _pump_tasks.append(
+                asyncio.create_task(audio_to_transcriber(audio.mic_queue, interleaver.sink("mic"), "mic"))
+            )
+            _pump_tasks.append(
+                asyncio.create_task(audio_to_transcriber(audio.system_queue, interleaver.sink("system"), "system"))
+            )
+            question_detector.mic_only_mode = False
+            mode = f"mic + system ({provider}, multichannel)"
+        else:
+            # Create and connect mic transcriber
+            transcriber_mic = create_transcriber(provider, model)
+            await transcriber_mic.connect(label="mic")
+            _pump_tasks.append(
+                asyncio.create_task(audio_to_transcriber(audio.mic_queue, transcriber_mic, "mic"))
+            )
+
+            # Connect system audio transcriber only if BlackHole is available
+            if audio.has_system_audio:
+                transcriber_system = create_transcriber(provider, model)
+                await transcriber_system.connect(label="system")
+                _pump_tasks.append(
+                    asyncio.create_task(audio_to_transcriber(audio.system_queue, transcriber_system, "system"))
+                )
+                question_detector.mic_only_mode = False
+                mode = f"mic + system ({provider})"
+            else:
+                question_detector.mic_only_mode = True
+                mode = f"mic only ({provider})"
+
+        if SCREENSHOT_PRECAPTURE:
+            screenshot_capture.start_precapture(SCREENSHOT_PRECAPTURE_INTERVAL)
+
+        await emit_event("status", {"type": "recording", "message": f"Recording: {mode}"})
+        logger.info(f"Recording started: {mode}")
+        return {"status": "started", "mode": mode, "transcription": provider}
+    except Exception as e:
+        await emit_event("status", {"type": "error", "message": str(e)})
+        logger.error(f"Start error: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.post("/stop")
+async def stop_recording():
+    """Stop audio capture and transcription."""
+    await _stop_recording()
+    await emit_event("status", {"type": "stopped", "message": "Recording stopped"})
+    logger.info("Recording stopped")
+    return {"status": "stopped"}
+
+
+@app.post("/screenshot")
+async def take_screenshot(fresh: bool = False):
+    """Capture screen and analyze with Vision model.
+
+    Unchanged screens reuse the cached analysis; small changes send only the
+    changed region (see ScreenshotCapture.select). With pre-capture enabled
+    the latest background image is used unless ?fresh=true.
+    """
+    global _current_generation
+
+    try:
+        logger.info("Capturing screenshot...")
+        shot = await screenshot_capture.capture(fresh=fresh)
+        if shot.image_b64:
+            logger.info(f"Screenshot captured ({len(shot.image_b64)} bytes base64, "
+                        f"~{shot.vision_tokens} vision tokens, region={shot.region})")
+    except Exception as e:
+        logger.error(f"Screenshot capture failed: {e}")
+        await emit_event("status", {"type": "error", "message": f"Screenshot failed: {e}"})
+        return {"status": "error", "message": str(e)}
+
+    question = "Проанализируй скриншот и помоги решить задачу."
+    spoken_question = False
+    all_entries = question_detector.buffer + question_detector.mic_buffer
+    if all_entries:
+        question = " ".join(p["text"] for p in all_entries)
+        spoken_question = True
+        question_detector.buffer.clear()
+        question_detector.mic_buffer.clear()
+
+    if _current_generation and not _current_generation.done():
+        _current_generation.cancel()
+
+    answer_id = str(uuid.uuid4())[:8]
+    context.add_question(question, source="screenshot")
+    await emit_event("ai_answer_start", {"question": "Screenshot analysis", "id": answer_id})
+
+    if shot.unchanged:
+        cached = screenshot_capture.cached_analysis(shot)
+        if not spoken_question:
+            # Same screen, nothing new asked: the previous analysis is the answer
+            logger.info("Screenshot unchanged — returning cached analysis")
+            context.update_answer(cached)
+            await emit_event("ai_answer_chunk", {"text": cached, "id": answer_id})
+            await emit_event("ai_answer_end", {"full_answer": cached, "id": answer_id,
+                                               "metrics": {"path": "cached_answer"}})
+            return {"status": "ok", "cached": True}
+        _current_generation = asyncio.create_task(
+            _generate_answer(question, answer_id, screen_analysis=cached, metrics={"path": "cached_screen"})
+        )
+        return {"status": "ok"}
+
+    # Only the default prompt's answer describes the screen; a spoken question's doesn't
+    remember = None if spoken_question else (lambda text: screenshot_capture.remember_analysis(shot, text))
+
+    if screenshot_ocr_enabled:
+        img = shot.image.crop(shot.region) if shot.region else shot.image
+        try:
+            ocr = await asyncio.to_thread(run_ocr, img, OCR_LANGUAGES)
+            logger.info(f"OCR: {ocr.words} words, confidence {ocr.confidence:.0f}, {ocr.elapsed_ms:.0f}ms")
+            if ocr.confidence >= OCR_MIN_CONFIDENCE and ocr.words >= OCR_MIN_WORDS:
+                _current_generation = asyncio.create_task(
+                    _generate_answer(
+                        question, answer_id,
+                        screen_text=ocr.text,
+                        screen_analysis=shot.base_analysis,
+                        screenshot_is_region=shot.region is not None,
+                        on_complete=remember,
+                        metrics={"path": "ocr", "ocr_ms": round(ocr.elapsed_ms),
+                                 "ocr_confidence": round(ocr.confidence)},
+                    )
+                )
+                return {"status": "ok"}
+        except Exception as e:
+            logger.warning(f"OCR failed, sending image: {e}")
+
+    _current_generation = asyncio.create_task(
+        _generate_answer(
+            question, answer_id,
+            screenshot_b64=shot.image_b64,
+            screen_analysis=shot.base_analysis,
+            screenshot_is_region=shot.region is not None,
+            on_complete=remember,
+            metrics={"path": "vision", "vision_tokens_est": shot.vision_tokens},
+        )
+    )
+    return {"status": "ok"}
+
+
+@app.post("/force-answer")
+async def force_answer():
+    """Force answer generation from current buffer."""
+    await question_detector.force_trigger()
+    return {"status": "triggered"}
+
+
+@app.post("/trigger-mic")
+async def trigger_mic():
+    """Send candidate's mic buffer to LLM (F5 hotkey)."""
+    await question_detector.trigger_with_mic()
+    return {"status": "triggered"}
+
+
+@app.get("/transcript")
+async def get_transcript():
+    """Get full transcript log."""
+    return {"transcript": context.full_transcript}
+
+
+@app.get("/status")
+async def get_status():
+    """Get current application state."""
+    return {
+        "recording": audio.is_recording,
+        "has_system_audio": audio.has_system_audio,
+        "has_openai_key": bool(OPENAI_API_KEY),
+        "has_deepgram_key": bool(DEEPGRAM_API_KEY),
+        "exchanges_count": len(context.exchanges),
+        "transcript_lines": len(context.full_transcript),
+        "transcribers": _transcriber_stats(),
+        "audio_queues": audio.queue_stats(),
+        "echo_gate": audio.echo_stats(),
+        "audio_levels": audio.level_stats(),
+        "event_loop": loop_monitor.stats(),
+        "recording_archive": archive.stats() if archive else None,
+    }
+
+
+def _transcriber_stats() -> dict:
+    """Per-stream transcriber metrics (reconnects, backlog) where available."""
+    stats = {}
+    for label, t in (("mic", transcriber_mic), ("system", transcriber_system)):
+        if t is not None and hasattr(t, "stats"):
+            stats[label] = t.stats()
+    if interleaver is not None:
+        stats["channels"] = interleaver.stats()
+    return stats
+
+
+# --- Debug ---
+
+MAX_PROFILE_SECONDS = 60
+_profile_lock = asyncio.Lock()
+
+
+@app.get("/debug/profile")
+async def debug_profile(seconds: float = 5.0, format: str = "collapsed"):
+    """Sample all threads of the live process for N seconds.
+
+    format=collapsed → folded stacks (flamegraph.pl / speedscope),
+    format=speedscope → speedscope JSON.
+    """
+    if format not in ("collapsed", "speedscope"):
+        return {"status": "error", "message": f"Unknown format: {format}"}
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        return {"status": "error", "message": f"seconds must be in (0, {MAX_PROFILE_SECONDS}]"}
+    if _profile_lock.locked():
+        return {"status": "error", "message": "Profiling already in progress"}
+
+    async with _profile_lock:
+        logger.info(f"Profiling for {seconds}s ({format})...")
+        profiler = SamplingProfiler()
+        # Sample from a worker thread so the event loop keeps running (and gets sampled)
+        await asyncio.to_thread(profiler.run, seconds)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    if format == "speedscope":
+        return Response(
+            content=profiler.to_speedscope_json(),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="profile-{stamp}.speedscope.json"'},
+        )
+    return Response(
+        content=profiler.to_collapsed(),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="profile-{stamp}.collapsed.txt"'},
+    )
+
+
+@app.post("/ask")
+async def ask_question(request: Request):
+    """Submit a manual text question for AI to answer."""
+    body = await request.json()
+    question = body.get("question", "").strip()
+    if not question:
+        return {"status": "error", "message": "Empty question"}
+    await on_question_detected(question)
+    return {"status": "ok"}
+
+
+@app.get("/settings/llm")
+async def get_llm_settings():
+    """Get current LLM provider, model, and available options."""
+    return {
+        "provider": llm.provider,
+        "model": llm.model,
+        "available": {
+            "openai": OPENAI_MODELS,
+            "claude": CLAUDE_MODELS,
+        },
+        "claude_labels": CLAUDE_MODEL_LABELS,
+    }
+
+
+@app.post("/settings/llm")
+async def set_llm_settings(request: Request):
+    """Change LLM provider and/or model at runtime."""
+    body = await request.json()
+    provider = body.get("provider", llm.provider)
+    model = body.get("model", llm.model)
+
+    if provider not in ("openai", "claude"):
+        return {"status": "error", "message": f"Unknown provider: {provider}"}
+
+    available = OPENAI_MODELS if provider == "openai" else CLAUDE_MODELS
+    if model not in available:
+        return {"status": "error", "message": f"Unknown model: {model}"}
+
+    # Warn if switching to OpenAI without a key
+    if provider == "openai" and not OPENAI_API_KEY:
+        await emit_event("status", {"type": "error", "message": "OPENAI_API_KEY not set in .env"})
+        return {"status": "error", "message": "OPENAI_API_KEY not configured"}
+
+    llm.set_provider(provider, model)
+    return {"status": "ok", "provider": provider, "model": model}
+
+
+# --- Transcription settings ---
+
+@app.get("/settings/transcription")
+async def get_transcription_settings():
+    """Get current transcription provider, model, and available options."""
+    engine = WHISPER_ENGINES.get(_current_transcription_provider)
+    model_status = get_model_status(_current_whisper_model, engine) if engine else "n/a"
+    return {
+        "provider": _current_transcription_provider,
+        "providers": ["deepgram", *WHISPER_ENGINES],
+        "engine": engine,
+        "model": _current_whisper_model,
+        "available_models": WHISPER_MODELS,
+        "quantized_models": WHISPER_QUANTIZED_MODELS,
+        "download_mb": GGML_SIZES_MB.get(_current_whisper_model),
+        "recording": audio.is_recording,
+        "model_status": model_status,
+        "model_memory": get_whisper_cache_info(),
+    }
+
+
+async def _bg_preload_status(message: str | None):
+    """SSE callback for background model loading progress."""
+    if message:
+        await emit_event("status", {"type": "loading", "message": message})
+    else:
+        await emit_event("status", {"type": "model_ready", "message": "Модель загружена"})
+
+
+async def _bg_preload(model_name: str, engine: str = ENGINE_WHISPERCPP):
+    """Background task: download and load Whisper model."""
+    try:
+        await preload_model(model_name, on_status=_bg_preload_status, engine=engine)
+    except Exception as e:
+        await emit_event("status", {"type": "error", "message": f"Ошибка загрузки модели: {e}"})
+
+
+@app.post("/settings/transcription")
+async def set_transcription_settings(request: Request):
+    """Change transcription provider and/or Whisper model at runtime."""
+    global _current_transcription_provider, _current_whisper_model
+    body = await request.json()
+    provider = body.get("provider", _current_transcription_provider)
+    model = body.get("model", _current_whisper_model)
+
+    if provider != "deepgram" and provider not in WHISPER_ENGINES:
+        return {"status": "error", "message": f"Unknown provider: {provider}"}
+
+    if provider == "deepgram" and not DEEPGRAM_API_KEY:
+        return {"status": "error", "message": "DEEPGRAM_API_KEY not set in .env"}
+
+    engine = WHISPER_ENGINES.get(provider)
+    if engine and model not in WHISPER_MODELS and model not in WHISPER_QUANTIZED_MODELS:
+        return {"status": "error", "message": f"Unknown Whisper model: {model}"}
+
+    if engine == ENGINE_FASTER_WHISPER and is_quantized(model):
+        return {"status": "error", "message": "Квантованные GGML-модели работают только с whisper.cpp"}
+
+    _current_transcription_provider = provider
+    if engine:
+        _current_whisper_model = model
+        # Start background download/load (non-blocking)
+        if not is_model_ready(model, engine) and not is_model_loading(model, engine):
+            asyncio.create_task(_bg_preload(model, engine))
+
+    # If recording, restart with new provider (only if model ready)
+    if audio.is_recording:
+        if engine and not is_model_ready(model, engine):
+            await _stop_recording()
+            await emit_event("status", {"type": "loading", "message": f"Запись остановлена. Загрузка модели {model}..."})
+        else:
+            await _stop_recording()
+            await start_recording()
+
+    return {"status": "ok", "provider": provider, "model": model}
+
+
+# --- Profile & Job Description settings ---
+
+BACKEND_DIR = os.path.dirname(__file__)
+
+
+def _read_md_file(filename: str) -> str:
+    path = os.path.join(BACKEND_DIR, filename)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _write_md_file(filename: str, content: str):
+    path = os.path.join(BACKEND_DIR, filename)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+@app.get("/settings/profile")
+async def get_profile():
+    """Get current candidate profile."""
+    return {"content": _read_md_file("profile.md")}
+
+
+@app.post("/settings/profile")
+async def set_profile(request: Request):
+    """Update candidate profile and reload system prompt."""
+    body = await request.json()
+    content = body.get("content", "")
+    _write_md_file("profile.md", content)
+    llm.reload_system_prompt()
+    return {"status": "ok"}
+
+
+@app.get("/settings/job")
+async def get_job():
+    """Get current job description."""
+    return {"content": _read_md_file("job_description.md")}
+
+
+@app.post("/settings/job")
+async def set_job(request: Request):
+    """Update job description and reload system prompt."""
+    body = await request.json()
+    content = body.get("content", "")
+    _write_md_file("job_description.md", content)
+    llm.reload_system_prompt()
+    return {"status": "ok"}
+
+
+@app.post("/settings/profile/reset")
+async def reset_profile():
+    """Reset profile to example template."""
+    content = _read_md_file("profile.example.md")
+    _write_md_file("profile.md", content)
+    llm.reload_system_prompt()
+    return {"status": "ok", "content": content}
+
+
+@app.post("/settings/job/process")
+async def process_job(request: Request):
+    """Process job description text through LLM, save structured result."""
+    body = await request.json()
+    raw = body.get("content", "").strip()
+    if not raw:
+        return {"status": "error", "message": "Empty content"}
+    try:
+        result = await llm.format_document(raw_text=raw, doc_type="job")
+    except Exception as e:
+        logger.error(f"Job processing failed: {e}")
+        return {"status": "error", "message": str(e)}
+    _write_md_file("job_description.md", result)
+    llm.reload_system_prompt()
+    return {"status": "ok", "content": result}
+
+
+@app.post("/settings/job/reset")
+async def reset_job():
+    """Reset job description to example template."""
+    content = _read_md_file("job_description.example.md")
+    _write_md_file("job_description.md", content)
+    llm.reload_system_prompt()
+    return {"status": "ok", "content": content}
+
+
+# --- File upload with LLM processing ---
+
+ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx"}
+
+
+UPLOAD_MD_FILES = {"profile": "profile.md", "job": "job_description.md"}
+
+
+async def _format_upload(job: DocumentJob, file_bytes: bytes, report) -> str:
+    """Job processor: extract text locally → LLM format (map-reduce if long) → save .md."""
+    ext = os.path.splitext(job.filename)[1].lower()
+    raw_text = ""
+    if ext != ".pdf" or pdf_text_available():
+        await report("extracting", 0.1)
+        raw_text = await extract_text_async(file_bytes, job.filename)
+
+    await report("formatting", 0.3)
+    if raw_text:
+        result = await llm.format_document(
+            raw_text=raw_text, doc_type=job.doc_type,
+            map_reduce_min_chars=DOC_MAP_REDUCE_MIN_CHARS, map_concurrency=DOC_MAP_CONCURRENCY,
+            on_progress=report,
+        )
+    else:
+        # No pypdf or a scanned PDF: send it directly to LLM as base64
+        pdf_b64 = base64.b64encode(file_bytes).decode()
+        result = await llm.format_document(pdf_b64=pdf_b64, doc_type=job.doc_type)
+
+    _write_md_file(UPLOAD_MD_FILES[job.doc_type], result)
+    llm.reload_system_prompt()
+    return result
+
+
+async def _on_upload_update(job: DocumentJob):
+    data = {k: v for k, v in job.to_dict().items() if k != "result"}
+    if job.status == "done":
+        data["content"] = job.result
+        data["format_stats"] = llm.last_format_stats  # Jobs run one at a time
+    await emit_event("upload_progress", data)
+
+
+upload_jobs = DocumentJobQueue(process=_format_upload, on_update=_on_upload_update)
+
+
+async def _process_upload(file: UploadFile, doc_type: str):
+    """Cached result → returned at once; otherwise queue a background job and return its ID."""
+    filename = file.filename or "unknown"
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext not in ALLOWED_EXTENSIONS:
+        return {"status": "error", "message": f"Формат {ext} не поддерживается. Используйте PDF, DOC или DOCX."}
+
+    file_bytes = await file.read()
+    logger.info(f"Upload: {filename} ({len(file_bytes)} bytes)")
+
+    cached = upload_jobs.cache.get(cache_key(file_bytes, doc_type))
+    if cached is not None:
+        logger.info(f"Upload: {filename} — cached result")
+        _write_md_file(UPLOAD_MD_FILES[doc_type], cached)
+        llm.reload_system_prompt()
+        return {"status": "ok", "content": cached, "cached": True}
+
+    job = upload_jobs.submit(file_bytes, filename, doc_type)
+    return {"status": "accepted", "job_id": job.id}
+
+
+@app.post("/settings/profile/upload")
+async def upload_profile(file: UploadFile = File(...)):
+    """Upload resume file; processed with LLM in the background, saved as profile.md."""
+    return await _process_upload(file, "profile")
+
+
+@app.post("/settings/job/upload")
+async def upload_job(file: UploadFile = File(...)):
+    """Upload job description file; processed with LLM in the background, saved as job_description.md."""
+    return await _process_upload(file, "job")
+
+
+@app.get("/settings/upload/{job_id}")
+async def get_upload_job(job_id: str):
+    """Upload job state (progress is also pushed as `upload_progress` SSE events)."""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "message": "Задача не найдена"}
+    data = job.to_dict()
+    data["content"] = data.pop("result")
+    return data
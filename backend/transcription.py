@@ -3,19 +3,50 @@ Deepgram Streaming API client for real-time speech transcription.
 
 Two parallel WebSocket connections: one for microphone, one for system audio (BlackHole).
 This way we know who is speaking without relying on diarization.
+
+Interim hypotheses (interim_results=true) are forwarded to on_interim as
+live text; the committed finals (is_final segments joined up to
+speech_final / UtteranceEnd) remain the source of truth for on_transcript.
+
+Optionally (DEEPGRAM_OPUS) each 100ms chunk is compressed to an Ogg Opus
+page before sending (~24 kbit/s instead of 256 kbit/s per stream). The
+backlog keeps raw PCM; every (re)connection starts a fresh Ogg stream.
+
+Optionally (DEEPGRAM_MULTICHANNEL) both sources share one connection:
+ChannelInterleaver packs mic + system PCM into a 2-channel linear16 stream
+and results are routed back to their source by channel_index.
+
+Audio sent while the socket is down (network blip, reconnect in progress)
+is kept in a bounded, time-indexed backlog and replayed faster than real
+time once the connection is back — a short outage costs latency, not words.
 """
 
+import numpy as np
 import websockets
 from websockets.protocol import State as WsState
 import json
 import asyncio
 import logging
-from typing import Callable, Optional
+import time
+from collections import deque
+from typing import Callable, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
 DEEPGRAM_WS_URL = "wss://api.deepgram.com/v1/listen"
 
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # linear16
+
+# Reconnect / backlog settings
+MAX_RECONNECT_ATTEMPTS = 5
+BACKLOG_MAX_SECONDS = 30.0  # Older unsent audio is dropped (oldest first)
+REPLAY_SPEEDUP = 4.0  # Backlog is replayed at 4x real time
+
+# Multichannel: if one source runs this far ahead of another (device stall),
+# the lagging channel is padded with silence so the other isn't held back.
+MAX_CHANNEL_SKEW_SECONDS = 0.3
+
 
 class DeepgramTranscriber:
     def __init__(
@@ -23,49 +54,214 @@ class DeepgramTranscriber:
         api_key: str,
         on_transcript: Callable,
         on_utterance_end: Callable,
+        channel_labels: Optional[Sequence[str]] = None,
+        on_interim: Optional[Callable] = None,
+        opus_bitrate: Optional[int] = None,
     ):
+        """channel_labels: one source label per interleaved channel, e.g.
+        ("mic", "system"). None = single-channel stream labelled on connect().
+        on_interim: optional async callback(source, speaker, text) for
+        not-yet-final hypotheses.
+        opus_bitrate: if set, send Ogg Opus at this bitrate instead of linear16."""
         self.api_key = api_key
         self.on_transcript = on_transcript
         self.on_utterance_end = on_utterance_end
+        self.on_interim = on_interim
         self.ws = None
+        self.label = "?"
+        self.channel_labels = tuple(channel_labels) if channel_labels else None
+        self.channels = len(self.channel_labels) if self.channel_labels else 1
+        self.opus_bitrate = opus_bitrate
+        self._encoder = None  # OggOpusEncoder for the current connection
         self._receive_task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._closing = False
 
-    async def connect(self, label: str = "system"):
-        """Connect to Deepgram WebSocket streaming API."""
+        # is_final segments of the phrase in progress, per source label
+        self._committed: dict[str, list[str]] = {}
+        self._confidence: dict[str, list[float]] = {}  # Their Deepgram confidences
+        self._last_interim: dict[str, str] = {}
+
+        # Unsent audio: (monotonic capture time, chunk)
+        self._backlog: deque[tuple[float, bytes]] = deque()
+        self._replaying = False
+        self._outage_started: Optional[float] = None
+        self._bytes_per_second = SAMPLE_RATE * BYTES_PER_SAMPLE * self.channels
+
+        # Metrics (exposed via stats())
+        self._reconnects = 0
+        self._failed_reconnects = 0
+        self._backlogged_chunks = 0
+        self._replayed_chunks = 0
+        self._dropped_chunks = 0
+        self._max_backlog_seconds = 0.0
+        self._last_outage_seconds = 0.0
+        self._raw_bytes = 0
+        self._sent_bytes = 0
+
+    def _build_params(self) -> str:
+        if self.opus_bitrate:
+            # Rate and channel layout also travel in the OpusHead packet
+            encoding = "&encoding=opus&sample_rate=16000"
+        else:
+            encoding = "&encoding=linear16&sample_rate=16000"
         params = (
             "?model=nova-3"
             "&language=ru"
-            "&encoding=linear16"
-            "&sample_rate=16000"
-            "&channels=1"
+            f"{encoding}"
+            f"&channels={self.channels}"
             "&smart_format=true"
             "&interim_results=true"
             "&endpointing=300"
             "&utterance_end_ms=2000"
         )
-        headers = {"Authorization": f"Token {self.api_key}"}
+        if self.channels > 1:
+            params += "&multichannel=true"
+        return params
+
+    def _source_label(self, channel_index: Optional[list]) -> str:
+        """Map a Deepgram channel index back to the source label."""
+        if not self.channel_labels or not channel_index:
+            return self.label
+        idx = channel_index[0]
+        if 0 <= idx < len(self.channel_labels):
+            return self.channel_labels[idx]
+        return self.label
+
+    async def connect(self, label: str = "system"):
+        """Connect to Deepgram WebSocket streaming API."""
+        self.label = label
+        self._closing = False
+        await self._open()
+        self._receive_task = asyncio.create_task(self._receive_loop())
+        logger.info(f"Deepgram connected [{label}]")
 
+    async def _open(self):
+        """Open the WebSocket and start replaying any backlog."""
+        headers = {"Authorization": f"Token {self.api_key}"}
         self.ws = await websockets.connect(
-            DEEPGRAM_WS_URL + params,
+            DEEPGRAM_WS_URL + self._build_params(),
             additional_headers=headers,
             ping_interval=20,
         )
-        self._receive_task = asyncio.create_task(self._receive_loop(label))
-        logger.info(f"Deepgram connected [{label}]")
+        if self.opus_bitrate:
+            from ogg_opus import OggOpusEncoder
+            self._encoder = OggOpusEncoder(
+                sample_rate=SAMPLE_RATE, channels=self.channels, bitrate=self.opus_bitrate,
+            )
+        if self._backlog:
+            # Set before returning to _reconnect, which ends the outage: chunks
+            # arriving before the task runs must not start a new one
+            self._replaying = True
+            self._replay_task = asyncio.create_task(self._replay_backlog())
 
-    async def send_audio(self, audio_bytes: bytes):
-        """Send an audio chunk to Deepgram."""
-        if self.ws and self.ws.state == WsState.OPEN:
-            await self.ws.send(audio_bytes)
+    def _is_open(self) -> bool:
+        return self.ws is not None and self.ws.state == WsState.OPEN
 
-    async def _receive_loop(self, label: str):
-        """Receive and process responses from Deepgram with auto-reconnect."""
-        max_retries = 5
+    async def _send(self, audio_bytes: bytes):
+        """Send one PCM chunk on the current connection (Opus-encoded if enabled)."""
+        payload = self._encoder.encode(audio_bytes) if self._encoder else audio_bytes
+        self._raw_bytes += len(audio_bytes)
+        self._sent_bytes += len(payload)
+        if payload:
+            await self.ws.send(payload)
+
+    async def send_audio(self, audio_bytes: bytes, features=None, captured_at=None):
+        """Send an audio chunk to Deepgram (or backlog it while disconnected).
+
+        features (audio_features.ChunkFeatures) and captured_at are accepted
+        for interface parity and unused.
+        """
+        if self._closing:
+            return
+        # Keep ordering: while anything is queued, new audio goes behind it
+        if self._backlog or self._replaying or not self._is_open():
+            self._enqueue(audio_bytes)
+            return
+        try:
+            await self._send(audio_bytes)
+        except websockets.exceptions.ConnectionClosed:
+            self._enqueue(audio_bytes)
+
+    def _enqueue(self, audio_bytes: bytes):
+        """Append a chunk to the backlog, dropping audio older than BACKLOG_MAX_SECONDS."""
+        now = time.monotonic()
+        if self._outage_started is None and not self._replaying:
+            self._outage_started = now
+        self._backlog.append((now, audio_bytes))
+        self._backlogged_chunks += 1
+
+        while self._backlog and now - self._backlog[0][0] > BACKLOG_MAX_SECONDS:
+            self._backlog.popleft()
+            self._dropped_chunks += 1
+            if self._dropped_chunks == 1 or self._dropped_chunks % 100 == 0:
+                logger.warning(f"Deepgram backlog full [{self.label}]: dropped {self._dropped_chunks} chunks")
+
+        self._max_backlog_seconds = max(self._max_backlog_seconds, self.backlog_seconds)
+
+    @property
+    def backlog_seconds(self) -> float:
+        """Duration of audio currently waiting to be sent."""
+        return sum(len(c) for _, c in self._backlog) / self._bytes_per_second
+
+    async def _replay_backlog(self):
+        """Send backlogged audio faster than real time, in capture order (_open sets _replaying)."""
+        backlog_s = self.backlog_seconds
+        logger.info(f"Deepgram replaying {len(self._backlog)} chunks ({backlog_s:.1f}s) [{self.label}]")
+        start = time.monotonic()
+        sent_seconds = 0.0
+        try:
+            while self._backlog and self._is_open():
+                _, chunk = self._backlog[0]
+                await self._send(chunk)
+                self._backlog.popleft()
+                self._replayed_chunks += 1
+
+                # Pace at REPLAY_SPEEDUP x real time so we don't burst the uplink
+                sent_seconds += len(chunk) / self._bytes_per_second
+                delay = start + sent_seconds / REPLAY_SPEEDUP - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            pass
+        except websockets.exceptions.ConnectionClosed:
+            logger.warning(f"Deepgram closed during replay [{self.label}], {len(self._backlog)} chunks left")
+        finally:
+            self._replaying = False
+
+        if not self._backlog:
+            logger.info(f"Deepgram backlog drained in {time.monotonic() - start:.1f}s [{self.label}]")
+
+    async def _reconnect(self) -> bool:
+        """Reconnect with exponential backoff. Returns True on success."""
         retry_delay = 1.0
+        for attempt in range(MAX_RECONNECT_ATTEMPTS):
+            logger.info(f"Reconnecting [{self.label}] in {retry_delay}s (attempt {attempt + 1})...")
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 10.0)
+            try:
+                await self._open()
+            except Exception as e:
+                self._failed_reconnects += 1
+                logger.warning(f"Deepgram reconnect failed [{self.label}]: {e}")
+                continue
+
+            self._reconnects += 1
+            if self._outage_started is not None:
+                self._last_outage_seconds = time.monotonic() - self._outage_started
+                self._outage_started = None
+            logger.info(f"Deepgram reconnected [{self.label}] after {self._last_outage_seconds:.1f}s, "
+                        f"backlog {self.backlog_seconds:.1f}s")
+            return True
+        return False
+
+    async def _receive_loop(self):
+        """Receive and process responses from Deepgram with auto-reconnect."""
+        label = self.label
         logger.info(f"Deepgram receive loop started [{label}]")
 
         msg_count = 0
-        for attempt in range(max_retries):
+        while True:
             try:
                 async for msg in self.ws:
                     data = json.loads(msg)
@@ -81,47 +277,112 @@ class DeepgramTranscriber:
                         text = alt.get("transcript", "")[:60]
                         logger.info(f"[{label}] msg#{msg_count} type={msg_type} final={is_final} speech_final={speech_final} text='{text}'")
 
-                    # Final transcript of a complete phrase
-                    if data.get("is_final") and data.get("speech_final"):
-                        alternatives = data.get("channel", {}).get("alternatives", [])
-                        alt = alternatives[0] if alternatives else {}
-                        transcript = alt.get("transcript", "")
-                        if transcript.strip():
-                            logger.info(f"[{label}] transcript: {transcript}")
-                            await self.on_transcript(label, 0, transcript)
-                        else:
-                            logger.debug(f"[{label}] empty speech_final, skipping")
-
-                    # Utterance end — long pause in speech
-                    if data.get("type") == "UtteranceEnd":
-                        logger.info(f"[{label}] utterance_end")
-                        await self.on_utterance_end(label)
-
-                # Clean exit
-                break
+                    await self._handle_message(data)
+
+                # Server closed the stream cleanly (e.g. after CloseStream)
+                if self._closing or not await self._handle_disconnect():
+                    break
 
             except asyncio.CancelledError:
                 break
             except websockets.exceptions.ConnectionClosed as e:
                 logger.warning(f"Deepgram WebSocket closed [{label}]: {e}")
-                if attempt < max_retries - 1:
-                    logger.info(f"Reconnecting [{label}] in {retry_delay}s (attempt {attempt + 1})...")
-                    await asyncio.sleep(retry_delay)
-                    retry_delay = min(retry_delay * 2, 10.0)
-                    try:
-                        await self.connect(label)
-                    except Exception:
-                        continue
-                break
+                try:
+                    if self._closing or not await self._handle_disconnect():
+                        break
+                except asyncio.CancelledError:
+                    break
             except Exception as e:
                 logger.error(f"Deepgram receive error [{label}]: {e}")
                 break
 
+    async def _handle_disconnect(self) -> bool:
+        """Start outage accounting and reconnect. Returns True if reconnected."""
+        if self._outage_started is None:
+            self._outage_started = time.monotonic()
+        if await self._reconnect():
+            return True
+        logger.error(f"Deepgram reconnect gave up [{self.label}]; buffering up to {BACKLOG_MAX_SECONDS:.0f}s")
+        return False
+
+    async def _handle_message(self, data: dict):
+        """Dispatch one Deepgram response."""
+        if data.get("type", "Results") == "Results":
+            label = self._source_label(data.get("channel_index"))
+            alternatives = data.get("channel", {}).get("alternatives", [])
+            alt = alternatives[0] if alternatives else {}
+            transcript = alt.get("transcript", "").strip()
+            committed = self._committed.setdefault(label, [])
+
+            if data.get("is_final"):
+                # Finalized segment; the phrase is complete on speech_final
+                if transcript:
+                    committed.append(transcript)
+                    if "confidence" in alt:
+                        self._confidence.setdefault(label, []).append(alt["confidence"])
+                if data.get("speech_final"):
+                    await self._flush_final(label)
+            elif transcript:
+                # Interim hypothesis for audio after the committed segments
+                await self._emit_interim(label, " ".join(committed + [transcript]))
+
+        # Utterance end — long pause in speech
+        if data.get("type") == "UtteranceEnd":
+            label = self._source_label(data.get("channel"))
+            # Endpointing may miss speech_final in noise: commit what we have
+            await self._flush_final(label)
+            logger.info(f"[{label}] utterance_end")
+            await self.on_utterance_end(label)
+
+    async def _flush_final(self, label: str):
+        """Emit the committed segments of `label` as one final transcript."""
+        segments = self._committed.pop(label, [])
+        confidences = self._confidence.pop(label, [])
+        self._last_interim.pop(label, None)
+        transcript = " ".join(segments)
+        if transcript.strip():
+            logger.info(f"[{label}] transcript: {transcript}")
+            # Deepgram times are stream offsets (shifted by outages/replay): confidence only
+            meta = {"confidence": sum(confidences) / len(confidences)} if confidences else None
+            await self.on_transcript(label, 0, transcript, meta)
+        else:
+            logger.debug(f"[{label}] empty speech_final, skipping")
+
+    async def _emit_interim(self, label: str, text: str):
+        if not self.on_interim or self._last_interim.get(label) == text:
+            return
+        self._last_interim[label] = text
+        await self.on_interim(label, 0, text)
+
+    def stats(self) -> dict:
+        """Reconnect and backlog metrics."""
+        return {
+            "connected": self._is_open(),
+            "reconnects": self._reconnects,
+            "failed_reconnects": self._failed_reconnects,
+            "backlog_seconds": round(self.backlog_seconds, 2),
+            "max_backlog_seconds": round(self._max_backlog_seconds, 2),
+            "last_outage_seconds": round(self._last_outage_seconds, 2),
+            "backlogged_chunks": self._backlogged_chunks,
+            "replayed_chunks": self._replayed_chunks,
+            "dropped_chunks": self._dropped_chunks,
+            "encoding": "opus" if self.opus_bitrate else "linear16",
+            "raw_bytes": self._raw_bytes,
+            "sent_bytes": self._sent_bytes,
+        }
+
     async def close(self):
         """Gracefully close the WebSocket connection."""
-        if self._receive_task:
-            self._receive_task.cancel()
-            self._receive_task = None
+        self._closing = True
+        for task in (self._replay_task, self._receive_task):
+            if task:
+                task.cancel()
+        self._replay_task = None
+        self._receive_task = None
+        self._replaying = False
+        if self._backlog:
+            logger.info(f"Deepgram closing with {self.backlog_seconds:.1f}s unsent [{self.label}]")
+            self._backlog.clear()
         if self.ws:
             try:
                 await self.ws.send(json.dumps({"type": "CloseStream"}))
@@ -129,3 +390,87 @@ class DeepgramTranscriber:
             except Exception:
                 pass
             self.ws = None
+
+
+class _ChannelSink:
+    """Per-source adapter so the audio pump can treat one channel as a transcriber."""
+
+    def __init__(self, interleaver: "ChannelInterleaver", label: str):
+        self._interleaver = interleaver
+        self.label = label
+
+    async def send_audio(self, audio_bytes: bytes, features=None, captured_at=None):
+        await self._interleaver.push(self.label, audio_bytes, captured_at)
+
+
+class ChannelInterleaver:
+    """Interleaves per-source int16 PCM into one multichannel linear16 stream.
+
+    Sources are aligned by sample count: a frame is emitted only when every
+    channel has audio for it. If one source stalls for longer than
+    MAX_CHANNEL_SKEW_SECONDS, its channel is filled with silence. Audio the
+    stalled source delivers late (captured before the padding was added)
+    stands in for that silence and is dropped, up to the padded amount, so
+    the channels stay aligned; audio captured after it is kept.
+    """
+
+    def __init__(self, transcriber: DeepgramTranscriber, labels: Sequence[str]):
+        self.transcriber = transcriber
+        self.labels = tuple(labels)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        self._pending: list[np.ndarray] = [np.empty(0, dtype=np.int16) for _ in self.labels]
+        self._max_skew = int(SAMPLE_RATE * MAX_CHANNEL_SKEW_SECONDS)
+        self._owed = [0] * len(self.labels)  # Padding not yet matched by late audio
+        self._padded_at = [0.0] * len(self.labels)  # Wall time of the last padding
+        self.padded_samples = 0
+        self.dropped_late_samples = 0
+
+    def sink(self, label: str) -> _ChannelSink:
+        return _ChannelSink(self, label)
+
+    async def push(self, label: str, audio_bytes: bytes, captured_at: Optional[float] = None):
+        """Queue a mono chunk for `label` and send every complete interleaved frame.
+
+        captured_at: wall-clock end of the chunk (None = treat it as late)."""
+        i = self._index[label]
+        chunk = np.frombuffer(audio_bytes, dtype=np.int16)
+        if self._owed[i]:
+            if captured_at is not None and captured_at - chunk.size / SAMPLE_RATE >= self._padded_at[i]:
+                self._owed[i] = 0  # Fresh audio: the source was silent, not late
+            else:
+                late = min(self._owed[i], chunk.size)
+                chunk = chunk[late:]
+                self._owed[i] -= late
+                self.dropped_late_samples += late
+        self._pending[i] = np.concatenate((self._pending[i], chunk)) if self._pending[i].size else chunk
+
+        lengths = [p.size for p in self._pending]
+        longest = max(lengths)
+        if longest - min(lengths) > self._max_skew:
+            # A source stalled: pad lagging channels so the others keep flowing
+            for j, p in enumerate(self._pending):
+                if p.size < longest - self._max_skew:
+                    pad = longest - self._max_skew - p.size
+                    self._pending[j] = np.concatenate((p, np.zeros(pad, dtype=np.int16)))
+                    self._owed[j] += pad
+                    self._padded_at[j] = time.time()
+                    self.padded_samples += pad
+
+        n = min(p.size for p in self._pending)
+        if n == 0:
+            return
+
+        frame = np.empty((n, len(self.labels)), dtype=np.int16)
+        for j, p in enumerate(self._pending):
+            frame[:, j] = p[:n]
+            self._pending[j] = p[n:]
+        await self.transcriber.send_audio(frame.tobytes())
+
+    def stats(self) -> dict:
+        """Channel alignment metrics: padding added and late audio dropped for it."""
+        lengths = [p.size for p in self._pending]
+        return {
+            "skew_seconds": round((max(lengths) - min(lengths)) / SAMPLE_RATE, 2),
+            "padded_seconds": round(self.padded_samples / SAMPLE_RATE, 2),
+            "dropped_late_seconds": round(self.dropped_late_samples / SAMPLE_RATE, 2),
+        }
@@ -1,5 +1,6 @@
 """
-Local Whisper transcription using pywhispercpp (whisper.cpp).
+Local Whisper transcription using pywhispercpp (whisper.cpp) or
+faster-whisper (CTranslate2, int8 on CPU).
 
 Buffers audio chunks (100ms, int16 PCM 16kHz) and periodically runs
 Whisper transcription in a background thread. Uses simple energy-based
@@ -9,30 +10,126 @@ GGML models are loaded from (in priority order):
   1. ~/.axel-assistant/models/ggml-<name>.bin
   2. ~/Library/Application Support/superwhisper/ggml-<name>.bin
   3. Auto-download by pywhispercpp (model name)
+
+Quantized variants (e.g. "large-v3-turbo-q5_0") use the same lookup and are
+downloaded from the whisper.cpp Hugging Face repo on first load.
+
+Loaded models stay in a process-wide LRU cache limited by a memory budget
+(WHISPER_MEMORY_BUDGET_MB); idle models are evicted before a new one loads.
+whisper.cpp copies weights into its own buffers (no mmap loading), so the
+budget is accounted by measured RSS growth per model, or GGML file size.
+
+After loading, a short warm-up decode runs before the model is reported
+ready; the first time a model is loaded on a host, n_threads is autotuned
+on a speech clip and saved (see whisper_tuning.py).
+
+With WHISPER_PROCESS_WORKERS > 0 the cached "model" is a WhisperWorkerPool:
+the model lives in worker processes (whisper_workers.py) and each worker is
+one more concurrent decode slot.
+
+Transcripts carry timing and confidence: on_transcript gets a meta dict with
+wall-clock start/end (mapped through the capture time of each chunk) and
+per-segment confidence (+ word timestamps on faster-whisper). Segments that
+look like decoded silence (high no-speech probability, low confidence) are
+dropped before the text-pattern hallucination filter.
 """
 
 import asyncio
+import contextlib
+import gc
 import logging
+import math
+import os
 import re
-from collections import Counter
+import threading
+import time
+from collections import Counter, OrderedDict, deque
 import numpy as np
 from pathlib import Path
 from typing import Callable, Optional
 
+import whisper_tuning
+from whisper_workers import WhisperWorkerPool
+from audio_features import SILENCE_RMS, AudioChunk, ChunkFeatures, buffer_rms, compute_bytes, voice_ratio
+
 logger = logging.getLogger(__name__)
 
 SAMPLE_RATE = 16000
 MODELS_DIR = Path.home() / ".axel-assistant" / "models"
 SUPERWHISPER_DIR = Path.home() / "Library" / "Application Support" / "superwhisper"
 
+# Engines: whisper.cpp (GGML, Metal on Apple Silicon) or CTranslate2 via
+# faster-whisper (int8 on CPU — for Linux hosts without a GPU)
+ENGINE_WHISPERCPP = "whispercpp"
+ENGINE_FASTER_WHISPER = "faster-whisper"
+ENGINES = (ENGINE_WHISPERCPP, ENGINE_FASTER_WHISPER)
+FASTER_WHISPER_COMPUTE_TYPE = "int8"
+FASTER_WHISPER_WORKERS = 2  # Concurrent decodes (mic + system) on one model
+
+# Quantized GGML variants ("<model>-q5_0" etc., whisper.cpp only) are downloaded
+# from the whisper.cpp Hugging Face repo into MODELS_DIR
+QUANT_SUFFIXES = ("q5_0", "q5_1", "q8_0")
+GGML_URL = "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-{name}.bin"
+DOWNLOAD_CHUNK = 1 << 20
+
+# Approximate GGML download sizes (MB), shown before a model is downloaded
+GGML_SIZES_MB = {
+    "tiny": 75, "base": 142, "small": 466, "medium": 1500, "large-v3": 3100, "large-v3-turbo": 1600,
+    "tiny-q5_1": 31, "tiny-q8_0": 42, "base-q5_1": 57, "base-q8_0": 78,
+    "small-q5_1": 181, "small-q8_0": 252, "medium-q5_0": 514, "medium-q8_0": 785,
+    "large-v3-q5_0": 1080, "large-v3-turbo-q5_0": 547, "large-v3-turbo-q8_0": 834,
+}
+
 # VAD thresholds
 # Mic RMS is typically 500-5000+; system audio via BlackHole is much quieter (50-300).
 # Using a low threshold to catch both sources reliably.
-SILENCE_RMS_THRESHOLD = 80  # RMS below this = silence
+SILENCE_RMS_THRESHOLD = SILENCE_RMS  # RMS below this = silence (shared with capture)
+# Hallucination gate: loud buffers with little energy in the voice band
+# (fan, keyboard, hum) are not sent to Whisper. Speech keeps nearly all of its
+# energy in 100-4000Hz: the bundled tuning clip measures over 0.998 in every 3s piece.
+# benchmarks/bench_asr.py reports the pieces of a real corpus this would drop.
+MIN_VOICE_RATIO = 0.6
 SILENCE_CHUNKS_FOR_UTTERANCE_END = 15  # 15 * 100ms = 1.5s silence → utterance end
 MIN_SPEECH_CHUNKS = 5  # At least 500ms of speech to trigger transcription
 PROCESS_INTERVAL_CHUNKS = 30  # Process every 3 seconds max
 
+# Real-time factor policy, per stream. RTF = (lock wait + decode time) / audio
+# duration, over the last RTF_WINDOW decodes. When it exceeds RTF_OVERLOAD the
+# stream degrades:
+#   1. switch to the largest already-cached model of the same engine that is
+#      smaller than the current one (no new model is loaded under pressure);
+#   2. in either case, compact buffers before decoding: runs of silence longer
+#      than KEEP_SILENT_CHUNKS are dropped, and if the buffer still holds more
+#      than MAX_LAG_SECONDS of audio, only the newest MAX_LAG_SECONDS are kept
+#      (the latest speech is what the question detector needs).
+# When the rolling RTF falls below RTF_RECOVER the stream returns to its
+# configured model and stops compacting. Switches in either direction are at
+# least RTF_SWITCH_COOLDOWN apart, and each one emits a status event.
+RTF_WINDOW = 5
+RTF_MIN_SAMPLES = 3
+RTF_OVERLOAD = 1.0
+RTF_RECOVER = 0.5
+RTF_SWITCH_COOLDOWN = 15.0  # seconds
+KEEP_SILENT_CHUNKS = 3  # 300ms of silence kept between speech when compacting
+MAX_LAG_SECONDS = 8.0
+
+# Backlogs (after a stall, or the final flush in close()) longer than
+# SPLIT_MIN_CHUNKS are cut at silences into pieces of SPLIT_TARGET_CHUNKS..
+# SPLIT_MAX_CHUNKS, decoded concurrently (up to the engine's decode slots)
+# and emitted in order, dropping words repeated across a boundary.
+SPLIT_MIN_CHUNKS = 100  # 10s
+SPLIT_TARGET_CHUNKS = 50  # Cut at the first pause after 5s...
+SPLIT_MAX_CHUNKS = 250  # ...or at the quietest chunk by 25s (one Whisper window)
+SPLIT_SILENCE_CHUNKS = 3  # 300ms pause = cut point
+MAX_BOUNDARY_WORDS = 6  # Longest repeat removed at a boundary
+
+# Segment confidence = mean token probability (exp(avg_logprob) on faster-whisper).
+# Whisper's own silence rule: no-speech probability above NO_SPEECH_PROB with
+# confidence below LOW_CONFIDENCE (avg_logprob < -1) is a decoded pause.
+NO_SPEECH_PROB = 0.6
+LOW_CONFIDENCE = 0.37
+MIN_CONFIDENCE = 0.2  # Dropped regardless of no-speech probability
+
 # Known Whisper hallucination patterns (model artifacts from YouTube training data)
 _HALLUCINATION_PATTERNS = [
     re.compile(r"продолжение\s+следует", re.IGNORECASE),
@@ -45,6 +142,17 @@ _HALLUCINATION_PATTERNS = [
 ]
 
 
+def _is_unreliable(segment: dict) -> bool:
+    """Decoded silence or noise, judged by the decoder's own probabilities."""
+    confidence = segment["confidence"]
+    if confidence is None:
+        return False
+    if confidence < MIN_CONFIDENCE:
+        return True
+    no_speech = segment["no_speech_prob"]
+    return no_speech is not None and no_speech > NO_SPEECH_PROB and confidence < LOW_CONFIDENCE
+
+
 def _is_hallucination(text: str) -> bool:
     """Check if text matches known Whisper hallucination patterns."""
     for pattern in _HALLUCINATION_PATTERNS:
@@ -62,24 +170,63 @@ def _is_hallucination(text: str) -> bool:
     return False
 
 
-# Global model cache: {model_name: Model}
-_model_cache: dict = {}
+# Global model cache: {model key: Model}, least recently used first. The key is
+# the model name for whisper.cpp and "<engine>/<name>" for other engines.
+# Bounded by a memory budget (set_memory_budget); models attached to a live
+# WhisperTranscriber are never evicted.
+_model_cache: "OrderedDict[str, object]" = OrderedDict()
+_model_rss: dict[str, int] = {}  # Bytes the process grew by when the model was loaded
+_model_refs: Counter = Counter()  # model key → WhisperTranscribers using it
+_model_last_used: dict[str, float] = {}
 _model_loading: dict[str, asyncio.Event] = {}
 _model_error: dict[str, str] = {}
+_memory_budget = 0  # Bytes; 0 = unlimited
+_model_threads: dict[str, int] = {}  # n_threads each cached model decodes with
+
+# Thread tuning (set_thread_tuning): explicit n_threads (0 = tuned/default),
+# one-time autotune per (model, host), optional speech WAV instead of the bundled clip
+_tuning = {"n_threads": 0, "autotune": True, "clip_path": None}
+_process_workers = 0  # > 0: models load into that many worker processes
 
 # Global lock: whisper.cpp uses Metal GPU which can't handle concurrent
-# command buffers from multiple model instances. Serialize all transcribe() calls.
+# command buffers from multiple model instances. Serialize all whisper.cpp
+# transcribe() calls (faster-whisper runs FASTER_WHISPER_WORKERS in parallel).
 _transcribe_lock = asyncio.Lock()
 
 
-def is_model_ready(model_name: str) -> bool:
+def model_key(model_name: str, engine: str = ENGINE_WHISPERCPP) -> str:
+    """Cache key of a model for an engine."""
+    return model_name if engine == ENGINE_WHISPERCPP else f"{engine}/{model_name}"
+
+
+def _parse_key(key: str) -> tuple[str, str]:
+    """(engine, model_name) from a cache key."""
+    engine, sep, name = key.partition("/")
+    return (engine, name) if sep and engine in ENGINES else (ENGINE_WHISPERCPP, key)
+
+
+def _engine_lock(engine: str, model=None):
+    # Worker processes each own their context: no lock needed
+    if engine != ENGINE_WHISPERCPP or isinstance(model, WhisperWorkerPool):
+        return contextlib.nullcontext()
+    return _transcribe_lock
+
+
+def _decode_slots(engine: str, model=None) -> int:
+    """How many decodes of one model can run at once."""
+    if isinstance(model, WhisperWorkerPool):
+        return model.size
+    return FASTER_WHISPER_WORKERS if engine == ENGINE_FASTER_WHISPER else 1
+
+
+def is_model_ready(model_name: str, engine: str = ENGINE_WHISPERCPP) -> bool:
     """Check if a model is loaded and ready to use."""
-    return model_name in _model_cache
+    return model_key(model_name, engine) in _model_cache
 
 
-def is_model_loading(model_name: str) -> bool:
+def is_model_loading(model_name: str, engine: str = ENGINE_WHISPERCPP) -> bool:
     """Check if a model is currently being downloaded/loaded."""
-    return model_name in _model_loading
+    return model_key(model_name, engine) in _model_loading
 
 
 def _find_ggml_file(model_name: str) -> Optional[Path]:
@@ -97,30 +244,365 @@ def _find_ggml_file(model_name: str) -> Optional[Path]:
     return None
 
 
-def has_local_model(model_name: str) -> bool:
-    """Check if GGML model file exists locally."""
+def is_quantized(model_name: str) -> bool:
+    """True for quantized GGML variants like "large-v3-turbo-q5_0"."""
+    return model_name.rsplit("-", 1)[-1] in QUANT_SUFFIXES
+
+
+def download_ggml(model_name: str, on_progress: Optional[Callable[[float], None]] = None) -> Path:
+    """Download ggml-<name>.bin into MODELS_DIR (blocking). on_progress(fraction)."""
+    import urllib.request
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    target = MODELS_DIR / f"ggml-{model_name}.bin"
+    partial = target.with_suffix(".bin.part")
+    url = GGML_URL.format(name=model_name)
+    logger.info(f"Downloading {url}")
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response, open(partial, "wb") as f:
+            total = int(response.headers.get("Content-Length") or 0)
+            done = 0
+            while chunk := response.read(DOWNLOAD_CHUNK):
+                f.write(chunk)
+                done += len(chunk)
+                if on_progress and total:
+                    on_progress(done / total)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    partial.replace(target)
+    return target
+
+
+def _find_faster_whisper_dir(model_name: str) -> Optional[Path]:
+    """Find a CTranslate2 model directory: ~/.axel-assistant/models/faster-whisper-<name>
+    or the Hugging Face cache faster-whisper downloads into. Returns path or None."""
+    p = MODELS_DIR / f"faster-whisper-{model_name}"
+    if (p / "model.bin").exists():
+        return p
+    try:
+        from faster_whisper.utils import download_model
+        return Path(download_model(model_name, local_files_only=True))
+    except Exception:
+        return None
+
+
+def has_local_model(model_name: str, engine: str = ENGINE_WHISPERCPP) -> bool:
+    """Check if the model files exist locally."""
+    if engine == ENGINE_FASTER_WHISPER:
+        return _find_faster_whisper_dir(model_name) is not None
     return _find_ggml_file(model_name) is not None
 
 
-def get_model_status(model_name: str) -> str:
-    """Get model status: ready / loading / error / available / not_downloaded."""
-    if model_name in _model_cache:
+def get_model_status(model_name: str, engine: str = ENGINE_WHISPERCPP) -> str:
+    """Get model status: ready / loading / error / available / not_downloaded.
+
+    Quantized variants are not_downloaded until ggml-<name>.bin is on disk
+    (preload_model downloads them). Memory details (RSS, in use, budget) are in get_cache_info().
+    """
+    key = model_key(model_name, engine)
+    if key in _model_cache:
         return "ready"
-    if model_name in _model_loading:
+    if key in _model_loading:
         return "loading"
-    if model_name in _model_error:
-        return f"error: {_model_error[model_name]}"
-    if has_local_model(model_name):
+    if key in _model_error:
+        return f"error: {_model_error[key]}"
+    if has_local_model(model_name, engine):
         return "available"  # Downloaded but not loaded into memory yet
     return "not_downloaded"
 
 
-def _do_load_model(model_name: str):
-    """Load pywhispercpp Model in a thread (blocking)."""
+def _process_rss() -> int:
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _expected_size(key: str) -> int:
+    """Memory a model is expected to take: measured RSS, else size on disk."""
+    if _model_rss.get(key):
+        return _model_rss[key]
+    engine, model_name = _parse_key(key)
+    if engine == ENGINE_FASTER_WHISPER:
+        path = _find_faster_whisper_dir(model_name)
+        return sum(f.stat().st_size for f in path.iterdir() if f.is_file()) if path else 0
+    path = _find_ggml_file(model_name)
+    return path.stat().st_size if path else 0
+
+
+def set_memory_budget(budget_mb: int) -> None:
+    """Limit the total memory of cached models (0 = unlimited)."""
+    global _memory_budget
+    _memory_budget = max(0, budget_mb) * 1024 * 1024
+    pools = _evict(0)
+    if pools:
+        threading.Thread(target=_close_pools, args=(pools,), name="whisper-pool-close", daemon=True).start()
+
+
+def _close_pools(pools: list[WhisperWorkerPool]) -> None:
+    """Stop evicted worker pools (blocking: joins each worker)."""
+    for pool in pools:
+        pool.close()
+
+
+def _evict(incoming: int, keep: Optional[str] = None) -> list[WhisperWorkerPool]:
+    """Drop least recently used idle models until `incoming` more bytes fit the budget.
+
+    Evicted worker pools are returned, not closed: closing joins their
+    processes, so callers do it off the event loop (_close_pools).
+    """
+    pools = []
+    if not _memory_budget:
+        return pools
+    used = sum(_expected_size(name) for name in _model_cache)
+    for name in list(_model_cache):
+        if used + incoming <= _memory_budget:
+            break
+        if name == keep or _model_refs[name] > 0:
+            continue
+        size = _expected_size(name)
+        model = _model_cache.pop(name)
+        if isinstance(model, WhisperWorkerPool):
+            pools.append(model)
+        _model_rss.pop(name, None)
+        _model_threads.pop(name, None)
+        _model_last_used.pop(name, None)
+        used -= size
+        logger.info(f"Whisper model '{name}' evicted from cache (freed ~{size / 2**20:.0f} MB)")
+    gc.collect()
+    if used + incoming > _memory_budget:
+        logger.warning(f"Whisper models in use exceed memory budget: "
+                       f"{(used + incoming) / 2**20:.0f} MB > {_memory_budget / 2**20:.0f} MB")
+    return pools
+
+
+def set_process_workers(workers: int) -> None:
+    """Load models into `workers` isolated processes (0 = in this process). Applies to later loads."""
+    global _process_workers
+    _process_workers = max(0, workers)
+
+
+def shutdown_workers() -> None:
+    """Stop worker processes of cached pools and free their shared memory (blocking)."""
+    _close_pools([m for m in _model_cache.values() if isinstance(m, WhisperWorkerPool)])
+
+
+def set_thread_tuning(n_threads: int = 0, autotune: bool = True, clip_path: Optional[str] = None) -> None:
+    """Configure n_threads: fixed (n_threads > 0), or autotuned once per (model, host)
+    on the speech clip at clip_path (default: whisper_tuning.BUNDLED_CLIP)."""
+    _tuning.update(n_threads=n_threads, autotune=autotune, clip_path=clip_path or None)
+
+
+def _initial_threads(key: str) -> int:
+    if _parse_key(key)[0] == ENGINE_FASTER_WHISPER:
+        # Threads per worker; the workers split the cores between the two streams
+        return _tuning["n_threads"] or max(1, (os.cpu_count() or 2) // FASTER_WHISPER_WORKERS)
+    return _tuning["n_threads"] or whisper_tuning.cached_threads(key) or whisper_tuning.default_threads()
+
+
+def _needs_autotune(key: str) -> bool:
+    # CTranslate2 fixes cpu_threads at load time, so only whisper.cpp is autotuned
+    return (
+        _parse_key(key)[0] == ENGINE_WHISPERCPP
+        and not _tuning["n_threads"]
+        and _tuning["autotune"]
+        and whisper_tuning.cached_threads(key) is None
+    )
+
+
+def _decode(engine: str, model, audio: np.ndarray, n_threads: Optional[int] = None) -> list[dict]:
+    """Run one blocking decode; returns segments.
+
+    Each segment: text, start/end (seconds into `audio`), confidence (mean
+    token probability or None), no_speech_prob (or None) and words
+    ([{word, start, end, probability}], faster-whisper only).
+    """
+    if isinstance(model, WhisperWorkerPool):
+        return model.decode(audio)
+    if engine == ENGINE_FASTER_WHISPER:
+        segments, _ = model.transcribe(
+            audio,
+            language="ru",
+            beam_size=1,  # Greedy, like whisper.cpp's default strategy
+            condition_on_previous_text=False,
+            no_speech_threshold=0.4,
+            word_timestamps=True,
+        )
+        return [  # Generator: decoding happens here
+            {
+                "text": s.text,
+                "start": s.start,
+                "end": s.end,
+                "confidence": math.exp(s.avg_logprob),
+                "no_speech_prob": s.no_speech_prob,
+                "words": [
+                    {"word": w.word.strip(), "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in s.words or ()
+                ],
+            }
+            for s in segments
+        ]
+    params = {"n_threads": n_threads} if n_threads else {}
+    # pywhispercpp: t0/t1 in 10ms units; token probability only in newer releases
+    return [
+        {
+            "text": s.text,
+            "start": s.t0 / 100,
+            "end": s.t1 / 100,
+            "confidence": getattr(s, "probability", None),
+            "no_speech_prob": None,
+            "words": [],
+        }
+        for s in model.transcribe(audio, **params)
+    ]
+
+
+def _warm_up(key: str, model, n_threads: int) -> None:
+    """Short decode that pays the first-decode costs (blocking).
+
+    Also leaves the model configured with n_threads (pywhispercpp keeps
+    params passed to transcribe() for subsequent calls).
+    """
+    warmup = whisper_tuning.synthetic_clip(whisper_tuning.WARMUP_SECONDS)
+    start = time.perf_counter()
+    _decode(_parse_key(key)[0], model, warmup, n_threads)
+    logger.info(f"Whisper '{key}' warm-up decode: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def _warm_up_and_tune(key: str, model, n_threads: int) -> int:
+    """Warm-up decode, plus the one-time thread autotune if needed (blocking).
+
+    For callers nothing else decodes next to (worker processes, benchmarks);
+    preload_model uses _autotune(). Returns the n_threads the model is left
+    configured with.
+    """
+    if isinstance(model, WhisperWorkerPool):
+        return model.n_threads  # Each worker warmed up (and autotuned) itself
+    _warm_up(key, model, n_threads)
+    if _needs_autotune(key):
+        engine, _ = _parse_key(key)
+        best, rtfs = whisper_tuning.autotune(
+            lambda audio, threads: _decode(engine, model, audio, threads),
+            whisper_tuning.load_clip(_tuning["clip_path"]),
+        )
+        whisper_tuning.save_result(key, best, rtfs, _tuning["clip_path"])
+        logger.info(f"Whisper '{key}' autotuned: n_threads={best} (RTF {rtfs[best]:.3f})")
+        _warm_up(key, model, best)  # Leave the model configured with the winner
+        n_threads = best
+    return n_threads
+
+
+async def _autotune(key: str, model) -> int:
+    """One-time n_threads autotune of a loaded (not yet cached) model.
+
+    The engine lock is taken per candidate, not for the whole run, so live
+    decoding on other models goes on in between. Returns the winner.
+    """
+    engine, _ = _parse_key(key)
+    clip = await asyncio.to_thread(whisper_tuning.load_clip, _tuning["clip_path"])
+
+    def decode(audio, threads):
+        return _decode(engine, model, audio, threads)
+
+    rtfs = {}
+    for n in whisper_tuning.thread_candidates():
+        async with _engine_lock(engine, model):
+            rtfs[n] = await asyncio.to_thread(whisper_tuning.measure_rtf, decode, clip, n)
+        logger.info(f"Whisper autotune: n_threads={n} RTF={rtfs[n]:.3f}")
+    best = min(rtfs, key=rtfs.get)
+    await asyncio.to_thread(whisper_tuning.save_result, key, best, rtfs, _tuning["clip_path"])
+    logger.info(f"Whisper '{key}' autotuned: n_threads={best} (RTF {rtfs[best]:.3f})")
+    async with _engine_lock(engine, model):
+        await asyncio.to_thread(_warm_up, key, model, best)  # Leave the model configured with the winner
+    return best
+
+
+def _touch(key: str) -> None:
+    _model_cache.move_to_end(key)
+    _model_last_used[key] = time.time()
+
+
+def acquire_model(key: str):
+    """Mark a cached model as in use (not evictable) and return it."""
+    if key not in _model_cache:
+        raise RuntimeError(_model_error.get(key) or f"Whisper model '{key}' is not loaded")
+    _touch(key)
+    _model_refs[key] += 1
+    return _model_cache[key]
+
+
+def release_model(key: str) -> None:
+    """Undo acquire_model(); the model becomes evictable when no one uses it."""
+    if _model_refs[key] > 0:
+        _model_refs[key] -= 1
+    if _model_refs[key] == 0:
+        del _model_refs[key]
+
+
+def get_cache_info() -> dict:
+    """Loaded models (LRU order) with RSS and usage, plus the memory budget."""
+    models = [
+        {
+            "name": name,
+            "engine": _parse_key(name)[0],
+            "model": _parse_key(name)[1],
+            "rss_mb": round(_model_rss.get(name, 0) / 2**20),
+            "n_threads": _model_threads.get(name),
+            "in_use": _model_refs[name],
+            "last_used": _model_last_used.get(name),
+            "workers": model.stats() if isinstance(model, WhisperWorkerPool) else None,
+        }
+        for name, model in _model_cache.items()
+    ]
+    return {
+        "budget_mb": round(_memory_budget / 2**20),
+        "used_mb": round(sum(_expected_size(name) for name in _model_cache) / 2**20),
+        "models": models,
+    }
+
+
+def _load_faster_whisper(model_name: str, n_threads: int):
+    """Load a faster-whisper (CTranslate2) model, int8 on CPU (blocking)."""
+    from faster_whisper import WhisperModel
+
+    local_dir = _find_faster_whisper_dir(model_name)
+    source = str(local_dir) if local_dir else model_name  # Name → auto-download from HF
+    logger.info(f"Loading faster-whisper model '{source}' ({FASTER_WHISPER_COMPUTE_TYPE}, "
+                f"{n_threads} threads x {FASTER_WHISPER_WORKERS} workers)")
+    return WhisperModel(
+        source,
+        device="cpu",
+        compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+        cpu_threads=n_threads,
+        num_workers=FASTER_WHISPER_WORKERS,
+    )
+
+
+def _do_load_model(key: str, n_threads: int):
+    """Load a model for its engine in a thread (blocking): a worker pool or in-process."""
+    if _process_workers:
+        return WhisperWorkerPool(key, _process_workers, n_threads, dict(_tuning)).start()
+    return _load_in_process(key, n_threads)
+
+
+def _load_in_process(key: str, n_threads: int):
+    """Load the model into this process (blocking); also what each pool worker runs."""
+    engine, model_name = _parse_key(key)
+    if engine == ENGINE_FASTER_WHISPER:
+        return _load_faster_whisper(model_name, n_threads)
+
     from pywhispercpp.model import Model
 
     common_params = dict(
-        n_threads=6,
+        n_threads=n_threads,
         print_progress=False,
         print_realtime=False,
         print_timestamps=False,
@@ -139,38 +621,189 @@ def _do_load_model(model_name: str):
         return Model(model_name, redirect_whispercpp_logs_to="/dev/null", **common_params)
 
 
-async def preload_model(model_name: str, on_status=None) -> None:
+async def _download_with_status(model_name: str, on_status=None) -> None:
+    """download_ggml() in a thread, reporting progress in 10% steps via on_status."""
+    loop = asyncio.get_running_loop()
+    last_step = -1
+
+    def progress(fraction: float):
+        nonlocal last_step
+        step = int(fraction * 10)
+        if step != last_step:
+            last_step = step
+            logger.info(f"Downloading {model_name}: {fraction:.0%}")
+            if on_status:
+                asyncio.run_coroutine_threadsafe(on_status(f"Скачивание {model_name}: {fraction:.0%}"), loop)
+
+    await asyncio.to_thread(download_ggml, model_name, progress)
+
+
+async def preload_model(model_name: str, on_status=None, engine: str = ENGINE_WHISPERCPP) -> None:
     """Pre-load a Whisper model into global cache. Safe to call concurrently.
     on_status: optional async callback(message) for progress updates."""
-    if model_name in _model_cache:
-        logger.info(f"Whisper model '{model_name}' already cached")
+    key = model_key(model_name, engine)
+    if key in _model_cache:
+        logger.info(f"Whisper model '{key}' already cached")
+        _touch(key)
         return
 
     # If another coroutine is already loading this model, wait for it
-    if model_name in _model_loading:
-        logger.info(f"Waiting for Whisper model '{model_name}' (loading by another task)...")
-        await _model_loading[model_name].wait()
+    if key in _model_loading:
+        logger.info(f"Waiting for Whisper model '{key}' (loading by another task)...")
+        await _model_loading[key].wait()
+        if key not in _model_cache:
+            raise RuntimeError(_model_error.get(key) or f"Whisper model '{key}' failed to load")
         return
 
     event = asyncio.Event()
-    _model_loading[model_name] = event
-    _model_error.pop(model_name, None)
+    _model_loading[key] = event
+    _model_error.pop(key, None)
     try:
-        logger.info(f"Loading Whisper model '{model_name}'...")
+        logger.info(f"Loading Whisper model '{key}'...")
         if on_status:
             await on_status(f"Загрузка модели Whisper ({model_name})...")
-        model = await asyncio.to_thread(_do_load_model, model_name)
-        _model_cache[model_name] = model
-        logger.info(f"Whisper model '{model_name}' loaded and cached")
+        # Make room first: loading next to an idle model could double peak memory
+        await asyncio.to_thread(_close_pools, _evict(_expected_size(key)))
+        if engine == ENGINE_WHISPERCPP and is_quantized(model_name) and not has_local_model(model_name):
+            await _download_with_status(model_name, on_status)
+        rss_before = _process_rss()
+        n_threads = _initial_threads(key)
+        model = await asyncio.to_thread(_do_load_model, key, n_threads)
+
+        # Warm-up (and first-time autotune) before the model is marked ready,
+        # so the first real decode runs at full speed
+        try:
+            if isinstance(model, WhisperWorkerPool):
+                n_threads = model.n_threads  # Each worker warmed up (and autotuned) itself
+            else:
+                async with _engine_lock(engine, model):
+                    await asyncio.to_thread(_warm_up, key, model, n_threads)
+                if _needs_autotune(key):
+                    if on_status:
+                        await on_status(f"Подбор числа потоков для {model_name} (однократно)...")
+                    n_threads = await _autotune(key, model)
+        except Exception as e:
+            logger.warning(f"Whisper '{key}' warm-up/autotune failed: {e}")
+        _model_threads[key] = n_threads
+        # Includes decode buffers allocated by the warm-up
+        _model_rss[key] = (model.rss_bytes if isinstance(model, WhisperWorkerPool)
+                           else max(0, _process_rss() - rss_before))
+
+        _model_cache[key] = model
+        _touch(key)
+        await asyncio.to_thread(_close_pools, _evict(0, keep=key))
+        logger.info(f"Whisper model '{key}' loaded and cached "
+                    f"(RSS +{_model_rss[key] / 2**20:.0f} MB)")
         if on_status:
             await on_status(None)  # Clear status
     except Exception as e:
-        _model_error[model_name] = str(e)[:200]
-        logger.error(f"Failed to load Whisper model '{model_name}': {e}")
+        _model_error[key] = str(e)[:200]
+        logger.error(f"Failed to load Whisper model '{key}': {e}")
         raise
     finally:
         event.set()
-        _model_loading.pop(model_name, None)
+        _model_loading.pop(key, None)
+
+
+def _model_size_mb(key: str) -> float:
+    """Size used to order models from small to large."""
+    return GGML_SIZES_MB.get(_parse_key(key)[1]) or _expected_size(key) / 2**20
+
+
+def _smaller_cached_model(key: str) -> Optional[str]:
+    """Largest cached model of the same engine that is smaller than `key`."""
+    engine = _parse_key(key)[0]
+    size = _model_size_mb(key)
+    smaller = [k for k in _model_cache if _parse_key(k)[0] == engine and _model_size_mb(k) < size]
+    return max(smaller, key=_model_size_mb) if smaller else None
+
+
+def _compact(chunks: list[AudioChunk]) -> list[AudioChunk]:
+    """Degraded mode: drop long silences, then keep at most MAX_LAG_SECONDS (newest)."""
+    kept = []
+    silent_run = 0
+    for chunk in chunks:
+        if chunk.features.silent:
+            silent_run += 1
+            if silent_run > KEEP_SILENT_CHUNKS:
+                continue
+        else:
+            silent_run = 0
+        kept.append(chunk)
+
+    max_bytes = int(MAX_LAG_SECONDS * SAMPLE_RATE) * 2
+    total = 0
+    for i in range(len(kept) - 1, -1, -1):
+        total += len(kept[i].pcm)
+        if total > max_bytes:
+            return kept[i + 1:]
+    return kept
+
+
+def _split_at_silences(chunks: list[AudioChunk]) -> list[list[AudioChunk]]:
+    """Cut a long buffer into independent pieces at pauses."""
+    pieces = []
+    start = 0
+    silent_run = 0
+    for i, chunk in enumerate(chunks):
+        silent_run = silent_run + 1 if chunk.features.silent else 0
+        length = i + 1 - start
+        if length >= SPLIT_TARGET_CHUNKS and silent_run >= SPLIT_SILENCE_CHUNKS:
+            cut = i + 1 - silent_run // 2  # Middle of the pause
+        elif length >= SPLIT_MAX_CHUNKS:
+            window = chunks[start + SPLIT_TARGET_CHUNKS:i + 1]
+            cut = start + SPLIT_TARGET_CHUNKS + min(range(len(window)), key=lambda j: window[j].features.rms) + 1
+        else:
+            continue
+        pieces.append(chunks[start:cut])
+        start = cut
+        silent_run = 0
+    if start < len(chunks):
+        if pieces and len(chunks) - start < SPLIT_TARGET_CHUNKS // 5:
+            pieces[-1] = pieces[-1] + chunks[start:]  # Short tail: keep with the last piece
+        else:
+            pieces.append(chunks[start:])
+    return pieces
+
+
+def _clock(chunks: list[AudioChunk]) -> Callable[[float], float]:
+    """Map an offset (s) into the joined audio of `chunks` to wall-clock time.
+
+    captured_at is stamped in the capture callback, i.e. at the end of a chunk.
+    Works across gaps left by _compact().
+    """
+    ends = np.cumsum([len(c.pcm) / (2 * SAMPLE_RATE) for c in chunks])
+
+    def at(offset: float) -> float:
+        i = min(int(np.searchsorted(ends, offset, side="right")), len(chunks) - 1)
+        return chunks[i].captured_at - (float(ends[i]) - offset)
+    return at
+
+
+def _transcript_meta(segments: list[dict]) -> dict:
+    """Timing and confidence of one emitted transcript (segments in wall-clock time)."""
+    durations = [max(s["end"] - s["start"], 0.01) for s in segments]
+    scored = [(s["confidence"], d) for s, d in zip(segments, durations) if s["confidence"] is not None]
+    no_speech = [s["no_speech_prob"] for s in segments if s["no_speech_prob"] is not None]
+    return {
+        "start": segments[0]["start"],
+        "end": segments[-1]["end"],
+        # Duration-weighted mean over segments
+        "confidence": sum(c * d for c, d in scored) / sum(d for _, d in scored) if scored else None,
+        "no_speech_prob": max(no_speech) if no_speech else None,
+        "segments": segments,
+    }
+
+
+def _strip_repeat(previous: str, text: str) -> str:
+    """Drop words at the start of `text` that repeat the end of `previous`."""
+    norm = lambda w: re.sub(r"\W", "", w.lower())  # noqa: E731
+    prev_words = [norm(w) for w in previous.split()[-MAX_BOUNDARY_WORDS:]]
+    words = text.split()
+    for n in range(min(len(prev_words), len(words)), 0, -1):
+        if prev_words[-n:] == [norm(w) for w in words[:n]]:
+            return " ".join(words[n:])
+    return text
 
 
 class WhisperTranscriber:
@@ -179,12 +812,19 @@ class WhisperTranscriber:
         model_name: str,
         on_transcript: Callable,
         on_utterance_end: Callable,
+        engine: str = ENGINE_WHISPERCPP,
+        on_status: Optional[Callable] = None,
     ):
+        """on_status: optional async callback(label, type, message) for
+        "degraded" / "recovered" events of the RTF policy."""
         self.model_name = model_name
+        self.engine = engine
+        self._key = model_key(model_name, engine)
         self.on_transcript = on_transcript
         self.on_utterance_end = on_utterance_end
+        self.on_status = on_status
         self._model = None
-        self._buffer: list[bytes] = []
+        self._buffer: list[AudioChunk] = []
         self._label = "?"
         self._running = False
         self._process_task: Optional[asyncio.Task] = None
@@ -193,11 +833,22 @@ class WhisperTranscriber:
         self._utterance_ended = False
         self._chunk_count = 0
 
+        # RTF monitor
+        self._rtf_window: deque = deque(maxlen=RTF_WINDOW)  # (elapsed s, audio s)
+        self.rtf: Optional[float] = None
+        self._degraded = False
+        self._fallback_key: Optional[str] = None  # Smaller model in use while degraded
+        self._fallback_model = None
+        self._last_switch = 0.0
+        self.switches = 0
+        self.shed_seconds = 0.0
+        self._decode_finished = 0.0
+
     async def connect(self, label: str = "system"):
         """Attach shared model and start processing.
 
         All transcribers share one model instance to avoid Metal GPU conflicts.
-        Concurrent transcribe() calls are serialized via _transcribe_lock.
+        Concurrent whisper.cpp transcribe() calls are serialized via _transcribe_lock.
         """
         self._label = label
         self._running = True
@@ -207,24 +858,33 @@ class WhisperTranscriber:
         self._utterance_ended = False
 
         # Use globally cached model (must be preloaded before connect)
-        if self.model_name not in _model_cache:
+        if self._key not in _model_cache:
             logger.warning(f"Whisper [{label}]: model not pre-loaded, loading now...")
-            await preload_model(self.model_name)
+            await preload_model(self.model_name, engine=self.engine)
 
-        self._model = _model_cache[self.model_name]
-        logger.info(f"Whisper [{label}]: using shared model '{self.model_name}'")
+        if self._model is not None:
+            release_model(self._key)
+        self._model = acquire_model(self._key)
+        logger.info(f"Whisper [{label}]: using shared model '{self._key}'")
 
         self._process_task = asyncio.create_task(self._process_loop())
 
-    async def send_audio(self, audio_bytes: bytes):
-        """Buffer an audio chunk and track speech/silence."""
+    async def send_audio(
+        self, audio_bytes: bytes, features: Optional[ChunkFeatures] = None, captured_at: Optional[float] = None,
+    ):
+        """Buffer an audio chunk and track speech/silence.
+
+        features: computed at capture (audio_features); derived here if absent.
+        captured_at: capture time of the chunk (AudioChunk.captured_at); now if absent.
+        """
         if not self._running:
             return
-        self._buffer.append(audio_bytes)
+        if features is None:
+            features = compute_bytes(audio_bytes)
+        self._buffer.append(AudioChunk(audio_bytes, features, captured_at or time.time()))
 
         # Simple energy-based VAD
-        audio = np.frombuffer(audio_bytes, dtype=np.int16)
-        rms = int(np.sqrt(np.mean(audio.astype(np.float64) ** 2)))
+        rms = int(features.rms)
 
         # Log RMS for first 10 speech chunks to help diagnose audio levels
         self._chunk_count += 1
@@ -274,39 +934,164 @@ class WhisperTranscriber:
         self._buffer.clear()
         self._speech_count = 0
 
-        # Combine chunks into numpy float32 array (whisper.cpp expects float32)
-        raw = b"".join(chunks)
-        audio_int16 = np.frombuffer(raw, dtype=np.int16)
+        if self._degraded:
+            before = len(chunks)
+            chunks = _compact(chunks)
+            self.shed_seconds += (before - len(chunks)) * 0.1
+            if not chunks:
+                return
+
+        pieces = _split_at_silences(chunks) if len(chunks) > SPLIT_MIN_CHUNKS else [chunks]
+        if len(pieces) > 1:
+            logger.info(f"[{self._label}] backlog {len(chunks) / 10:.1f}s → {len(pieces)} pieces, "
+                        f"{_decode_slots(self.engine, self._fallback_model or self._model)} decode slots")
+        model = self._fallback_model or self._model
+        slots = asyncio.Semaphore(_decode_slots(self.engine, model))
+        start = time.monotonic()
+        tasks = [asyncio.create_task(self._decode_piece(model, piece, slots)) for piece in pieces]
+
+        # Emit in order as pieces finish; later pieces keep decoding meanwhile
+        previous = ""
+        decoded_seconds = 0.0
+        try:
+            for task in tasks:
+                segments, seconds = await task
+                decoded_seconds += seconds
+                text = " ".join(s["text"] for s in segments)
+                text = _strip_repeat(previous, text) if text else ""
+                if not text:
+                    continue
+                previous = text
+                meta = _transcript_meta(segments)
+                confidence = f"{meta['confidence']:.2f}" if meta["confidence"] is not None else "?"
+                logger.info(f"[{self._label}] whisper (conf {confidence}): {text[:80]}")
+                await self.on_transcript(self._label, 0, text, meta)
+        except Exception as e:
+            logger.error(f"Whisper transcription error [{self._label}]: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+        if decoded_seconds:
+            await self._record_rtf(self._decode_finished - start, decoded_seconds)
+
+    async def _decode_piece(
+        self, model, chunks: list[AudioChunk], slots: asyncio.Semaphore,
+    ) -> tuple[list[dict], float]:
+        """Gate, decode and filter one piece.
 
+        Returns (kept segments with wall-clock times — empty if nothing
+        usable, seconds of audio decoded).
+        """
         # Check buffer energy: skip if mostly silence (prevents hallucinations on quiet audio)
-        rms = int(np.sqrt(np.mean(audio_int16.astype(np.float64) ** 2)))
+        features = [c.features for c in chunks]
+        rms = int(buffer_rms(features))
         if rms < SILENCE_RMS_THRESHOLD:
             logger.debug(f"[{self._label}] skipping quiet buffer (RMS={rms})")
-            return
+            return [], 0.0
+        voice = voice_ratio(features)
+        if voice < MIN_VOICE_RATIO:
+            logger.debug(f"[{self._label}] skipping non-voice buffer (voice band {voice:.0%})")
+            return [], 0.0
+
+        # Combine chunks into numpy float32 array (whisper.cpp expects float32)
+        raw = b"".join(c.pcm for c in chunks)
+        audio_int16 = np.frombuffer(raw, dtype=np.int16)
 
         audio = audio_int16.astype(np.float32) / 32768.0
 
         if len(audio) < SAMPLE_RATE * 0.3:  # Skip < 300ms
-            return
+            return [], 0.0
 
         try:
-            # Serialize transcription calls: Metal GPU can't handle concurrent
+            # Serialize whisper.cpp calls: Metal GPU can't handle concurrent
             # command buffers, and whisper.cpp model is not thread-safe.
-            async with _transcribe_lock:
-                segments = await asyncio.to_thread(
-                    self._model.transcribe, audio
-                )
-            texts = [s.text.strip() for s in segments if s.text.strip()]
-            if texts:
-                full_text = " ".join(texts)
-                # Filter out known Whisper hallucinations
-                if _is_hallucination(full_text):
-                    logger.info(f"[{self._label}] filtered hallucination: {full_text[:60]}")
-                    return
-                logger.info(f"[{self._label}] whisper: {full_text[:80]}")
-                await self.on_transcript(self._label, 0, full_text)
+            async with slots, _engine_lock(self.engine, model):
+                segments = await asyncio.to_thread(_decode, self.engine, model, audio)
+            self._decode_finished = time.monotonic()
         except Exception as e:
             logger.error(f"Whisper transcription error [{self._label}]: {e}")
+            return [], 0.0
+        seconds = len(audio) / SAMPLE_RATE
+        kept = []
+        for segment in segments:
+            text = segment["text"].strip()
+            if not text:
+                continue
+            if _is_unreliable(segment):
+                logger.info(f"[{self._label}] filtered low-confidence segment "
+                            f"(conf {segment['confidence']:.2f}, no-speech {segment['no_speech_prob']}): {text[:60]}")
+                continue
+            kept.append(segment | {"text": text})
+        # Filter out known Whisper hallucinations
+        full_text = " ".join(s["text"] for s in kept)
+        if full_text and _is_hallucination(full_text):
+            logger.info(f"[{self._label}] filtered hallucination: {full_text[:60]}")
+            return [], seconds
+
+        at = _clock(chunks)
+        for segment in kept:
+            segment["start"], segment["end"] = at(segment["start"]), at(segment["end"])
+            for word in segment["words"]:
+                word["start"], word["end"] = at(word["start"]), at(word["end"])
+        return kept, seconds
+
+    async def _record_rtf(self, elapsed: float, audio_seconds: float):
+        """Update the rolling RTF and apply the degrade/recover policy."""
+        self._rtf_window.append((elapsed, audio_seconds))
+        if len(self._rtf_window) < RTF_MIN_SAMPLES:
+            return
+        self.rtf = sum(e for e, _ in self._rtf_window) / sum(a for _, a in self._rtf_window)
+        if time.monotonic() - self._last_switch < RTF_SWITCH_COOLDOWN:
+            return
+        if not self._degraded and self.rtf > RTF_OVERLOAD:
+            await self._degrade()
+        elif self._degraded and self.rtf < RTF_RECOVER:
+            await self._recover()
+
+    async def _degrade(self):
+        rtf = self.rtf
+        self._degraded = True
+        self._last_switch = time.monotonic()
+        self._rtf_window.clear()
+        self.switches += 1
+        fallback = _smaller_cached_model(self._key)
+        if fallback:
+            self._fallback_key = fallback
+            self._fallback_model = acquire_model(fallback)
+            message = f"Whisper не успевает (RTF {rtf:.1f}) — временно {_parse_key(fallback)[1]}"
+        else:
+            message = f"Whisper не успевает (RTF {rtf:.1f}) — пропуск пауз и старого аудио"
+        logger.warning(f"[{self._label}] {message}")
+        if self.on_status:
+            await self.on_status(self._label, "degraded", message)
+
+    async def _recover(self):
+        rtf = self.rtf
+        self._degraded = False
+        self._last_switch = time.monotonic()
+        self._rtf_window.clear()
+        self.switches += 1
+        self._release_fallback()
+        message = f"Whisper снова успевает (RTF {rtf:.1f}) — {self.model_name}"
+        logger.info(f"[{self._label}] {message}")
+        if self.on_status:
+            await self.on_status(self._label, "recovered", message)
+
+    def _release_fallback(self):
+        if self._fallback_key:
+            self._fallback_model = None
+            release_model(self._fallback_key)
+            self._fallback_key = None
+
+    def stats(self) -> dict:
+        """Per-stream metrics for /status."""
+        return {
+            "model": self._fallback_key or self._key,
+            "rtf": round(self.rtf, 3) if self.rtf is not None else None,
+            "degraded": self._degraded,
+            "switches": self.switches,
+            "shed_seconds": round(self.shed_seconds, 1),
+        }
 
     async def close(self):
         """Stop processing and flush remaining audio."""
@@ -325,3 +1110,7 @@ class WhisperTranscriber:
                 await self._transcribe_buffer()
         finally:
             self._buffer.clear()
+            self._release_fallback()
+            if self._model is not None:
+                self._model = None
+                release_model(self._key)
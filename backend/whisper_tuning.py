@@ -0,0 +1,135 @@
+"""
+Whisper warm-up and n_threads autotuning.
+
+The first decode after loading a model pays one-off costs (Metal shader
+compilation, buffer allocation, page faults), so preload runs a short
+warm-up decode. The best n_threads depends on the host (performance vs
+efficiency cores, memory bandwidth) and the model size; it is measured once
+per (model, host) by decoding a clip with several thread counts and keeping
+the lowest real-time factor (RTF = decode time / audio duration). Results
+are stored in ~/.axel-assistant/whisper_tuning.json.
+
+Tuning needs real speech: decode time depends on the tokens Whisper
+produces, and on anything else it emits next to none, so the RTF would
+measure little more than the encoder. The bundled clip (BUNDLED_CLIP) is
+the 11s sample whisper.cpp ships: J. F. Kennedy's 1961 inaugural address,
+a US government work in the public domain. A 16kHz WAV given by
+WHISPER_TUNE_CLIP (e.g. a few seconds of Russian speech) replaces it; only
+its first MAX_CLIP_SECONDS are decoded. The warm-up only needs to exercise
+the model and uses a clip generated in code (deterministic speech-like
+signal: voiced harmonics with syllable envelope and pauses).
+"""
+
+import json
+import logging
+import os
+import platform
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+TUNING_FILE = Path.home() / ".axel-assistant" / "whisper_tuning.json"
+TUNE_CLIP_SECONDS = 6.0
+BUNDLED_CLIP = Path(__file__).parent / "assets" / "tune_clip.wav"
+MAX_CLIP_SECONDS = 12.0  # A longer tuning WAV is cut to its start (each candidate decodes it)
+WARMUP_SECONDS = 1.5
+DEFAULT_THREADS = 6
+
+
+def host_key() -> str:
+    """Identifies the machine a tuning result is valid for."""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu"
+
+
+def default_threads() -> int:
+    return max(1, min(DEFAULT_THREADS, os.cpu_count() or DEFAULT_THREADS))
+
+
+def thread_candidates() -> list[int]:
+    """Thread counts worth trying on this host."""
+    cpus = os.cpu_count() or DEFAULT_THREADS
+    candidates = {2, 4, 6, 8, cpus // 2, cpus - 2, cpus}
+    return sorted(n for n in candidates if 1 <= n <= cpus)
+
+
+def synthetic_clip(seconds: float = TUNE_CLIP_SECONDS) -> np.ndarray:
+    """Deterministic speech-like float32 audio (same every run, so RTFs are comparable)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.3)
+    signal = 0.2 * voiced * envelope + 0.006 * rng.standard_normal(t.size)
+    return np.clip(signal, -1.0, 1.0).astype(np.float32)
+
+
+def load_clip(path: Optional[str] = None) -> np.ndarray:
+    """float32 mono audio from a 16kHz int16 WAV (default: the bundled speech
+    clip), at most MAX_CLIP_SECONDS long."""
+    path = path or BUNDLED_CLIP
+    with wave.open(str(path), "rb") as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16kHz int16 WAV")
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if wf.getnchannels() > 1:
+            samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+    if samples.size > MAX_CLIP_SECONDS * SAMPLE_RATE:
+        logger.info(f"Whisper tuning clip {path}: using the first {MAX_CLIP_SECONDS:.0f}s "
+                    f"of {samples.size / SAMPLE_RATE:.0f}s")
+    return (samples.astype(np.float32) / 32768.0)[:int(MAX_CLIP_SECONDS * SAMPLE_RATE)]
+
+
+def _load_results() -> dict:
+    try:
+        with open(TUNING_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def cached_threads(model_name: str) -> Optional[int]:
+    """Previously tuned n_threads for this model on this host."""
+    entry = _load_results().get(f"{model_name}@{host_key()}")
+    # Entries without a clip were tuned on the synthetic signal: not trusted
+    return entry["n_threads"] if entry and entry.get("clip") else None
+
+
+def save_result(model_name: str, n_threads: int, rtfs: dict[int, float], clip_path: Optional[str]) -> None:
+    results = _load_results()
+    results[f"{model_name}@{host_key()}"] = {
+        "n_threads": n_threads,
+        "rtf": {str(k): round(v, 3) for k, v in rtfs.items()},
+        "clip": os.path.basename(clip_path or BUNDLED_CLIP),
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    TUNING_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TUNING_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(TUNING_FILE)
+
+
+def measure_rtf(transcribe: Callable[[np.ndarray, int], object], clip: np.ndarray, n_threads: int) -> float:
+    start = time.perf_counter()
+    transcribe(clip, n_threads)
+    return (time.perf_counter() - start) / (len(clip) / SAMPLE_RATE)
+
+
+def autotune(transcribe: Callable[[np.ndarray, int], object], clip: np.ndarray) -> tuple[int, dict[int, float]]:
+    """Decode `clip` with each candidate thread count (blocking); returns (best, {threads: rtf}).
+
+    transcribe(audio, n_threads) must run one decode with that thread count.
+    The model must already be warmed up, or the first candidate is penalized.
+    """
+    rtfs = {}
+    for n in thread_candidates():
+        rtfs[n] = measure_rtf(transcribe, clip, n)
+        logger.info(f"Whisper autotune: n_threads={n} RTF={rtfs[n]:.3f}")
+    best = min(rtfs, key=rtfs.get)
+    return best, rtfs
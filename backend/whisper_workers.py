@@ -0,0 +1,279 @@
+"""
+Process-isolated Whisper workers (WHISPER_PROCESS_WORKERS > 0).
+
+Each worker is a spawned process with its own model context. Audio goes to
+it through a multiprocessing.shared_memory ring of float32 samples (no
+pickling of the PCM); the job header (offset, length) and the resulting
+segments (text, timing, confidence) travel over a Pipe. Decoding then never holds the backend's
+GIL, and a native crash in whisper.cpp kills only the worker: the job fails,
+the worker is restarted in the background and the other workers keep going.
+
+WhisperWorkerPool stands in for a loaded model in transcription_whisper's
+cache: decode(audio) is blocking (called via asyncio.to_thread) and runs on
+the first idle worker, so a pool of N decodes N pieces at once.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+RING_SECONDS = 60  # Per worker; longer than any piece WhisperTranscriber sends
+READY_TIMEOUT = 600  # Model load + warm-up (+ first-time autotune)
+DECODE_TIMEOUT = 120  # A decode taking longer means the worker hung
+POLL_INTERVAL = 0.5
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+class AudioRing:
+    """float32 ring buffer in shared memory; the parent writes, one worker reads."""
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        self.capacity = capacity
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=capacity * 4)
+        else:
+            # Spawned workers share the parent's resource tracker, so attaching
+            # doesn't hand ownership over: the parent unlinks in close()
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._samples = np.ndarray((capacity,), dtype=np.float32, buffer=self.shm.buf)
+        self._head = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, audio: np.ndarray) -> tuple[int, int]:
+        """Copy audio in at the head; returns (offset, length)."""
+        n = len(audio)
+        if n > self.capacity:
+            raise ValueError(f"{n / SAMPLE_RATE:.0f}s of audio exceeds the {self.capacity / SAMPLE_RATE:.0f}s ring")
+        offset = self._head
+        first = min(n, self.capacity - offset)
+        self._samples[offset:offset + first] = audio[:first]
+        self._samples[:n - first] = audio[first:]
+        self._head = (offset + n) % self.capacity
+        return offset, n
+
+    def read(self, offset: int, n: int) -> np.ndarray:
+        first = min(n, self.capacity - offset)
+        if first == n:
+            return self._samples[offset:offset + n].copy()
+        return np.concatenate((self._samples[offset:], self._samples[:n - first]))
+
+    def close(self, unlink: bool = False) -> None:
+        self._samples = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _worker_main(key: str, n_threads: int, tuning: dict, ring_name: str, capacity: int, conn) -> None:
+    """Worker process: load the model, then decode jobs until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Shutdown comes from the parent
+    import transcription_whisper as tw
+
+    try:
+        ring = AudioRing(capacity, name=ring_name)
+        tw.set_thread_tuning(**tuning)
+        engine = tw._parse_key(key)[0]
+        model = tw._load_in_process(key, n_threads)
+        n_threads = tw._warm_up_and_tune(key, model, n_threads)
+        conn.send(("ready", os.getpid(), n_threads, tw._process_rss()))
+    except Exception as e:
+        conn.send(("failed", str(e)[:200]))
+        return
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg[0] == "stop":
+            break
+        _, job_id, offset, n = msg
+        try:
+            segments = tw._decode(engine, model, ring.read(offset, n))
+            conn.send(("done", job_id, segments))
+        except Exception as e:
+            conn.send(("error", job_id, str(e)[:200]))
+    ring.close()
+
+
+class _Worker:
+    def __init__(self, pool: "WhisperWorkerPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.ring = AudioRing(int(RING_SECONDS * SAMPLE_RATE))
+        self.process = None
+        self.conn = None
+        self.pid: Optional[int] = None
+        self.rss = 0
+        self._jobs = itertools.count()
+
+    def spawn(self, n_threads: int) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.pool.key, n_threads, self.pool.tuning, self.ring.name, self.ring.capacity, child_conn),
+            name=f"whisper-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self) -> int:
+        """Block until the model is loaded; returns the worker's n_threads."""
+        msg = self._receive(READY_TIMEOUT)
+        if msg[0] != "ready":
+            self.kill()
+            raise RuntimeError(f"Whisper worker {self.index} failed to load: {msg[1]}")
+        _, self.pid, n_threads, self.rss = msg
+        return n_threads
+
+    def decode(self, audio: np.ndarray) -> list[dict]:
+        job_id = next(self._jobs)
+        offset, n = self.ring.write(audio)
+        try:
+            self.conn.send(("decode", job_id, offset, n))
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(f"worker {self.index}: {e}")
+        msg = self._receive(DECODE_TIMEOUT)
+        if msg[0] == "error":
+            raise RuntimeError(msg[2])
+        return msg[2]
+
+    def _receive(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        try:
+            while not self.conn.poll(POLL_INTERVAL):
+                if not self.process.is_alive():
+                    raise WorkerCrashed(f"worker {self.index} exited with code {self.process.exitcode}")
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise WorkerCrashed(f"worker {self.index} timed out after {timeout:.0f}s")
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(timeout=1)
+            raise WorkerCrashed(f"worker {self.index} exited with code {self.process.exitcode}")
+
+    def kill(self) -> None:
+        if self.process and self.process.pid is not None:  # Started
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(timeout=5)
+        if self.conn:
+            self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+            self.process.join(timeout=5)
+        except Exception:
+            pass
+        self.kill()
+
+
+class WhisperWorkerPool:
+    def __init__(self, key: str, size: int, n_threads: int, tuning: dict):
+        self.key = key
+        self.size = size
+        self.n_threads = n_threads
+        self.tuning = tuning
+        self.restarts = 0
+        self.crashes = 0
+        self._workers = [_Worker(self, i) for i in range(size)]
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._closed = False
+
+    def start(self) -> "WhisperWorkerPool":
+        """Spawn workers and wait until all have loaded the model (blocking).
+
+        The first worker loads (and, first time on this host, autotunes) alone;
+        the rest start together with its n_threads.
+        """
+        try:
+            first, rest = self._workers[0], self._workers[1:]
+            first.spawn(self.n_threads)
+            self.n_threads = first.wait_ready()
+            for worker in rest:
+                worker.spawn(self.n_threads)
+            for worker in rest:
+                worker.wait_ready()
+        except Exception:
+            self.close()
+            raise
+        for worker in self._workers:
+            self._idle.put(worker)
+        logger.info(f"Whisper '{self.key}': {self.size} worker processes ready "
+                    f"(pids {[w.pid for w in self._workers]}, n_threads={self.n_threads})")
+        return self
+
+    @property
+    def rss_bytes(self) -> int:
+        return sum(w.rss for w in self._workers)
+
+    def decode(self, audio: np.ndarray) -> list[dict]:
+        """Decode on the first idle worker (blocking)."""
+        try:
+            worker = self._idle.get(timeout=DECODE_TIMEOUT)
+        except queue.Empty:
+            raise WorkerCrashed("no Whisper worker available")
+        try:
+            segments = worker.decode(audio)
+        except WorkerCrashed as e:
+            self.crashes += 1
+            logger.error(f"Whisper '{self.key}' {e} — restarting")
+            threading.Thread(target=self._restart, args=(worker,), daemon=True).start()
+            raise
+        except Exception:
+            self._idle.put(worker)
+            raise
+        self._idle.put(worker)
+        return segments
+
+    def _restart(self, worker: _Worker) -> None:
+        worker.kill()
+        while not self._closed:
+            try:
+                worker.spawn(self.n_threads)
+                worker.wait_ready()
+            except Exception as e:
+                logger.error(f"Whisper '{self.key}' worker {worker.index} restart failed: {e}")
+                time.sleep(5)
+                continue
+            self.restarts += 1
+            logger.info(f"Whisper '{self.key}' worker {worker.index} restarted (pid {worker.pid})")
+            self._idle.put(worker)
+            return
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.size,
+            "alive": sum(1 for w in self._workers if w.process and w.process.is_alive()),
+            "idle": self._idle.qsize(),
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        for worker in self._workers:
+            if worker.process:
+                worker.stop()
+            worker.ring.close(unlink=True)
@@ -14,6 +14,8 @@ function App() {
     isRecording,
     isConnected,
     transcripts,
+    interim,
+    levels,
     error,
     statusMessage,
     clearError,
@@ -105,6 +107,7 @@ function App() {
       <TopBar
         isRecording={isRecording}
         isConnected={isConnected}
+        levels={levels}
         onMenuClick={handleOpenSettings}
       />
 
@@ -137,6 +140,7 @@ function App() {
 
       <Transcript
         transcripts={transcripts}
+        interim={interim}
         isRecording={isRecording}
       />
 
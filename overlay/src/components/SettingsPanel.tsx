@@ -52,6 +52,20 @@ const HOTKEYS = [
 
 const BACKEND_URL = 'http://127.0.0.1:8765'
 
+interface TranscriptionSettings {
+  model: string
+  engine?: string | null
+  model_memory?: { models?: { engine: string; model: string; rss_mb: number }[] }
+}
+
+/** Local (Whisper-family) transcription providers */
+const LOCAL_PROVIDERS = ['whisper', 'faster-whisper']
+
+/** Resident memory of the selected Whisper model (0 if not loaded/unknown). */
+function modelRss(data: TranscriptionSettings): number {
+  return data.model_memory?.models?.find((m) => m.model === data.model && m.engine === data.engine)?.rss_mb ?? 0
+}
+
 function getModelLabel(model: string, claudeLabels: Record<string, string>): string {
   if (claudeLabels[model]) return claudeLabels[model]
   return model
@@ -183,8 +197,14 @@ function EditableSection({
         method: 'POST',
         body: formData,
       })
-      const data = await res.json()
-      if (data.status === 'ok' && data.content) {
+      let data = await res.json()
+      // New file: processed by a background job — poll until it finishes
+      while (data.status === 'accepted' || data.status === 'queued' || data.status === 'running') {
+        const jobId = data.job_id ?? data.id
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        data = await (await fetch(`${BACKEND_URL}/settings/upload/${jobId}`)).json()
+      }
+      if ((data.status === 'ok' || data.status === 'done') && data.content) {
         setContent(data.content)
         setSaveStatus('uploaded')
         setTimeout(() => setSaveStatus('idle'), 3000)
@@ -319,7 +339,10 @@ export function SettingsPanel({
   const [transProvider, setTransProvider] = useState('deepgram')
   const [transModel, setTransModel] = useState('base')
   const [transModels, setTransModels] = useState<string[]>([])
+  const [quantizedModels, setQuantizedModels] = useState<string[]>([])
+  const [downloadMb, setDownloadMb] = useState<number | null>(null)
   const [modelStatus, setModelStatus] = useState('n/a')
+  const [modelRssMb, setModelRssMb] = useState(0)
 
   // Load LLM + transcription settings when panel opens
   useEffect(() => {
@@ -338,18 +361,24 @@ export function SettingsPanel({
         setTransProvider(data.provider)
         setTransModel(data.model)
         setTransModels(data.available_models || [])
+        setQuantizedModels(data.quantized_models || [])
+        setDownloadMb(data.download_mb ?? null)
         setModelStatus(data.model_status || 'n/a')
+        setModelRssMb(modelRss(data))
       })
       .catch(() => {})
   }, [isOpen])
 
   // Poll model status while loading
   useEffect(() => {
-    if (!isOpen || transProvider !== 'whisper' || modelStatus !== 'loading') return
+    if (!isOpen || !LOCAL_PROVIDERS.includes(transProvider) || modelStatus !== 'loading') return
     const interval = setInterval(() => {
       fetch(`${BACKEND_URL}/settings/transcription`)
         .then((r) => r.json())
-        .then((data) => setModelStatus(data.model_status || 'n/a'))
+        .then((data) => {
+          setModelStatus(data.model_status || 'n/a')
+          setModelRssMb(modelRss(data))
+        })
         .catch(() => {})
     }, 2000)
     return () => clearInterval(interval)
@@ -383,15 +412,21 @@ export function SettingsPanel({
 
   const handleTransProviderChange = async (provider: string) => {
     setTransProvider(provider)
-    const model = provider === 'whisper' ? transModel : 'base'
-    if (provider === 'whisper') setModelStatus('loading')
+    const isLocal = LOCAL_PROVIDERS.includes(provider)
+    // Quantized GGML variants are whisper.cpp-only: fall back to the full model
+    let model = isLocal ? transModel : 'base'
+    if (provider === 'faster-whisper' && quantizedModels.includes(model)) {
+      model = model.replace(/-q\d_\d$/, '')
+      setTransModel(model)
+    }
+    if (isLocal) setModelStatus('loading')
     try {
       const res = await fetch(`${BACKEND_URL}/settings/transcription`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ provider, model }),
       })
-      if (provider === 'whisper') {
+      if (isLocal) {
         const status = await fetch(`${BACKEND_URL}/settings/transcription`).then(r => r.json())
         setModelStatus(status.model_status || 'loading')
       }
@@ -409,6 +444,7 @@ export function SettingsPanel({
       })
       const status = await fetch(`${BACKEND_URL}/settings/transcription`).then(r => r.json())
       setModelStatus(status.model_status || 'loading')
+      setDownloadMb(status.download_mb ?? null)
     } catch {}
   }
 
@@ -508,16 +544,27 @@ export function SettingsPanel({
                 >
                   Whisper (local)
                 </button>
+                <button
+                  className={`setting-chip ${transProvider === 'faster-whisper' ? 'active' : ''}`}
+                  onClick={() => handleTransProviderChange('faster-whisper')}
+                >
+                  Whisper CPU
+                </button>
               </div>
               {transProvider === 'deepgram' && (
                 <div className="text-[10px] text-[var(--text-tertiary)] mt-1.5">
                   Облако, Nova-3, низкая задержка
                 </div>
               )}
+              {transProvider === 'faster-whisper' && (
+                <div className="text-[10px] text-[var(--text-tertiary)] mt-1.5">
+                  faster-whisper int8 — для машин без GPU
+                </div>
+              )}
             </div>
 
             {/* Whisper model selector */}
-            {transProvider === 'whisper' && transModels.length > 0 && (
+            {LOCAL_PROVIDERS.includes(transProvider) && transModels.length > 0 && (
               <div>
                 <div className="text-[13px] font-medium text-[var(--text-primary)] mb-2.5">Whisper модель</div>
                 <div className="flex flex-wrap gap-2">
@@ -531,6 +578,22 @@ export function SettingsPanel({
                     </button>
                   ))}
                 </div>
+                {transProvider === 'whisper' && quantizedModels.length > 0 && (
+                  <>
+                    <div className="text-[10px] text-[var(--text-tertiary)] mt-2 mb-1.5">Квантованные (меньше памяти, быстрее на CPU)</div>
+                    <div className="flex flex-wrap gap-2">
+                      {quantizedModels.map((m) => (
+                        <button
+                          key={m}
+                          className={`setting-chip ${transModel === m ? 'active' : ''}`}
+                          onClick={() => handleTransModelChange(m)}
+                        >
+                          {m}
+                        </button>
+                      ))}
+                    </div>
+                  </>
+                )}
                 <div className="text-[10px] mt-1.5" style={{
                   color: modelStatus === 'ready' ? 'var(--accent-green)'
                     : modelStatus === 'available' ? 'var(--accent-green)'
@@ -538,11 +601,11 @@ export function SettingsPanel({
                     : modelStatus.startsWith('error') ? 'var(--accent-red)'
                     : 'var(--text-tertiary)'
                 }}>
-                  {modelStatus === 'ready' && 'Модель готова'}
+                  {modelStatus === 'ready' && (modelRssMb > 0 ? `Модель готова · ${modelRssMb} МБ` : 'Модель готова')}
                   {modelStatus === 'available' && 'Модель скачана, готова к запуску'}
                   {modelStatus === 'loading' && 'Загрузка модели...'}
                   {modelStatus.startsWith('error') && `Ошибка: ${modelStatus.slice(7)}`}
-                  {modelStatus === 'not_downloaded' && (transModel.startsWith('large') ? '~1.6 ГБ, скачается при первом запуске' : 'Будет загружена автоматически')}
+                  {modelStatus === 'not_downloaded' && (downloadMb ? `~${downloadMb >= 1000 ? `${(downloadMb / 1000).toFixed(1)} ГБ` : `${downloadMb} МБ`}, скачается при первом запуске` : 'Будет загружена автоматически')}
                 </div>
               </div>
             )}
@@ -1,14 +1,24 @@
 /**
- * Top bar: drag zone, logo, recording toggle, action buttons, menu.
+ * Top bar: drag zone, logo, level meters, recording toggle, action buttons, menu.
  */
 
 interface Props {
   isRecording: boolean
   isConnected: boolean
+  /** Level per source in dBFS (audio_level events) */
+  levels: Record<string, number>
   onMenuClick: () => void
 }
 
-export function TopBar({ isRecording, isConnected, onMenuClick }: Props) {
+const METER_FLOOR_DB = -60
+
+/** dBFS → 0..1 bar height */
+function meterHeight(levelDb: number | undefined): number {
+  if (levelDb === undefined) return 0
+  return Math.min(1, Math.max(0, (levelDb - METER_FLOOR_DB) / -METER_FLOOR_DB))
+}
+
+export function TopBar({ isRecording, isConnected, levels, onMenuClick }: Props) {
   const handleForceAnswer = () => {
     fetch('http://127.0.0.1:8765/force-answer', { method: 'POST' }).catch(() => {})
   }
@@ -44,6 +54,20 @@ export function TopBar({ isRecording, isConnected, onMenuClick }: Props) {
             />
           ))}
         </div>
+
+        {/* Level meters: mic / system */}
+        {isRecording && (
+          <div className="flex items-end gap-[2px] h-[14px]">
+            {(['mic', 'system'] as const).map((source) => (
+              <span
+                key={source}
+                title={source === 'mic' ? 'Микрофон' : 'Системный звук'}
+                className="w-[3px] rounded-sm bg-[var(--accent-green)] transition-[height] duration-200"
+                style={{ height: `${Math.max(2, meterHeight(levels[source]) * 14)}px` }}
+              />
+            ))}
+          </div>
+        )}
       </div>
 
       {/* Spacer — inherits drag from parent */}
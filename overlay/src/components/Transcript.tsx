@@ -6,6 +6,7 @@
  * Concatenates all recent consecutive phrases from the same source.
  * Overflow is clipped from the LEFT (beginning) via direction: rtl trick,
  * so you always see the most recent words.
+ * Live interim hypotheses (Deepgram) are appended dimmed until the final arrives.
  * Fixed height (2 lines max).
  */
 
@@ -19,6 +20,7 @@ interface TranscriptLine {
 
 interface Props {
   transcripts: TranscriptLine[]
+  interim?: Record<string, string>
   isRecording: boolean
 }
 
@@ -42,8 +44,11 @@ function collectRecent(transcripts: TranscriptLine[], targetSource: string): str
   return parts.join(' ')
 }
 
-export function Transcript({ transcripts, isRecording }: Props) {
-  if (transcripts.length === 0) {
+export function Transcript({ transcripts, interim = {}, isRecording }: Props) {
+  const intInterim = interim['system'] || ''
+  const youInterim = interim['mic'] || ''
+
+  if (transcripts.length === 0 && !intInterim && !youInterim) {
     if (!isRecording) return null
     return (
       <div className="transcript-panel">
@@ -58,7 +63,7 @@ export function Transcript({ transcripts, isRecording }: Props) {
   const intText = collectRecent(transcripts, 'system')
   const youText = collectRecent(transcripts, 'mic')
 
-  if (!intText && !youText) {
+  if (!intText && !youText && !intInterim && !youInterim) {
     if (!isRecording) return null
     return (
       <div className="transcript-panel">
@@ -73,16 +78,22 @@ export function Transcript({ transcripts, isRecording }: Props) {
   return (
     <Interactable className="transcript-panel">
       <div className="transcript-compact">
-        {intText && (
+        {(intText || intInterim) && (
           <div className="transcript-line int">
             <span className="transcript-dot int" />
-            <span className="transcript-text-clip">{intText}</span>
+            <span className="transcript-text-clip">
+              {intText}
+              {intInterim && <span className="transcript-interim"> {intInterim}</span>}
+            </span>
           </div>
         )}
-        {youText && (
+        {(youText || youInterim) && (
           <div className="transcript-line you">
             <span className="transcript-dot you" />
-            <span className="transcript-text-clip">{youText}</span>
+            <span className="transcript-text-clip">
+              {youText}
+              {youInterim && <span className="transcript-interim"> {youInterim}</span>}
+            </span>
           </div>
         )}
       </div>
@@ -1,8 +1,8 @@
 /**
  * Hook for connecting to the backend SSE stream.
  *
- * Handles all event types: transcript, question_detected,
- * ai_answer_start/chunk/end, status. Auto-reconnects on failure.
+ * Handles all event types: transcript, transcript_interim, question_detected,
+ * ai_answer_start/chunk/end, status, audio_level. Auto-reconnects on failure.
  * Provides answer history with navigation.
  */
 
@@ -23,6 +23,10 @@ export interface AnswerEntry {
 
 interface SSEState {
   transcripts: TranscriptLine[]
+  /** Live not-yet-final hypothesis per source, cleared by the final transcript */
+  interim: Record<string, string>
+  /** Latest level per source (dBFS), from audio_level events */
+  levels: Record<string, number>
   answers: AnswerEntry[]
   pendingQuestion: string | null
   isRecording: boolean
@@ -45,6 +49,8 @@ function safeParse(raw: string): unknown | null {
 export function useSSE() {
   const [state, setState] = useState<SSEState>({
     transcripts: [],
+    interim: {},
+    levels: {},
     answers: [],
     pendingQuestion: null,
     isRecording: false,
@@ -67,10 +73,21 @@ export function useSSE() {
     es.addEventListener('transcript', (e) => {
       const data = safeParse(e.data) as TranscriptLine | null
       if (!data) return
-      setState((s) => ({
-        ...s,
-        transcripts: [...s.transcripts.slice(-MAX_TRANSCRIPTS), data],
-      }))
+      setState((s) => {
+        const interim = { ...s.interim }
+        delete interim[data.source]
+        return {
+          ...s,
+          transcripts: [...s.transcripts.slice(-MAX_TRANSCRIPTS), data],
+          interim,
+        }
+      })
+    })
+
+    es.addEventListener('transcript_interim', (e) => {
+      const data = safeParse(e.data) as TranscriptLine | null
+      if (!data) return
+      setState((s) => ({ ...s, interim: { ...s.interim, [data.source]: data.text } }))
     })
 
     es.addEventListener('question_detected', (e) => {
@@ -119,6 +136,12 @@ export function useSSE() {
       })
     })
 
+    es.addEventListener('audio_level', (e) => {
+      const data = safeParse(e.data) as { source: string; level_db: number } | null
+      if (!data) return
+      setState((s) => ({ ...s, levels: { ...s.levels, [data.source]: data.level_db } }))
+    })
+
     es.addEventListener('status', (e) => {
       const data = safeParse(e.data) as { type: string; message?: string } | null
       if (!data) return
@@ -130,6 +153,8 @@ export function useSSE() {
           updates.error = null
         }
         if (data.type === 'stopped') {
+          updates.interim = {}
+          updates.levels = {}
           updates.isRecording = false
           updates.statusMessage = null
           updates.error = null
@@ -137,9 +162,12 @@ export function useSSE() {
         if (data.type === 'loading') {
           updates.statusMessage = data.message ?? null
         }
-        if (data.type === 'model_ready') {
+        if (data.type === 'model_ready' || data.type === 'recovered') {
           updates.statusMessage = null
         }
+        if (data.type === 'degraded') {
+          updates.statusMessage = data.message ?? null
+        }
         if (data.type === 'error') {
           updates.error = data.message ?? null
           updates.statusMessage = null